@@ -2,14 +2,15 @@ from logging.config import fileConfig
 
 from alembic import context
 from app.config import get_settings
-from app.database import Base
-from app.models import Set, Card
+from app.database import Base, to_sync_url
+from app.models import Set, Card, CardProgress, SetDailyActivity, ReviewLog
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 config = context.config
 settings = get_settings()
-config.set_main_option("sqlalchemy.url", settings.database_url)
+# configparser treats "%" as interpolation; URL-encoded passwords need it escaped
+config.set_main_option("sqlalchemy.url", to_sync_url(settings.database_url).replace("%", "%%"))
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
@@ -17,6 +18,15 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names):
+    """Keep autogenerate away from the full-text search objects (app.models.CARD_SEARCH_DDL)"""
+    if type_ == "table":
+        return not name.startswith("cards_fts")
+    if type_ in ("column", "index"):
+        return name not in ("search_vector", "ix_cards_search_vector")
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -39,6 +49,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -62,7 +73,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
@@ -0,0 +1,34 @@
+"""make set ids non-reusable
+
+Revision ID: 1b6f0d4e9a27
+Revises: fa3c6e8d2b17
+Create Date: 2026-10-18 21:14:37.502961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b6f0d4e9a27'
+down_revision: Union[str, Sequence[str], None] = 'fa3c6e8d2b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PostgreSQL sequences never hand an id out twice; SQLite only stops
+    # reusing the highest rowid with AUTOINCREMENT, which needs a table rebuild
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('sets', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('sets', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+            pass
@@ -0,0 +1,50 @@
+"""add set daily activity rollup
+
+Revision ID: 4f2a9c1d7e3b
+Revises: 30cb1ea652d6
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c1d7e3b'
+down_revision: Union[str, Sequence[str], None] = '30cb1ea652d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('set_daily_activity',
+    sa.Column('set_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('correct_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['set_id'], ['sets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('set_id', 'day')
+    )
+
+    # Backfill from the latest review of each card - the only history kept so far
+    op.execute(
+        """
+        INSERT INTO set_daily_activity (set_id, day, review_count, correct_count)
+        SELECT cards.set_id,
+               DATE(card_progress.last_reviewed),
+               COUNT(*),
+               SUM(CASE WHEN card_progress.repetitions > 0 THEN 1 ELSE 0 END)
+        FROM card_progress
+        JOIN cards ON cards.id = card_progress.card_id
+        WHERE card_progress.last_reviewed IS NOT NULL
+        GROUP BY cards.set_id, DATE(card_progress.last_reviewed)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('set_daily_activity')
@@ -0,0 +1,43 @@
+"""add review log table
+
+Revision ID: b81e3f5a0c92
+Revises: 4f2a9c1d7e3b
+Create Date: 2026-10-18 11:04:09.552871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e3f5a0c92'
+down_revision: Union[str, Sequence[str], None] = '4f2a9c1d7e3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('review_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('card_id', sa.Integer(), nullable=False),
+    sa.Column('ts', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('quality', sa.SmallInteger(), nullable=False),
+    sa.Column('prev_interval', sa.Integer(), nullable=False),
+    sa.Column('new_interval', sa.Integer(), nullable=False),
+    sa.Column('prev_ease', sa.Float(), nullable=False),
+    sa.Column('new_ease', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_review_log_card_id_ts', 'review_log', ['card_id', 'ts'], unique=False)
+    op.create_index('ix_review_log_ts', 'review_log', ['ts'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_review_log_ts', table_name='review_log')
+    op.drop_index('ix_review_log_card_id_ts', table_name='review_log')
+    op.drop_table('review_log')
@@ -0,0 +1,50 @@
+"""add due queue indexes
+
+Revision ID: c3d9e7a1f456
+Revises: b81e3f5a0c92
+Create Date: 2026-10-18 12:20:37.104519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9e7a1f456'
+down_revision: Union[str, Sequence[str], None] = 'b81e3f5a0c92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # card_progress gets its own copy of set_id so (set_id, next_review) can be one index
+    with op.batch_alter_table('card_progress') as batch_op:
+        batch_op.add_column(sa.Column('set_id', sa.Integer(), nullable=True))
+
+    # Progress rows orphaned by the old bulk card delete in update_set have no set to copy
+    op.execute("DELETE FROM card_progress WHERE card_id NOT IN (SELECT id FROM cards)")
+    op.execute(
+        "UPDATE card_progress SET set_id = (SELECT cards.set_id FROM cards WHERE cards.id = card_progress.card_id)"
+    )
+
+    with op.batch_alter_table('card_progress') as batch_op:
+        batch_op.alter_column('set_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_card_progress_set_id_sets', 'sets', ['set_id'], ['id'], ondelete='CASCADE'
+        )
+
+    op.create_index('ix_card_progress_set_id_next_review', 'card_progress', ['set_id', 'next_review'], unique=False)
+    op.create_index('ix_cards_set_id_order', 'cards', ['set_id', 'order'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cards_set_id_order', table_name='cards')
+    op.drop_index('ix_card_progress_set_id_next_review', table_name='card_progress')
+
+    with op.batch_alter_table('card_progress') as batch_op:
+        batch_op.drop_constraint('fk_card_progress_set_id_sets', type_='foreignkey')
+        batch_op.drop_column('set_id')
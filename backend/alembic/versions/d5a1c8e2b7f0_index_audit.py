@@ -0,0 +1,39 @@
+"""index audit: drop redundant indexes
+
+Revision ID: d5a1c8e2b7f0
+Revises: c3d9e7a1f456
+Create Date: 2026-10-18 13:41:52.870316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a1c8e2b7f0'
+down_revision: Union[str, Sequence[str], None] = 'c3d9e7a1f456'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Primary keys are already indexed
+    op.drop_index('ix_sets_id', table_name='sets')
+    op.drop_index('ix_cards_id', table_name='cards')
+    op.drop_index('ix_card_progress_id', table_name='card_progress')
+    # Duplicates the index behind UNIQUE (card_id)
+    op.drop_index('ix_card_progress_card_id', table_name='card_progress')
+    # Every next_review query is per set and uses ix_card_progress_set_id_next_review
+    op.drop_index('ix_card_progress_next_review', table_name='card_progress')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_card_progress_next_review', 'card_progress', ['next_review'], unique=False)
+    op.create_index('ix_card_progress_card_id', 'card_progress', ['card_id'], unique=False)
+    op.create_index('ix_card_progress_id', 'card_progress', ['id'], unique=False)
+    op.create_index('ix_cards_id', 'cards', ['id'], unique=False)
+    op.create_index('ix_sets_id', 'sets', ['id'], unique=False)
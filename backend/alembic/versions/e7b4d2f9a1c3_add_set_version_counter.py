@@ -0,0 +1,29 @@
+"""add set version counter
+
+Revision ID: e7b4d2f9a1c3
+Revises: d5a1c8e2b7f0
+Create Date: 2026-10-18 14:56:03.219448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b4d2f9a1c3'
+down_revision: Union[str, Sequence[str], None] = 'd5a1c8e2b7f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sets', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sets') as batch_op:
+        batch_op.drop_column('version')
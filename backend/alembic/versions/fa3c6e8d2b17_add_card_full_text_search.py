@@ -0,0 +1,69 @@
+"""add card full-text search
+
+Revision ID: fa3c6e8d2b17
+Revises: e7b4d2f9a1c3
+Create Date: 2026-10-18 18:52:41.630117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fa3c6e8d2b17'
+down_revision: Union[str, Sequence[str], None] = 'e7b4d2f9a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        # External-content FTS5 index (rowid = cards.id), kept in sync by triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE cards_fts USING fts5("
+            "term, definition, content='cards', content_rowid='id', prefix='3')"
+        )
+        op.execute("""
+            CREATE TRIGGER cards_fts_ai AFTER INSERT ON cards BEGIN
+                INSERT INTO cards_fts(rowid, term, definition) VALUES (new.id, new.term, new.definition);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER cards_fts_ad AFTER DELETE ON cards BEGIN
+                INSERT INTO cards_fts(cards_fts, rowid, term, definition) VALUES ('delete', old.id, old.term, old.definition);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER cards_fts_au AFTER UPDATE OF term, definition ON cards BEGIN
+                INSERT INTO cards_fts(cards_fts, rowid, term, definition) VALUES ('delete', old.id, old.term, old.definition);
+                INSERT INTO cards_fts(rowid, term, definition) VALUES (new.id, new.term, new.definition);
+            END
+        """)
+        op.execute("INSERT INTO cards_fts(cards_fts) VALUES ('rebuild')")
+    else:
+        # Stored, so ranking reads the vector instead of re-parsing every match
+        op.add_column('cards', sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple'::regconfig, term), 'A') || "
+                "setweight(to_tsvector('simple'::regconfig, definition), 'B')",
+                persisted=True
+            )
+        ))
+        op.create_index('ix_cards_search_vector', 'cards', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('cards_fts_ai', 'cards_fts_ad', 'cards_fts_au'):
+            op.execute(f"DROP TRIGGER {trigger}")
+        op.execute("DROP TABLE cards_fts")
+    else:
+        op.drop_index('ix_cards_search_vector', table_name='cards')
+        op.drop_column('cards', 'search_vector')
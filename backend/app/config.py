@@ -1,15 +1,73 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
     app_name: str = "Study Cards API"
+    # Plain URLs (sqlite://, postgresql://) are mapped to their async driver
+    # for the app and kept as-is for Alembic — see app.database
     database_url: str = "sqlite:///./studycards.db"
+    # Connection pool for PostgreSQL (SQLite keeps SQLAlchemy's default pool)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Seconds to wait for a free connection before failing the request
+    db_pool_timeout: float = 30
+    # Check connections with a cheap round trip before handing them out
+    db_pool_pre_ping: bool = True
+    # Replace connections older than this many seconds (-1 keeps them forever)
+    db_pool_recycle: int = 1800
+    # Milliseconds before PostgreSQL cancels a statement (0 disables)
+    db_statement_timeout: int = 30_000
     frontend_url: str = "http://localhost:5173"
+    log_level: str = "INFO"
+    # SQLite pragmas applied to every new connection (ignored for other databases).
+    # WAL lets readers run while a review commits; NORMAL sync is durable in WAL
+    # except for the last transactions on power loss.
+    sqlite_journal_mode: Literal["delete", "truncate", "persist", "memory", "wal", "off"] = "wal"
+    sqlite_synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    # Negative values are KiB, positive values are pages
+    sqlite_cache_size: int = -64_000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # Milliseconds a connection waits for a lock before failing with "database is locked"
+    sqlite_busy_timeout: int = 5000
+    sqlite_temp_store: Literal["default", "file", "memory"] = "memory"
+    # Append every review to review_log (history and exact accuracy)
+    review_log_enabled: bool = True
+    # Default size of a /study-sr session
+    study_new_cards_limit: int = 20
+    study_review_cap: int = 200
+    # Page size for GET /api/sets/{id} when only a cursor is given
+    set_cards_page_size: int = 200
+    # Cards inserted (and committed) per batch by POST /api/sets/import
+    import_batch_size: int = 1000
+    # Rows fetched per server-side cursor round trip by GET /api/export
+    export_yield_per: int = 1000
+    # Cards recomputed (and committed) per chunk by POST /api/sets/{id}/reschedule
+    reschedule_chunk_size: int = 5000
+    # Serialize /study-sr and GET /api/sets rows straight to JSON, without Pydantic validation
+    fast_serialization: bool = False
+    # In-process cache of GET /api/sets/{id} payloads (per worker); 0 bytes disables it
+    set_cache_max_bytes: int = 64 * 1024 * 1024
+    set_cache_ttl: float = 300
+    # Assumed share of each rating when GET /api/sets/{id}/forecast simulates future reviews
+    forecast_quality_weights: dict[Literal["again", "hard", "good", "easy"], float] = {
+        "again": 0.1, "hard": 0.15, "good": 0.6, "easy": 0.15
+    }
+    # Share of requests (0-1) timed by app.profiling: Server-Timing header plus a log line
+    profiling_sample_rate: float = 0.0
+    # Statements slower than this many milliseconds go to the slow query log (0 disables it)
+    slow_query_threshold_ms: float = 0
+    # JSON lines file of the slow query log, rotated at max_bytes with this many backups
+    slow_query_log_path: str = "slow_queries.log"
+    slow_query_log_max_bytes: int = 10 * 1024 * 1024
+    slow_query_log_backups: int = 3
+    # Store each slow statement's EXPLAIN plan (SQLite and PostgreSQL; one more round trip per entry)
+    slow_query_explain: bool = True
 
     model_config = SettingsConfigDict(env_file=".env")
 
 
 @lru_cache()
 def get_settings():
-    return Settings()
\ No newline at end of file
+    return Settings()
@@ -1,23 +1,138 @@
-from app.config import get_settings
-from sqlalchemy import create_engine
+import logging
+
+from app.config import Settings, get_settings
+from app.slow_queries import SlowQueryLog
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 settings = get_settings()
 
-# SQLite needs check_same_thread=False
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+logger = logging.getLogger(__name__)
+
+# Backend name -> (async driver, sync driver)
+DRIVERS = {
+    "sqlite": ("sqlite+aiosqlite", "sqlite"),
+    "postgresql": ("postgresql+asyncpg", "postgresql+psycopg2"),
+}
+
+
+def to_async_url(url: str) -> str:
+    """Return the async-driver variant of a database URL (used by the app)."""
+    parsed = make_url(url)
+    drivers = DRIVERS.get(parsed.get_backend_name())
+    if drivers is None:
+        return url
+    return parsed.set(drivername=drivers[0]).render_as_string(hide_password=False)
+
+
+def to_sync_url(url: str) -> str:
+    """Return the sync-driver variant of a database URL (used by Alembic)."""
+    parsed = make_url(url)
+    drivers = DRIVERS.get(parsed.get_backend_name())
+    if drivers is None:
+        return url
+    return parsed.set(drivername=drivers[1]).render_as_string(hide_password=False)
+
+
+def engine_options(url: str, settings: Settings) -> dict:
+    """
+    Keyword arguments for create_engine / create_async_engine.
+
+    SQLite keeps SQLAlchemy's default pool; other databases get the db_pool_*
+    settings, and PostgreSQL a per-connection statement_timeout passed the way
+    the URL's driver expects it.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        # SQLite needs check_same_thread=False
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    if parsed.get_backend_name() == "postgresql" and settings.db_statement_timeout > 0:
+        timeout = str(settings.db_statement_timeout)
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+SQLITE_PRAGMAS = ("journal_mode", "synchronous", "cache_size", "mmap_size", "busy_timeout", "temp_store")
+
+
+def sqlite_pragmas(settings: Settings) -> dict:
+    """PRAGMA name -> value from the sqlite_* settings."""
+    return {name: getattr(settings, f"sqlite_{name}") for name in SQLITE_PRAGMAS}
+
+
+def install_sqlite_pragmas(engine, pragmas: dict) -> None:
+    """
+    Apply `pragmas` to every new connection of a SQLite engine (sync or async)
+    and log the values SQLite reports back for the first one.
+    Does nothing for other databases.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine.dialect.name != "sqlite":
+        return
+    logged = False
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        nonlocal logged
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                # Values are validated by Settings (Literal choices or int)
+                cursor.execute(f"PRAGMA {name}={value}")
+            if not logged:
+                effective = []
+                for name in pragmas:
+                    cursor.execute(f"PRAGMA {name}")
+                    effective.append(f"{name}={cursor.fetchone()[0]}")
+                logger.info("SQLite pragmas for %s: %s", sync_engine.url.database, " ".join(effective))
+                logged = True
+        finally:
+            cursor.close()
+
+
+# Async engine used by every request handler
+engine = create_async_engine(
+    to_async_url(settings.database_url),
+    **engine_options(to_async_url(settings.database_url), settings)
+)
+install_sqlite_pragmas(engine, sqlite_pragmas(settings))
+
+# Statements over SLOW_QUERY_THRESHOLD_MS, read back by GET /api/admin/slow-queries
+slow_query_log = SlowQueryLog.from_settings(settings)
+slow_query_log.install(engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Sync engine kept for Alembic, scripts and benchmarks
+sync_engine = create_engine(
+    to_sync_url(settings.database_url),
+    **engine_options(to_sync_url(settings.database_url), settings)
 )
+install_sqlite_pragmas(sync_engine, sqlite_pragmas(settings))
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
 
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,10 +1,21 @@
+import logging
+
 from app.config import get_settings
-from app.routes import router
-from fastapi import FastAPI
+from app.database import engine
+from app.metrics import CONTENT_TYPE, MetricsMiddleware, install_pool_metrics, render_metrics
+from app.profiling import ProfiledRoute, ProfilingMiddleware, install_query_timing
+from app.slow_queries import RequestScopeMiddleware
+from app.routes import router, set_cache
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 settings = get_settings()
 
+logging.basicConfig(
+    level=settings.log_level.upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 app = FastAPI(title=settings.app_name)
 
 # CORS configuration — używaj zmiennej środowiskowej
@@ -25,11 +36,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
+# Sampled per request from PROFILING_SAMPLE_RATE (0 by default)
+install_query_timing(engine)
+app.add_middleware(ProfilingMiddleware)
+app.router.route_class = ProfiledRoute
+# Tells the slow query log which route a statement came from
+app.add_middleware(RequestScopeMiddleware)
+
+# Outermost, so latencies cover the other middleware too
+install_pool_metrics(engine)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(router)
 
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "app": settings.app_name}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """This worker's request, review, connection pool and cache metrics for Prometheus"""
+    return Response(render_metrics(engine, set_cache), media_type=CONTENT_TYPE)
@@ -0,0 +1,216 @@
+"""
+Operational metrics in the Prometheus text format, served at GET /metrics.
+
+The counters and histograms live in this process, with no client library
+and nothing pushed over the network. Like the set payload cache, each worker
+reports its own numbers; Prometheus tells workers apart by their instance
+label. Everything is updated from the event loop, so no locking is needed.
+
+Recording is a dict lookup and a few additions per request: request
+latency is keyed by the route template (/api/sets/{set_id}/study-sr), never
+the raw path, so the number of series stays bounded. Connection pool and set
+cache gauges are read when /metrics is scraped.
+"""
+from bisect import bisect_left
+from time import perf_counter
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; the request histograms are meant for SR endpoint latency alerts
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Requests that matched no route share one label value
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sample(name: str, labelnames: tuple, labels: tuple, value) -> str:
+    if labelnames:
+        pairs = ",".join(f'{labelname}="{_escape(str(label))}"' for labelname, label in zip(labelnames, labels))
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {value}"
+
+
+def _header(name: str, kind: str, help_text: str) -> list[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        # Unlabelled metrics are reported from the start, at 0
+        self.values: dict[tuple, float] = {} if labelnames else {(): 0}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = _header(self.name, self.kind, self.help)
+        for labels, value in sorted(self.values.items()):
+            lines.append(_sample(self.name, self.labelnames, labels, value))
+        return lines
+
+
+class Gauge(Counter):
+    """Current value per label combination"""
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    """Observation counts in cumulative `le` buckets, plus their sum, per label combination"""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Labels -> per-bucket counts (the last one is +Inf) followed by the sum
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = _header(self.name, "histogram", self.help)
+        bucket_labels = self.labelnames + ("le",)
+        for labels, series in sorted(self.series.items()):
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                total += count
+                lines.append(_sample(f"{self.name}_bucket", bucket_labels, labels + (bound,), total))
+            lines.append(_sample(f"{self.name}_sum", self.labelnames, labels, series[-1]))
+            lines.append(_sample(f"{self.name}_count", self.labelnames, labels, total))
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "studycards_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ("method", "route"),
+)
+REQUESTS = Counter(
+    "studycards_http_requests_total", "Requests answered, by response status.", ("method", "route", "status")
+)
+IN_FLIGHT = Gauge("studycards_http_requests_in_flight", "Requests being handled right now.")
+REVIEWS = Counter("studycards_reviews_total", "Reviews saved, by rating.", ("quality",))
+POOL_CHECKOUT_SECONDS = Histogram(
+    "studycards_db_pool_checkout_seconds",
+    "Time to get a database connection from the pool, opening a new one included.",
+)
+POOL_TIMEOUTS = Counter(
+    "studycards_db_pool_timeouts_total", "Connection requests that gave up after DB_POOL_TIMEOUT."
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and their latency by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            route = getattr(route, "path", UNMATCHED_ROUTE)
+            REQUEST_SECONDS.observe(perf_counter() - start, scope["method"], route)
+            REQUESTS.inc(scope["method"], route, str(status))
+
+
+def install_pool_metrics(engine) -> None:
+    """Time every connection checkout of `engine` (sync or async), also after dispose()"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    def time_checkouts(pool) -> None:
+        # Pool events only fire once a connection was obtained, so wrap connect()
+        connect = pool.connect
+
+        def timed_connect():
+            start = perf_counter()
+            try:
+                connection = connect()
+            except exc.TimeoutError:
+                POOL_TIMEOUTS.inc()
+                raise
+            POOL_CHECKOUT_SECONDS.observe(perf_counter() - start)
+            return connection
+
+        pool.connect = timed_connect
+
+    time_checkouts(sync_engine.pool)
+    event.listen(sync_engine, "engine_disposed", lambda disposed: time_checkouts(disposed.pool))
+
+
+def _pool_gauges(engine) -> list[str]:
+    pool = getattr(engine, "sync_engine", engine).pool
+    if not isinstance(pool, QueuePool):
+        return []
+    lines = []
+    for name, help_text, value in (
+        ("size", "Connections the pool keeps open.", pool.size()),
+        ("checked_out", "Connections in use by requests.", pool.checkedout()),
+        ("idle", "Open connections waiting in the pool.", pool.checkedin()),
+        ("overflow", "Connections open beyond the pool size (at most DB_MAX_OVERFLOW).", max(pool.overflow(), 0)),
+    ):
+        lines += _header(f"studycards_db_pool_{name}", "gauge", help_text)
+        lines.append(f"studycards_db_pool_{name} {value}")
+    return lines
+
+
+def _set_cache_metrics(set_cache) -> list[str]:
+    stats = set_cache.stats()
+    lines = []
+    for name in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        lines += _header(f"studycards_set_cache_{name}_total", "counter", f"GET /api/sets/{{id}} payload cache {name}.")
+        lines.append(f"studycards_set_cache_{name}_total {stats[name]}")
+    for name in ("entries", "size_bytes"):
+        lines += _header(f"studycards_set_cache_{name}", "gauge", f"GET /api/sets/{{id}} payload cache {name}.")
+        lines.append(f"studycards_set_cache_{name} {stats[name]}")
+    return lines
+
+
+def render_metrics(engine=None, set_cache=None) -> str:
+    """Every metric of this worker in the Prometheus text exposition format"""
+    lines = []
+    for metric in (REQUEST_SECONDS, REQUESTS, IN_FLIGHT, REVIEWS, POOL_CHECKOUT_SECONDS, POOL_TIMEOUTS):
+        lines += metric.render()
+    if engine is not None:
+        lines += _pool_gauges(engine)
+    if set_cache is not None:
+        lines += _set_cache_metrics(set_cache)
+    return "\n".join(lines) + "\n"
@@ -1,10 +1,31 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Enum as SQLEnum
+from sqlalchemy import (
+    DDL, Column, Integer, SmallInteger, String, Text, Date, DateTime, ForeignKey, Float, Index, event, literal_column,
+    table, column, Enum as SQLEnum
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from app.database import Base
 import enum
 
 
+class LocalDateTime(TypeDecorator):
+    """
+    DateTime(timezone=True) that always hands back naive datetimes.
+
+    The app stores naive local times (datetime.now()). SQLite returns them as
+    written; PostgreSQL returns them tagged with the session time zone they
+    were interpreted in, so dropping the tzinfo restores the written value.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            return value.replace(tzinfo=None)
+        return value
+
+
 class ReviewQuality(enum.Enum):
     AGAIN = 0
     HARD = 3
@@ -14,44 +35,138 @@ class ReviewQuality(enum.Enum):
 
 class Set(Base):
     __tablename__ = "sets"
+    # Ids are never handed out again after a delete: ETags and cached payloads
+    # are keyed by (id, version), and a new set starts again at version 1
+    __table_args__ = {"sqlite_autoincrement": True}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(LocalDateTime(), server_default=func.now())
+    updated_at = Column(LocalDateTime(), onupdate=func.now())
+    # Bumped by every write that changes what the set's GET endpoints return (used for ETags)
+    version = Column(Integer, nullable=False, default=1)
 
+    # Relationships never lazy-load: queries load what they need up front
+    # (joinedload / contains_eager), and an unplanned load raises instead of
+    # quietly running one more query per row
     cards = relationship(
         "Card",
         back_populates="set",
         cascade="all, delete-orphan",
-        order_by="Card.order"
+        order_by="Card.order",
+        lazy="raise_on_sql"
+    )
+    daily_activity = relationship(
+        "SetDailyActivity",
+        back_populates="set",
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql"
     )
 
 
 class Card(Base):
     __tablename__ = "cards"
+    __table_args__ = (
+        Index("ix_cards_set_id_order", "set_id", "order"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     set_id = Column(Integer, ForeignKey("sets.id", ondelete="CASCADE"), nullable=False)
     term = Column(String(500), nullable=False)
     definition = Column(Text, nullable=False)
     order = Column(Integer, nullable=False, default=0)
 
-    set = relationship("Set", back_populates="cards")
-    progress = relationship("CardProgress", back_populates="card", uselist=False, cascade="all, delete-orphan")
+    set = relationship("Set", back_populates="cards", lazy="raise_on_sql")
+    progress = relationship(
+        "CardProgress", back_populates="card", uselist=False, cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
+
+
+# Full-text search over cards.term and cards.definition, created next to the
+# cards table (and by migration fa3c6e8d2b17). SQLite gets an external-content
+# FTS5 table (rowid = cards.id) kept in sync by triggers; PostgreSQL a stored
+# tsvector column with terms weighted above definitions, so ranking does not
+# re-parse every match. Neither is mapped, and every write path is covered.
+CARD_SEARCH_DDL = {
+    "sqlite": (
+        "CREATE VIRTUAL TABLE cards_fts USING fts5("
+        "term, definition, content='cards', content_rowid='id', prefix='3')",
+        """CREATE TRIGGER cards_fts_ai AFTER INSERT ON cards BEGIN
+            INSERT INTO cards_fts(rowid, term, definition) VALUES (new.id, new.term, new.definition);
+        END""",
+        """CREATE TRIGGER cards_fts_ad AFTER DELETE ON cards BEGIN
+            INSERT INTO cards_fts(cards_fts, rowid, term, definition) VALUES ('delete', old.id, old.term, old.definition);
+        END""",
+        """CREATE TRIGGER cards_fts_au AFTER UPDATE OF term, definition ON cards BEGIN
+            INSERT INTO cards_fts(cards_fts, rowid, term, definition) VALUES ('delete', old.id, old.term, old.definition);
+            INSERT INTO cards_fts(rowid, term, definition) VALUES (new.id, new.term, new.definition);
+        END""",
+    ),
+    "postgresql": (
+        "ALTER TABLE cards ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple'::regconfig, term), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, definition), 'B')) STORED",
+        "CREATE INDEX ix_cards_search_vector ON cards USING gin (search_vector)",
+    ),
+}
+
+for dialect_name, statements in CARD_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Card.__table__, "after_create", DDL(statement).execute_if(dialect=dialect_name))
+# The triggers and the PostgreSQL column go with the cards table
+event.listen(Card.__table__, "after_drop", DDL("DROP TABLE IF EXISTS cards_fts").execute_if(dialect="sqlite"))
+
+# For queries; these stay outside Base.metadata
+cards_fts = table("cards_fts", column("rowid", Integer))
+card_search_vector = literal_column("cards.search_vector")
 
 
 class CardProgress(Base):
     __tablename__ = "card_progress"
+    __table_args__ = (
+        Index("ix_card_progress_set_id_next_review", "set_id", "next_review"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    id = Column(Integer, primary_key=True)
+    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False, unique=True)
+    # Copy of cards.set_id so the due queue can be served from one index
+    set_id = Column(Integer, ForeignKey("sets.id", ondelete="CASCADE"), nullable=False)
     ease_factor = Column(Float, nullable=False, default=2.5)
     interval_days = Column(Integer, nullable=False, default=0)
     repetitions = Column(Integer, nullable=False, default=0)
     lapses = Column(Integer, nullable=False, default=0)
-    last_reviewed = Column(DateTime(timezone=True), nullable=True)
-    next_review = Column(DateTime(timezone=True), nullable=True, index=True)
+    last_reviewed = Column(LocalDateTime(), nullable=True)
+    next_review = Column(LocalDateTime(), nullable=True)
+
+    card = relationship("Card", back_populates="progress", lazy="raise_on_sql")
+
+
+class SetDailyActivity(Base):
+    """Per-set, per-day review rollup, updated in the same transaction as each review"""
+    __tablename__ = "set_daily_activity"
+
+    set_id = Column(Integer, ForeignKey("sets.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    correct_count = Column(Integer, nullable=False, default=0)
+
+    set = relationship("Set", back_populates="daily_activity", lazy="raise_on_sql")
+
+
+class ReviewLog(Base):
+    """Append-only record of every review. Rows are never updated."""
+    __tablename__ = "review_log"
+    __table_args__ = (
+        Index("ix_review_log_card_id_ts", "card_id", "ts"),
+        Index("ix_review_log_ts", "ts"),
+    )
 
-    card = relationship("Card", back_populates="progress")
\ No newline at end of file
+    id = Column(Integer, primary_key=True)
+    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False)
+    ts = Column(LocalDateTime(), nullable=False)
+    quality = Column(SmallInteger, nullable=False)  # ReviewQuality value
+    prev_interval = Column(Integer, nullable=False)
+    new_interval = Column(Integer, nullable=False)
+    prev_ease = Column(Float, nullable=False)
+    new_ease = Column(Float, nullable=False)
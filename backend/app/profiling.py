@@ -0,0 +1,162 @@
+"""
+Per-request profiling (PROFILING_SAMPLE_RATE, off by default).
+
+A sampled request gets a RequestProfile in a context variable. Engine
+cursor events add each statement's time to it, ProfiledRoute times the
+endpoint function, and ProfilingMiddleware reports the totals in a
+Server-Timing header and one log line:
+
+- sql: statements run and the time spent executing them
+- handler: the endpoint function, SQL and ORM loading included
+- serialize: from the endpoint's return to the response headers, i.e.
+  response_model validation and JSON encoding
+- total: the whole request as the middleware sees it
+
+The header goes out with the response start; the log line is written once
+the body has been sent, so for streamed responses its numbers also cover
+the statements run while streaming. Requests that are not sampled pay for a
+context variable lookup per statement.
+"""
+import functools
+import inspect
+import logging
+import random
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Optional
+
+from app.config import get_settings
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestProfile:
+    queries: int = 0
+    sql: float = 0.0
+    handler: float = 0.0
+    # perf_counter() when the endpoint function returned
+    handler_end: Optional[float] = None
+
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile.get() is not None:
+        context.profiling_start = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    start = getattr(context, "profiling_start", None)
+    if profile is not None and start is not None:
+        profile.queries += 1
+        profile.sql += perf_counter() - start
+
+
+def install_query_timing(engine) -> None:
+    """Count and time the statements of sampled requests on `engine` (sync or async)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _timed(endpoint):
+    """Wrap an endpoint so sampled requests record how long it ran"""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            profile = _profile.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.handler_end = perf_counter()
+                profile.handler = profile.handler_end - start
+    elif inspect.isfunction(endpoint) and not (
+        inspect.isgeneratorfunction(endpoint) or inspect.isasyncgenfunction(endpoint)
+    ):
+        # Runs in the threadpool, which copies the request's context
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            profile = _profile.get()
+            if profile is None:
+                return endpoint(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                profile.handler_end = perf_counter()
+                profile.handler = profile.handler_end - start
+    else:
+        # Streaming endpoints produce their response while it is sent
+        return endpoint
+    timed.profiled = True
+    return timed
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose endpoint reports its run time to ProfilingMiddleware"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not getattr(endpoint, "profiled", False):
+            endpoint = _timed(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f}"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling a PROFILING_SAMPLE_RATE share of HTTP requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        rate = get_settings().profiling_sample_rate
+        if scope["type"] != "http" or rate <= 0 or random.random() >= rate:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        start = perf_counter()
+        status = None
+        serialize = 0.0
+
+        async def send_with_timing(message):
+            nonlocal status, serialize
+            if message["type"] == "http.response.start":
+                now = perf_counter()
+                status = message["status"]
+                if profile.handler_end is not None:
+                    serialize = now - profile.handler_end
+                MutableHeaders(scope=message).append("Server-Timing", ", ".join((
+                    f'sql;dur={_ms(profile.sql)};desc="{profile.queries} queries"',
+                    f"handler;dur={_ms(profile.handler)}",
+                    f"serialize;dur={_ms(serialize)}",
+                    f"total;dur={_ms(now - start)}",
+                )))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _profile.reset(token)
+            route = scope.get("route")
+            logger.info(
+                "profile method=%s route=%s status=%s queries=%d sql_ms=%s handler_ms=%s serialize_ms=%s total_ms=%s",
+                scope["method"], getattr(route, "path", scope["path"]), status, profile.queries,
+                _ms(profile.sql), _ms(profile.handler), _ms(serialize), _ms(perf_counter() - start)
+            )
@@ -1,31 +1,272 @@
+import base64
+import hashlib
+import json
+import logging
 import random
-from datetime import datetime, timedelta
-
-from app.database import get_db
-from app.models import Set as SetModel, Card as CardModel, CardProgress, ReviewQuality
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from app.config import get_settings
+from app.database import get_db, slow_query_log
+from app.models import (
+    Set as SetModel, Card as CardModel, CardProgress, SetDailyActivity, ReviewLog, ReviewQuality,
+    cards_fts, card_search_vector
+)
 from app.schemas import (
-    Set, SetCreate, SetListItem, Card,
-    StudySessionResponse, CardWithProgress, StudySessionStats,
-    ReviewInput, CardProgressResponse, SetStats
+    Set, SetCreate, SetUpdate, SetPatch, CardUpdate, SetListItem, Card,
+    StudySessionResponse, CardWithProgress, StudySessionStats, StudyQueue,
+    ReviewInput, ReviewQualityEnum, CardProgressResponse, SetStats,
+    ReviewBatchInput, ReviewBatchItemResult, ReviewBatchResponse,
+    SetActivity, ReviewLogEntry, ReviewAccuracy,
+    CardCreate, SetImportResult, SetImportRowError, IMPORT_ERROR_LIMIT,
+    ExportHeader, ExportSet, ExportCard, ExportProgress, ExportRecord,
+    NdjsonImportResult, EXPORT_FORMAT_VERSION, RescheduleResult,
+    ForecastDay, ReviewForecast, SetCacheStats, SearchHit, SearchResults, SlowQueryEntry
 )
+from app.metrics import REVIEWS
+from app.profiling import ProfiledRoute
+from app.serialization import json_response
 from app.services import SpacedRepetitionService
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from app.services.deck_import import DeckFormat, DeckImportError, iter_deck_rows, iter_lines
+from app.services.forecast import forecast_due_counts
+from app.services.reschedule import replay_review_log
+from app.services.search import fts5_match, highlight, pg_tsquery, search_words
+from app.services.set_cache import SetPayloadCache
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import (
+    Date, select, insert, update, delete, func, case, cast, literal, literal_column, null, or_, true, tuple_,
+    union_all
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, contains_eager, joinedload
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+logger = logging.getLogger(__name__)
+
+EXPORT_RECORD_ADAPTER = TypeAdapter(ExportRecord)
+
+set_cache = SetPayloadCache(get_settings().set_cache_max_bytes, get_settings().set_cache_ttl)
 
-router = APIRouter(prefix="/api", tags=["sets"])
+router = APIRouter(prefix="/api", tags=["sets"], route_class=ProfiledRoute)
+
+QUALITY_MAP = {
+    ReviewQualityEnum.AGAIN: ReviewQuality.AGAIN,
+    ReviewQualityEnum.HARD: ReviewQuality.HARD,
+    ReviewQualityEnum.GOOD: ReviewQuality.GOOD,
+    ReviewQualityEnum.EASY: ReviewQuality.EASY
+}
+
+
+async def _get_set_or_404(set_id: int, db: AsyncSession) -> SetModel:
+    """Load a set with its cards and their progress in one query, or raise 404"""
+    result = await db.execute(
+        select(SetModel)
+        .options(joinedload(SetModel.cards).joinedload(CardModel.progress))
+        .where(SetModel.id == set_id)
+        .execution_options(populate_existing=True)
+    )
+    set_obj = result.unique().scalar_one_or_none()
+
+    if not set_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Set with id {set_id} not found"
+        )
+
+    return set_obj
+
+
+async def _ensure_set_exists(set_id: int, db: AsyncSession) -> None:
+    """Raise 404 if the set does not exist"""
+    set_exists = await db.scalar(select(SetModel.id).where(SetModel.id == set_id))
+
+    if set_exists is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Set with id {set_id} not found"
+        )
+
+
+async def _get_set_version_or_404(set_id: int, db: AsyncSession) -> int:
+    """Return the set's version counter, or raise 404"""
+    version = await db.scalar(select(SetModel.version).where(SetModel.id == set_id))
+
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Set with id {set_id} not found"
+        )
+
+    return version
+
+
+async def _bump_set_versions(db: AsyncSession, set_ids) -> None:
+    """Invalidate the ETags and cached payloads of the given sets. Runs in the caller's transaction."""
+    # Dropping the entries before the commit is safe: a payload cached in between
+    # carries the old version and is rejected once the new one is visible
+    set_cache.invalidate(set_ids)
+    await db.execute(
+        update(SetModel)
+        .where(SetModel.id.in_(set_ids))
+        # updated_at is listed so its onupdate does not fire for e.g. reviews
+        .values(version=SetModel.version + 1, updated_at=SetModel.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _bump_set_version_or_404(db: AsyncSession, set_id: int, **values) -> None:
+    """
+    _bump_set_versions for one set, also writing `values` to it in the same
+    statement. Raises 404 when no row was updated, so no separate existence check is needed.
+    """
+    set_cache.invalidate([set_id])
+    result = await db.execute(
+        update(SetModel)
+        .where(SetModel.id == set_id)
+        .values({"version": SetModel.version + 1, "updated_at": SetModel.updated_at, **values})
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Set with id {set_id} not found"
+        )
+
+
+def _check_etag(request: Request, response: Response, set_id: int, version: int, *extra) -> Optional[Response]:
+    """
+    Compare If-None-Match with the weak ETag of a set-derived representation.
+
+    The ETag covers the set version, the query string and `extra`
+    (e.g. today's date for date-dependent payloads).
+
+    Returns:
+        A 304 response if the client's copy is current, otherwise None
+        after putting the ETag on `response`
+    """
+    variant = f"{request.url.path}?{request.url.query}|" + "|".join(str(part) for part in extra)
+    etag = f'W/"{set_id}.{version}.{hashlib.sha1(variant.encode()).hexdigest()[:12]}"'
+    # no-cache: browsers keep the body but revalidate with If-None-Match every time
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in candidates or etag.removeprefix("W/") in candidates:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+def _etag_headers(response: Response) -> dict:
+    """ETag and Cache-Control that _check_etag put on the injected response"""
+    return {name: response.headers[name] for name in ("ETag", "Cache-Control")}
+
+
+def _encode_cursor(*values) -> str:
+    """Pack the sort key of the last returned row into an opaque token"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _decode_cursor(token: str, types: tuple) -> list:
+    """
+    Unpack a token made by _encode_cursor, or raise 400.
+    `types` gives the expected type (or tuple of types) of each value.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except ValueError:
+        values = None
+
+    if (
+            not isinstance(values, list)
+            or len(values) != len(types)
+            # bool is an int subclass but never part of a sort key
+            or not all(isinstance(v, t) and not isinstance(v, bool) for v, t in zip(values, types))
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+    return values
+
+
+def _set_created_at_key(db: AsyncSession):
+    """
+    Sortable form of sets.created_at for keyset pagination.
+    SQLite keeps timestamps as text with or without microseconds,
+    so both sides of the comparison are normalized through datetime().
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return func.datetime(SetModel.created_at)
+    return SetModel.created_at
 
 
 @router.get("/sets", response_model=list[SetListItem])
-async def get_sets(db: Session = Depends(get_db)):
-    """Get all sets with card count"""
-    sets = db.query(
+async def get_sets(
+        response: Response,
+        limit: Optional[int] = Query(default=None, ge=1, le=500),
+        after: Optional[str] = None,
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Get all sets with card count, newest first.
+    With `limit`, returns one page and puts the cursor for the next one
+    in the X-Next-Cursor header; pass it back as `after`.
+    """
+    created_at_key = _set_created_at_key(db)
+
+    query = select(
         SetModel.id,
         SetModel.title,
         SetModel.description,
         SetModel.created_at,
-        func.count(CardModel.id).label("card_count")
-    ).outerjoin(CardModel).group_by(SetModel.id).order_by(SetModel.created_at.desc()).all()
+        func.count(CardModel.id).label("card_count"),
+        created_at_key.label("created_at_key")
+    ).outerjoin(CardModel).group_by(SetModel.id).order_by(created_at_key.desc(), SetModel.id.desc())
+
+    if after is not None:
+        after_created_at, after_id = _decode_cursor(after, (str, int))
+        if db.get_bind().dialect.name != "sqlite":
+            try:
+                after_created_at = datetime.fromisoformat(after_created_at)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid pagination cursor"
+                )
+        query = query.where(tuple_(created_at_key, SetModel.id) < tuple_(after_created_at, after_id))
+
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    result = await db.execute(query)
+    sets = result.all()
+
+    if limit is not None and len(sets) > limit:
+        sets = sets[:limit]
+        last = sets[-1]
+        key = last.created_at_key
+        response.headers["X-Next-Cursor"] = _encode_cursor(
+            key if isinstance(key, str) else key.isoformat(), last.id
+        )
+
+    if get_settings().fast_serialization:
+        return json_response([
+            {
+                "title": s.title, "description": s.description, "id": s.id,
+                "card_count": s.card_count, "created_at": s.created_at
+            }
+            for s in sets
+        ], response)
 
     return [
         SetListItem(
@@ -40,51 +281,147 @@ async def get_sets(db: Session = Depends(get_db)):
 
 
 @router.post("/sets", response_model=Set, status_code=status.HTTP_201_CREATED)
-async def create_set(set_data: SetCreate, db: Session = Depends(get_db)):
-    """Create a new set with cards"""
+async def create_set(set_data: SetCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Create a new set with cards.
+    Cards are written with a single Core executemany insert; at most
+    MAX_CARDS_PER_REQUEST cards are accepted per request.
+    """
     new_set = SetModel(
         title=set_data.title,
         description=set_data.description
     )
     db.add(new_set)
-    db.flush()
-
-    for idx, card_data in enumerate(set_data.cards):
-        card = CardModel(
-            set_id=new_set.id,
-            term=card_data.term,
-            definition=card_data.definition,
-            order=card_data.order if card_data.order >= 0 else idx
-        )
-        db.add(card)
+    await db.flush()
+
+    await db.execute(insert(CardModel.__table__), [
+        {
+            "set_id": new_set.id,
+            "term": card_data.term,
+            "definition": card_data.definition,
+            "order": card_data.order if card_data.order >= 0 else idx
+        }
+        for idx, card_data in enumerate(set_data.cards)
+    ])
 
-    db.commit()
-    db.refresh(new_set)
+    await db.commit()
 
-    return new_set
+    return await _get_set_or_404(new_set.id, db)
 
 
-@router.get("/sets/{set_id}", response_model=Set)
-async def get_set(set_id: int, db: Session = Depends(get_db)):
-    """Get a specific set with all its cards and their progress"""
-    set_obj = db.query(SetModel).options(
-        joinedload(SetModel.cards).joinedload(CardModel.progress)
-    ).filter(SetModel.id == set_id).first()
+async def _discard_imported_sets(db: AsyncSession, set_ids: list[int]) -> None:
+    """Remove sets an aborted import already committed (they have no reviews yet)"""
+    await db.rollback()
+    await db.execute(delete(CardProgress).where(CardProgress.set_id.in_(set_ids)))
+    await db.execute(delete(CardModel).where(CardModel.set_id.in_(set_ids)))
+    await db.execute(delete(SetModel).where(SetModel.id.in_(set_ids)))
+    await db.commit()
 
-    if not set_obj:
+
+@router.post("/sets/import", response_model=SetImportResult, status_code=status.HTTP_201_CREATED)
+async def import_set(
+        request: Request,
+        title: str = Query(..., min_length=1, max_length=255),
+        description: Optional[str] = None,
+        format: DeckFormat = DeckFormat.TEXT,
+        separator: str = Query("\t", min_length=1, max_length=10),
+        has_header: bool = False,
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a set from an uploaded deck sent as the raw request body
+    (CSV, TSV, or term<separator>definition lines as exported by Anki).
+
+    The body is parsed while it arrives and cards are inserted and committed
+    every import_batch_size rows, so memory use does not depend on the file
+    size and the set's card count grows while the import runs. Rows that
+    cannot be imported are skipped and reported with their line number.
+    If the upload cannot be read to the end the partial set is removed.
+    """
+    batch_size = get_settings().import_batch_size
+
+    new_set = SetModel(title=title, description=description)
+    db.add(new_set)
+    await db.flush()
+    set_id = new_set.id
+
+    batch = []
+    errors = []
+    rows_read = imported = failed = 0
+
+    async def flush_batch():
+        nonlocal batch, imported
+        if batch:
+            await db.execute(insert(CardModel.__table__), batch)
+            imported += len(batch)
+            batch = []
+            # The set may already have been fetched (and cached by ETag) mid-import
+            await _bump_set_versions(db, [set_id])
+        await db.commit()
+        logger.info("Import into set %s: %d rows read, %d cards imported, %d failed",
+                    set_id, rows_read, imported, failed)
+
+    try:
+        async for row in iter_deck_rows(request.stream(), format, separator, has_header):
+            rows_read += 1
+            error = row.error
+            if error is None:
+                try:
+                    card = CardCreate(term=row.term, definition=row.definition, order=imported + len(batch))
+                except ValidationError as e:
+                    first = e.errors()[0]
+                    error = f"{'.'.join(map(str, first['loc']))}: {first['msg']}"
+            if error is not None:
+                failed += 1
+                if len(errors) < IMPORT_ERROR_LIMIT:
+                    errors.append(SetImportRowError(line=row.line, detail=error))
+                continue
+
+            batch.append({"set_id": set_id, "term": card.term, "definition": card.definition, "order": card.order})
+            if len(batch) >= batch_size:
+                await flush_batch()
+
+        await flush_batch()
+        if imported == 0:
+            raise DeckImportError(errors[0].line if errors else 1,
+                                  errors[0].detail if errors else "No cards found")
+    except (DeckImportError, ClientDisconnect) as e:
+        await _discard_imported_sets(db, [set_id])
+        if isinstance(e, ClientDisconnect):
+            raise
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Set with id {set_id} not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Import failed: {e}"
         )
 
-    return set_obj
+    return SetImportResult(
+        set_id=set_id,
+        rows_read=rows_read,
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        errors_truncated=failed > len(errors)
+    )
 
 
-@router.get("/sets/{set_id}/study", response_model=list[Card])
-async def get_study_cards(set_id: int, db: Session = Depends(get_db)):
-    """Get cards from a set in random order for studying"""
-    # Check if set exists
-    set_obj = db.query(SetModel).filter(SetModel.id == set_id).first()
+@router.get("/sets/{set_id}", response_model=Set)
+async def get_set(
+        set_id: int,
+        request: Request,
+        response: Response,
+        limit: Optional[int] = Query(default=None, ge=1, le=1000),
+        after: Optional[str] = None,
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a specific set with all its cards and their progress.
+    With `limit`, only one page of cards (in deck order) is returned and
+    `next_cursor` points at the next one; pass it back as `after`.
+    Answers 304 when If-None-Match carries the current ETag. Full sets are
+    served from the in-process set_cache while their version is unchanged.
+    """
+    # The set row serves both the ETag and the header of a paginated response
+    set_obj = await db.get(SetModel, set_id)
 
     if not set_obj:
         raise HTTPException(
@@ -92,8 +429,62 @@ async def get_study_cards(set_id: int, db: Session = Depends(get_db)):
             detail=f"Set with id {set_id} not found"
         )
 
+    version = set_obj.version
+    not_modified = _check_etag(request, response, set_id, version)
+    if not_modified:
+        return not_modified
+
+    if limit is None and after is None:
+        payload = set_cache.get(set_id, version)
+        if payload is None:
+            set_obj = await _get_set_or_404(set_id, db)
+            payload = Set.model_validate(set_obj).model_dump_json().encode()
+            set_cache.put(set_id, set_obj.version, payload)
+        return Response(content=payload, media_type="application/json", headers=_etag_headers(response))
+
+    query = (
+        select(CardModel)
+        .options(joinedload(CardModel.progress))
+        .where(CardModel.set_id == set_id)
+        .order_by(CardModel.order, CardModel.id)
+    )
+
+    if after is not None:
+        after_order, after_id = _decode_cursor(after, (int, int))
+        query = query.where(tuple_(CardModel.order, CardModel.id) > tuple_(after_order, after_id))
+
+    page_size = limit or get_settings().set_cards_page_size
+    result = await db.execute(query.limit(page_size + 1))
+    cards = result.scalars().all()
+
+    next_cursor = None
+    if len(cards) > page_size:
+        cards = cards[:page_size]
+        next_cursor = _encode_cursor(cards[-1].order, cards[-1].id)
+
+    return {
+        "id": set_obj.id,
+        "title": set_obj.title,
+        "description": set_obj.description,
+        "created_at": set_obj.created_at,
+        "updated_at": set_obj.updated_at,
+        "cards": cards,
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/sets/{set_id}/study", response_model=list[Card])
+async def get_study_cards(set_id: int, db: AsyncSession = Depends(get_db)):
+    """Get cards from a set in random order for studying"""
     # Get all cards from the set
-    cards = db.query(CardModel).filter(CardModel.set_id == set_id).all()
+    result = await db.execute(
+        select(CardModel).options(joinedload(CardModel.progress)).where(CardModel.set_id == set_id)
+    )
+    cards = result.scalars().all()
+
+    if not cards:
+        # No cards: either an empty set or a missing one
+        await _ensure_set_exists(set_id, db)
 
     # Shuffle cards randomly
     cards_list = list(cards)
@@ -102,110 +493,254 @@ async def get_study_cards(set_id: int, db: Session = Depends(get_db)):
     return cards_list
 
 
-@router.put("/sets/{set_id}", response_model=Set)
-async def update_set(set_id: int, set_data: SetCreate, db: Session = Depends(get_db)):
-    """Update an existing set with cards"""
-    # Check if set exists
-    set_obj = db.query(SetModel).filter(SetModel.id == set_id).first()
+def _check_card_ids(cards: list[CardUpdate], deleted_card_ids: Iterable[int] = ()) -> None:
+    """Raise 400 if a card id is listed twice, or both edited and deleted"""
+    listed_ids = Counter(card.id for card in cards if card.id is not None)
+    repeated_ids = sorted(card_id for card_id, count in listed_ids.items() if count > 1)
+    if repeated_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cards {repeated_ids} are listed more than once"
+        )
 
-    if not set_obj:
+    conflicting_ids = sorted(listed_ids.keys() & set(deleted_card_ids))
+    if conflicting_ids:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Set with id {set_id} not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cards {conflicting_ids} are both edited and deleted"
         )
 
-    # Update set fields
-    set_obj.title = set_data.title
-    set_obj.description = set_data.description
 
-    # Delete all existing cards (cascade will handle this)
-    db.query(CardModel).filter(CardModel.set_id == set_id).delete()
+async def _apply_card_changes(
+        db: AsyncSession,
+        set_id: int,
+        cards: list[CardUpdate],
+        deleted_card_ids: Optional[set[int]] = None
+) -> None:
+    """
+    Apply card edits to a set with bulk statements, in the caller's transaction.
+
+    Cards with an id are updated only if a field changed, cards without one are
+    inserted. When `deleted_card_ids` is None every card not listed is deleted
+    (full replacement); otherwise only those ids are. Kept cards keep their id
+    and therefore their progress and review history.
+    """
+    result = await db.execute(
+        select(CardModel.id, CardModel.term, CardModel.definition, CardModel.order)
+        .where(CardModel.set_id == set_id)
+    )
+    existing = {row.id: row for row in result}
 
-    # Add new cards
-    for idx, card_data in enumerate(set_data.cards):
-        card = CardModel(
-            set_id=set_id,
-            term=card_data.term,
-            definition=card_data.definition,
-            order=card_data.order if card_data.order >= 0 else idx
+    referenced_ids = {card.id for card in cards if card.id is not None} | (deleted_card_ids or set())
+    unknown_ids = sorted(referenced_ids - existing.keys())
+    if unknown_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cards {unknown_ids} do not belong to set {set_id}"
         )
-        db.add(card)
 
-    db.commit()
-    db.refresh(set_obj)
+    inserts = []
+    updates = []
+    for idx, card_data in enumerate(cards):
+        values = {
+            "term": card_data.term,
+            "definition": card_data.definition,
+            "order": card_data.order if card_data.order >= 0 else idx
+        }
+        if card_data.id is None:
+            inserts.append({"set_id": set_id, **values})
+        else:
+            current = existing[card_data.id]
+            if (current.term, current.definition, current.order) != tuple(values.values()):
+                updates.append({"id": card_data.id, **values})
 
-    return set_obj
+    if deleted_card_ids is None:
+        deleted_card_ids = existing.keys() - {card.id for card in cards}
+
+    if deleted_card_ids:
+        # Dependent rows are removed explicitly; SQLite does not enforce ON DELETE CASCADE here
+        await db.execute(delete(ReviewLog).where(ReviewLog.card_id.in_(deleted_card_ids)))
+        await db.execute(delete(CardProgress).where(CardProgress.card_id.in_(deleted_card_ids)))
+        await db.execute(delete(CardModel).where(CardModel.id.in_(deleted_card_ids)))
+
+    if updates:
+        await db.execute(update(CardModel), updates)
+
+    if inserts:
+        await db.execute(insert(CardModel), inserts)
+
+
+@router.put("/sets/{set_id}", response_model=Set)
+async def update_set(set_id: int, set_data: SetUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Replace a set's title, description and cards.
+    Cards sent with their id are kept (with their progress), cards without
+    an id are added and cards left out are deleted.
+    """
+    _check_card_ids(set_data.cards)
+    # Update set fields (404 if the set does not exist)
+    await _bump_set_version_or_404(
+        db, set_id, title=set_data.title, description=set_data.description, updated_at=func.now()
+    )
+
+    await _apply_card_changes(db, set_id, set_data.cards)
+
+    await db.commit()
+
+    return await _get_set_or_404(set_id, db)
+
+
+@router.patch("/sets/{set_id}", response_model=Set)
+async def patch_set(set_id: int, set_data: SetPatch, db: AsyncSession = Depends(get_db)):
+    """
+    Partially update a set: only the given fields and cards are touched,
+    so the cost follows the size of the edit rather than the size of the set.
+    """
+    values = {"updated_at": func.now()}
+    if set_data.title is not None:
+        values["title"] = set_data.title
+    if "description" in set_data.model_fields_set:
+        values["description"] = set_data.description
+    _check_card_ids(set_data.cards, set_data.deleted_card_ids)
+    # 404 if the set does not exist
+    await _bump_set_version_or_404(db, set_id, **values)
+
+    await _apply_card_changes(db, set_id, set_data.cards, set(set_data.deleted_card_ids))
+
+    await db.commit()
+
+    return await _get_set_or_404(set_id, db)
 
 
 @router.delete("/sets/{set_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_set(set_id: int, db: Session = Depends(get_db)):
-    """Delete a set and all its cards"""
-    set_obj = db.query(SetModel).filter(SetModel.id == set_id).first()
+async def delete_set(set_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Delete a set and all its cards.
+    A fixed number of set-wide statements, however many cards the set has.
+    """
+    result = await db.execute(delete(SetModel).where(SetModel.id == set_id))
 
-    if not set_obj:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Set with id {set_id} not found"
         )
 
-    db.delete(set_obj)
-    db.commit()
+    # Dependent rows are removed explicitly; SQLite does not enforce ON DELETE CASCADE here
+    await db.execute(delete(ReviewLog).where(
+        ReviewLog.card_id.in_(select(CardModel.id).where(CardModel.set_id == set_id))
+    ))
+    for model in (CardProgress, CardModel, SetDailyActivity):
+        await db.execute(delete(model).where(model.set_id == set_id))
+    await db.commit()
+    set_cache.invalidate([set_id])
 
     return None
 
 
+# Columns behind a CardWithProgress, for the fast serialization path
+STUDY_CARD_COLUMNS = (
+    CardModel.term, CardModel.definition, CardModel.order, CardModel.id, CardModel.set_id,
+    CardProgress.id.label("progress_id"), CardProgress.ease_factor, CardProgress.interval_days,
+    CardProgress.repetitions, CardProgress.lapses, CardProgress.last_reviewed, CardProgress.next_review
+)
+
+
+def _card_with_progress_dict(row) -> dict:
+    """CardWithProgress from a STUDY_CARD_COLUMNS row, keys in schema order"""
+    progress = None
+    if row.progress_id is not None:
+        progress = {
+            "id": row.progress_id,
+            "card_id": row.id,
+            "ease_factor": row.ease_factor,
+            "interval_days": row.interval_days,
+            "repetitions": row.repetitions,
+            "lapses": row.lapses,
+            "last_reviewed": row.last_reviewed,
+            "next_review": row.next_review
+        }
+    return {
+        "term": row.term, "definition": row.definition, "order": row.order,
+        "id": row.id, "set_id": row.set_id, "progress": progress
+    }
+
+
 @router.get("/sets/{set_id}/study-sr", response_model=StudySessionResponse)
-async def get_study_sr_cards(set_id: int, db: Session = Depends(get_db)):
+async def get_study_sr_cards(
+        set_id: int,
+        request: Request,
+        response: Response,
+        new_limit: Optional[int] = Query(default=None, ge=0, le=1000),
+        review_limit: Optional[int] = Query(default=None, ge=0, le=10000),
+        db: AsyncSession = Depends(get_db)
+):
     """
     Get cards for spaced repetition study session.
-    Returns cards due for review today plus new cards (up to limit).
+    Returns cards due for review today (most overdue first, up to review_limit)
+    plus new cards in deck order (up to new_limit).
+    Limits default to the study_* values in Settings.
+    Answers 304 when If-None-Match carries the current ETag.
     """
-    # Check if set exists
-    set_obj = db.query(SetModel).filter(SetModel.id == set_id).first()
+    today = datetime.now().date()
 
-    if not set_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Set with id {set_id} not found"
+    # Which cards are due changes with the date as well as with the set
+    version = await _get_set_version_or_404(set_id, db)
+    not_modified = _check_etag(request, response, set_id, version, today)
+    if not_modified:
+        return not_modified
+
+    settings = get_settings()
+    new_cards_limit = settings.study_new_cards_limit if new_limit is None else new_limit
+    review_cards_limit = settings.study_review_cap if review_limit is None else review_limit
+
+    today_start = datetime.combine(today, datetime.min.time())
+    tomorrow_start = today_start + timedelta(days=1)
+
+    # Due and overdue cards - a range scan on ix_card_progress_set_id_next_review
+    due_query = (
+        select(CardModel)
+        .join(CardModel.progress)
+        .where(CardProgress.set_id == set_id, CardProgress.next_review < tomorrow_start)
+        .order_by(CardProgress.next_review)
+        .limit(review_cards_limit)
+    )
+
+    # New cards (never reviewed) in deck order - walks ix_cards_set_id_order until the limit is hit
+    new_query = (
+        select(CardModel)
+        .outerjoin(CardModel.progress)
+        .where(
+            CardModel.set_id == set_id,
+            or_(CardProgress.id.is_(None), CardProgress.next_review.is_(None))
         )
+        .order_by(CardModel.order, CardModel.id)
+        .limit(new_cards_limit)
+    )
 
-    today = datetime.now().date()
-    new_cards_limit = 20
-
-    # Get all cards with their progress in one query using eager loading
-    cards = db.query(CardModel).options(
-        joinedload(CardModel.progress)
-    ).filter(CardModel.set_id == set_id).all()
-
-    # Categorize cards
-    overdue_cards = []
-    due_today_cards = []
-    new_cards = []
-
-    for card in cards:
-        if card.progress is None:
-            # New card (never reviewed)
-            new_cards.append(card)
-        else:
-            next_review_date = card.progress.next_review.date() if card.progress.next_review else None
+    if settings.fast_serialization:
+        due_rows = (await db.execute(due_query.with_only_columns(*STUDY_CARD_COLUMNS))).all()
+        new_rows = (await db.execute(new_query.with_only_columns(*STUDY_CARD_COLUMNS))).all()
+        return json_response({
+            "cards": [_card_with_progress_dict(row) for row in (*due_rows, *new_rows)],
+            "stats": {
+                "total_cards": len(due_rows) + len(new_rows),
+                "new_cards": sum(1 for row in new_rows if row.progress_id is None),
+                "review_cards": len(due_rows),
+                "overdue_cards": sum(1 for row in due_rows if row.next_review < today_start)
+            }
+        }, response)
 
-            if next_review_date is None:
-                new_cards.append(card)
-            elif next_review_date < today:
-                # Overdue
-                overdue_cards.append(card)
-            elif next_review_date == today:
-                # Due today
-                due_today_cards.append(card)
+    result = await db.execute(due_query.options(contains_eager(CardModel.progress)))
+    due_cards = result.scalars().all()
 
-    # Sort overdue by how overdue they are (most overdue first)
-    overdue_cards.sort(
-        key=lambda c: (today - c.progress.next_review.date()).days if c.progress and c.progress.next_review else 0,
-        reverse=True
-    )
+    result = await db.execute(new_query.options(contains_eager(CardModel.progress)))
+    new_cards = result.scalars().all()
+
+    overdue_count = sum(1 for c in due_cards if c.progress.next_review < today_start)
 
     # Combine: overdue + due today + new (limited)
-    study_cards = overdue_cards + due_today_cards + new_cards[:new_cards_limit]
+    study_cards = list(due_cards) + list(new_cards)
 
     # Convert to response format
     cards_with_progress = []
@@ -237,77 +772,404 @@ async def get_study_sr_cards(set_id: int, db: Session = Depends(get_db)):
     stats = StudySessionStats(
         total_cards=len(study_cards),
         new_cards=len([c for c in study_cards if c.progress is None]),
-        review_cards=len(overdue_cards) + len(due_today_cards),
-        overdue_cards=len(overdue_cards)
+        review_cards=len(due_cards),
+        overdue_cards=overdue_count
     )
 
     return StudySessionResponse(cards=cards_with_progress, stats=stats)
 
 
-@router.post("/review", response_model=CardProgressResponse)
-async def submit_review(review: ReviewInput, db: Session = Depends(get_db)):
+# Queue positions of GET /api/study/due; due cards come before new ones
+DUE_BUCKET, NEW_BUCKET = 0, 1
+
+
+def _join_first_per_set(db: AsyncSession, query, model, first_rows):
     """
-    Submit a review for a card and update its progress using SM-2 algorithm.
+    Join `query` (selecting from sets) to the rows of `model` whose ids
+    `first_rows` returns for each set: an ordered, limited select of model.id
+    that refers to sets.id. Only those rows are read, not the whole set.
+    PostgreSQL runs it as a LATERAL subquery; SQLite, which has no LATERAL,
+    as a correlated `id IN (...)` list it evaluates once per set.
     """
-    # Check if card exists
-    card = db.query(CardModel).filter(CardModel.id == review.card_id).first()
+    first_rows = first_rows.correlate(SetModel)
+    if db.get_bind().dialect.name == "sqlite":
+        return query.join(model, model.id.in_(first_rows.scalar_subquery()))
+    first = first_rows.lateral()
+    return query.join(first, true()).join(model, model.id == first.c.id)
 
-    if not card:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Card with id {review.card_id} not found"
+
+def _reviewed_from_new(card_id, since: datetime):
+    """
+    review_log rows of `card_id` since `since` that were logged from a new
+    card's state (interval 0, default ease; see app.services.reschedule)
+    """
+    log = aliased(ReviewLog)
+    return select(log.id).where(
+        log.card_id == card_id,
+        log.ts >= since,
+        log.prev_interval == 0,
+        log.prev_ease.in_((0, SpacedRepetitionService.DEFAULT_EASE_FACTOR))
+    )
+
+
+@router.get("/study/due", response_model=StudyQueue)
+async def get_due_queue(
+        new_limit: Optional[int] = Query(default=None, ge=0, le=1000),
+        review_limit: Optional[int] = Query(default=None, ge=0, le=10000),
+        limit: int = Query(default=100, ge=1, le=1000),
+        after: Optional[str] = None,
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    One study queue over all sets: cards due today (most overdue first),
+    then new cards taking turns between sets, each in deck order.
+    `review_limit` and `new_limit` cap the cards taken from each set and
+    default to the study_* values in Settings. Returns `limit` cards;
+    `next_cursor` points at the next page, pass it back as `after`.
+    Cards reviewed between pages do not move the rest of the queue, so a
+    session that reviews each page before fetching the next sees every card
+    once, and the per-set caps hold for the whole session.
+    """
+    settings = get_settings()
+    new_cards_limit = settings.study_new_cards_limit if new_limit is None else new_limit
+    review_cards_limit = settings.study_review_cap if review_limit is None else review_limit
+
+    now = datetime.now()
+    today_start = datetime.combine(now.date(), datetime.min.time())
+    tomorrow_start = today_start + timedelta(days=1)
+
+    bucket, position, started_at = DUE_BUCKET, None, None
+    if after is not None:
+        bucket, *position, started_at = _decode_cursor(after, (int, (str, int), int, str))
+        try:
+            started_at = datetime.fromisoformat(started_at)
+            if bucket == DUE_BUCKET:
+                position[0] = datetime.fromisoformat(position[0])
+            elif bucket != NEW_BUCKET or not isinstance(position[0], int):
+                raise ValueError(bucket)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+
+    # Due cards, most overdue first: a next_review range on ix_card_progress_set_id_next_review per set
+    first_due = (
+        select(CardProgress.id)
+        .where(CardProgress.set_id == SetModel.id, CardProgress.next_review < tomorrow_start)
+        .order_by(CardProgress.next_review, CardProgress.id)
+        .limit(review_cards_limit)
+    )
+    # Cards that were due when the queue was first fetched and have been
+    # reviewed since still use up their set's review_limit
+    reviewed_due = literal(0)
+    if started_at is not None:
+        reviewed_due = (
+            select(func.count(func.distinct(ReviewLog.card_id)))
+            .join(CardModel, CardModel.id == ReviewLog.card_id)
+            .where(
+                CardModel.set_id == SetModel.id,
+                ReviewLog.ts >= started_at,
+                ~_reviewed_from_new(ReviewLog.card_id, started_at).exists()
+            )
+            .correlate(SetModel)
+            .scalar_subquery()
         )
+    due = _join_first_per_set(db, select(
+        CardProgress.id,
+        CardProgress.card_id,
+        CardProgress.next_review,
+        func.row_number().over(
+            partition_by=CardProgress.set_id, order_by=(CardProgress.next_review, CardProgress.id)
+        ).label("set_rank"),
+        reviewed_due.label("reviewed")
+    ).select_from(SetModel), CardProgress, first_due).subquery()
+    due_page = select(
+        literal(DUE_BUCKET).label("bucket"), due.c.card_id, due.c.next_review.label("due_at"),
+        literal(0).label("position"), due.c.id.label("tiebreak")
+    )
+    if started_at is not None:
+        due_page = due_page.where(due.c.set_rank + due.c.reviewed <= review_cards_limit)
 
-    # Get or create progress
+    # New cards in deck order (ix_cards_set_id_order), dealt out one per set per round.
+    # NOT EXISTS rather than an outer join so PostgreSQL stops after the limit.
+    scheduled = select(CardProgress.id).where(
+        CardProgress.card_id == CardModel.id, CardProgress.next_review.is_not(None)
+    )
+    is_new = ~scheduled.exists()
+    # Rounds are ranked over the cards that were new when the queue was first
+    # fetched, so reviewing a page does not shift the ranks the cursor points at
+    was_new = is_new
+    if started_at is not None:
+        was_new = or_(is_new, _reviewed_from_new(CardModel.id, started_at).exists())
+    first_new = (
+        select(CardModel.id)
+        .where(CardModel.set_id == SetModel.id, was_new)
+        .order_by(CardModel.order, CardModel.id)
+        .limit(new_cards_limit)
+    )
+    new = _join_first_per_set(db, select(
+        CardModel.id,
+        CardModel.set_id,
+        func.row_number().over(
+            partition_by=CardModel.set_id, order_by=(CardModel.order, CardModel.id)
+        ).label("set_rank"),
+        is_new.label("is_new")
+    ).select_from(SetModel), CardModel, first_new).subquery()
+    new_page = select(
+        literal(NEW_BUCKET).label("bucket"), new.c.id.label("card_id"), null().label("due_at"),
+        new.c.set_rank.label("position"), new.c.set_id.label("tiebreak")
+    )
+    if started_at is not None:
+        new_page = new_page.where(new.c.is_new)
+
+    # Queue rows sort by (bucket, due_at, position, tiebreak)
+    if bucket == DUE_BUCKET and position is not None:
+        due_page = due_page.where(tuple_(due.c.next_review, due.c.id) > tuple_(*position))
+    elif bucket == NEW_BUCKET:
+        due_page = None
+        new_page = new_page.where(tuple_(new.c.set_rank, new.c.set_id) > tuple_(*position))
+
+    queue = new_page if due_page is None else union_all(due_page, new_page)
+    # Only the page is joined to cards and progress
+    queue = queue.order_by("bucket", "due_at", "position", "tiebreak").limit(limit + 1).subquery()
+    result = await db.execute(
+        select(*STUDY_CARD_COLUMNS, queue.c.bucket, queue.c.position, queue.c.tiebreak)
+        .select_from(queue)
+        .join(CardModel, CardModel.id == queue.c.card_id)
+        .outerjoin(CardProgress, CardProgress.card_id == CardModel.id)
+        .order_by(queue.c.bucket, queue.c.due_at, queue.c.position, queue.c.tiebreak)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        started_at = (started_at or now).isoformat()
+        if last.bucket == DUE_BUCKET:
+            next_cursor = _encode_cursor(DUE_BUCKET, last.next_review.isoformat(), last.tiebreak, started_at)
+        else:
+            next_cursor = _encode_cursor(NEW_BUCKET, last.position, last.tiebreak, started_at)
+
+    cards = [_card_with_progress_dict(row) for row in rows]
+    if settings.fast_serialization:
+        return json_response({"cards": cards, "next_cursor": next_cursor})
+    return {"cards": cards, "next_cursor": next_cursor}
+
+
+def _apply_review(card: CardModel, quality: ReviewQualityEnum, db: AsyncSession) -> tuple[CardProgress, dict]:
+    """
+    Get or create the card's progress and run the SM-2 update on it.
+
+    Returns:
+        The updated progress and the matching review_log row values
+    """
     progress = card.progress
     if progress is None:
         progress = CardProgress(
             card_id=card.id,
-            ease_factor=2.5,
+            set_id=card.set_id,
+            ease_factor=SpacedRepetitionService.DEFAULT_EASE_FACTOR,
             interval_days=0,
             repetitions=0,
             lapses=0
         )
+        card.progress = progress
         db.add(progress)
-        db.flush()
-
-    # Convert quality string to enum
-    quality_map = {
-        "again": ReviewQuality.AGAIN,
-        "hard": ReviewQuality.HARD,
-        "good": ReviewQuality.GOOD,
-        "easy": ReviewQuality.EASY
-    }
-    quality_enum = quality_map[review.quality.value]
+
+    prev_interval, prev_ease = progress.interval_days, progress.ease_factor
 
     # Calculate next review using SM-2 algorithm
-    updated_progress = SpacedRepetitionService.calculate_next_review(progress, quality_enum)
+    progress = SpacedRepetitionService.calculate_next_review(progress, QUALITY_MAP[quality])
+
+    log_entry = {
+        "card_id": card.id,
+        "ts": progress.last_reviewed,
+        "quality": QUALITY_MAP[quality].value,
+        "prev_interval": prev_interval,
+        "new_interval": progress.interval_days,
+        "prev_ease": prev_ease,
+        "new_ease": progress.ease_factor
+    }
+
+    return progress, log_entry
+
+
+async def _record_review_log(db: AsyncSession, entries: list[dict]) -> None:
+    """Append reviews to review_log with a single executemany insert in the caller's transaction"""
+    if get_settings().review_log_enabled:
+        await db.execute(insert(ReviewLog.__table__), entries)
+
+
+async def _record_activity(db: AsyncSession, reviews: list[tuple[CardModel, ReviewQualityEnum]]) -> None:
+    """
+    Add reviews to the per-set daily rollup with one upsert.
+    Runs in the caller's transaction, so the rollup commits together with the progress.
+    A review counts as correct unless it was rated "again".
+    """
+    today = datetime.now().date()
+    counts = {}
+    for card, quality in reviews:
+        review_count, correct_count = counts.get(card.set_id, (0, 0))
+        counts[card.set_id] = (review_count + 1, correct_count + (quality != ReviewQualityEnum.AGAIN))
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    table = SetDailyActivity.__table__
+    stmt = dialect.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.set_id, table.c.day],
+        set_={
+            "review_count": table.c.review_count + stmt.excluded.review_count,
+            "correct_count": table.c.correct_count + stmt.excluded.correct_count
+        }
+    )
+
+    await db.execute(stmt, [
+        {"set_id": set_id, "day": today, "review_count": review_count, "correct_count": correct_count}
+        for set_id, (review_count, correct_count) in counts.items()
+    ])
 
-    db.commit()
-    db.refresh(updated_progress)
+
+@router.post("/review", response_model=CardProgressResponse)
+async def submit_review(review: ReviewInput, db: AsyncSession = Depends(get_db)):
+    """
+    Submit a review for a card and update its progress using SM-2 algorithm.
+    """
+    # Check if card exists
+    result = await db.execute(
+        select(CardModel).options(joinedload(CardModel.progress)).where(CardModel.id == review.card_id)
+    )
+    card = result.scalar_one_or_none()
+
+    if not card:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Card with id {review.card_id} not found"
+        )
+
+    updated_progress, log_entry = _apply_review(card, review.quality, db)
+    await _record_activity(db, [(card, review.quality)])
+    await _record_review_log(db, [log_entry])
+    await _bump_set_versions(db, [card.set_id])
+
+    await db.commit()
+    REVIEWS.inc(review.quality.value)
 
     return updated_progress
 
 
+@router.post("/reviews/batch", response_model=ReviewBatchResponse)
+async def submit_reviews_batch(batch: ReviewBatchInput, db: AsyncSession = Depends(get_db)):
+    """
+    Submit several reviews at once, e.g. a whole study session.
+    All cards are loaded in one query and saved in one transaction.
+    Unknown cards are reported per item instead of failing the batch.
+    """
+    card_ids = {review.card_id for review in batch.reviews}
+
+    result = await db.execute(
+        select(CardModel).options(joinedload(CardModel.progress)).where(CardModel.id.in_(card_ids))
+    )
+    cards = {card.id: card for card in result.scalars()}
+
+    # Reviews are applied in submission order, so repeated cards progress step by step
+    outcomes = []
+    log_entries = []
+    for review in batch.reviews:
+        card = cards.get(review.card_id)
+
+        if card is None:
+            outcomes.append((review.card_id, None))
+        else:
+            progress, log_entry = _apply_review(card, review.quality, db)
+            log_entries.append(log_entry)
+            # Snapshot now - a later review of the same card mutates the same object
+            outcomes.append((review.card_id, {
+                column: getattr(progress, column)
+                for column in CardProgressResponse.model_fields if column != "id"
+            }))
+
+    applied = [(cards[review.card_id], review.quality) for review in batch.reviews if review.card_id in cards]
+    if applied:
+        await _record_activity(db, applied)
+        await _record_review_log(db, log_entries)
+        await _bump_set_versions(db, {card.set_id for card, _ in applied})
+
+    await db.commit()
+    for _, quality in applied:
+        REVIEWS.inc(quality.value)
+
+    results = []
+    for card_id, values in outcomes:
+        if values is None:
+            results.append(ReviewBatchItemResult(
+                card_id=card_id,
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Card with id {card_id} not found"
+            ))
+        else:
+            results.append(ReviewBatchItemResult(
+                card_id=card_id,
+                status_code=status.HTTP_200_OK,
+                progress=CardProgressResponse(id=cards[card_id].progress.id, **values)
+            ))
+
+    return ReviewBatchResponse(
+        results=results,
+        succeeded=sum(1 for r in results if r.progress is not None),
+        failed=sum(1 for r in results if r.progress is None)
+    )
+
+
 @router.get("/sets/{set_id}/stats", response_model=SetStats)
-async def get_set_stats(set_id: int, db: Session = Depends(get_db)):
+async def get_set_stats(
+        set_id: int,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_db)
+):
     """
     Get learning statistics for a set.
+    Computed with SQL aggregates, so the cost does not grow with Python-side loops over cards.
+    Answers 304 when If-None-Match carries the current ETag.
     """
-    # Check if set exists
-    set_obj = db.query(SetModel).filter(SetModel.id == set_id).first()
+    today = datetime.now().date()
+    week_ago = today - timedelta(days=7)
 
-    if not set_obj:
+    # Review windows and the streak change with the date as well as with the set
+    version = await _get_set_version_or_404(set_id, db)
+    not_modified = _check_etag(request, response, set_id, version, today)
+    if not_modified:
+        return not_modified
+
+    # Status buckets mirror SpacedRepetitionService.get_card_status
+    is_new = or_(CardProgress.id.is_(None), CardProgress.repetitions == 0)
+    is_learning = or_(CardProgress.repetitions < 3, CardProgress.ease_factor < 2.0)
+
+    # Outer joins from sets, so a missing set yields no row at all
+    result = await db.execute(
+        select(
+            func.count(CardModel.id).label("total_cards"),
+            func.sum(case((is_new, 1), else_=0)).label("new_cards"),
+            func.sum(case((is_new, 0), (is_learning, 1), else_=0)).label("learning_cards"),
+            func.avg(CardProgress.ease_factor).label("average_ease_factor"),
+        )
+        .select_from(SetModel)
+        .outerjoin(CardModel, CardModel.set_id == SetModel.id)
+        .outerjoin(CardProgress, CardProgress.card_id == CardModel.id)
+        .where(SetModel.id == set_id)
+        .group_by(SetModel.id)
+    )
+    row = result.one_or_none()
+
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Set with id {set_id} not found"
         )
 
-    # Get all cards with progress
-    cards = db.query(CardModel).filter(CardModel.set_id == set_id).all()
-    total_cards = len(cards)
-
-    if total_cards == 0:
+    if row.total_cards == 0:
         return SetStats(
             total_cards=0,
             new_cards=0,
@@ -321,82 +1183,40 @@ async def get_set_stats(set_id: int, db: Session = Depends(get_db)):
             accuracy=0.0
         )
 
-    # Categorize cards by status
-    new_cards = 0
-    learning_cards = 0
-    mature_cards = 0
-    ease_factors = []
-
-    for card in cards:
-        if card.progress:
-            status = SpacedRepetitionService.get_card_status(card.progress)
-            ease_factors.append(card.progress.ease_factor)
-
-            if status == 'new':
-                new_cards += 1
-            elif status == 'learning':
-                learning_cards += 1
-            else:  # mature
-                mature_cards += 1
-        else:
-            new_cards += 1
-
-    # Calculate average ease factor
-    avg_ease_factor = sum(ease_factors) / len(ease_factors) if ease_factors else 2.5
-
-    # Calculate review counts
-    today = datetime.now().date()
-    week_ago = today - timedelta(days=7)
+    avg_ease_factor = row.average_ease_factor if row.average_ease_factor is not None else 2.5
 
-    reviews_today = 0
-    reviews_this_week = 0
-    reviews_total = 0
-
-    good_reviews = 0  # Good + Easy
-    total_reviews = 0
-
-    for card in cards:
-        if card.progress and card.progress.last_reviewed:
-            reviews_total += card.progress.repetitions
-            review_date = card.progress.last_reviewed.date()
-
-            if review_date == today:
-                reviews_today += 1
-            if review_date >= week_ago:
-                reviews_this_week += 1
+    # Review counts, accuracy and streak come from the daily rollup, newest day first
+    result = await db.execute(
+        select(SetDailyActivity.day, SetDailyActivity.review_count, SetDailyActivity.correct_count)
+        .where(SetDailyActivity.set_id == set_id)
+        .order_by(SetDailyActivity.day.desc())
+    )
+    activity = result.all()
 
-            # Calculate accuracy (Good/Easy vs Again/Hard)
-            # We approximate: if repetitions > lapses, it's mostly good
-            total_reviews += card.progress.repetitions + card.progress.lapses
-            good_reviews += card.progress.repetitions
+    reviews_total = sum(a.review_count for a in activity)
+    correct_total = sum(a.correct_count for a in activity)
+    accuracy = (correct_total / reviews_total * 100) if reviews_total > 0 else 0.0
 
-    # Calculate accuracy
-    accuracy = (good_reviews / total_reviews * 100) if total_reviews > 0 else 0.0
+    reviews_today = sum(a.review_count for a in activity if a.day == today)
+    reviews_this_week = sum(a.review_count for a in activity if a.day >= week_ago)
 
     # Calculate streak (consecutive days with reviews)
-    # This is simplified - we check if there were reviews in recent days
     current_streak = 0
     check_date = today
 
-    for i in range(365):  # Check up to a year back
-        day_has_review = False
-        for card in cards:
-            if card.progress and card.progress.last_reviewed:
-                if card.progress.last_reviewed.date() == check_date:
-                    day_has_review = True
-                    break
-
-        if day_has_review:
-            current_streak += 1
-            check_date -= timedelta(days=1)
-        else:
+    for a in activity:
+        if a.day > check_date:
+            continue
+        if a.day != check_date or a.review_count == 0:
             break
+        current_streak += 1
+        check_date -= timedelta(days=1)
 
     return SetStats(
-        total_cards=total_cards,
-        new_cards=new_cards,
-        learning_cards=learning_cards,
-        mature_cards=mature_cards,
+        total_cards=row.total_cards,
+        new_cards=row.new_cards,
+        learning_cards=row.learning_cards,
+        mature_cards=row.total_cards - row.new_cards - row.learning_cards,
         average_ease_factor=round(avg_ease_factor, 2),
         reviews_today=reviews_today,
         reviews_this_week=reviews_this_week,
@@ -407,26 +1227,555 @@ async def get_set_stats(set_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/sets/{set_id}/reset-progress", status_code=status.HTTP_204_NO_CONTENT)
-async def reset_set_progress(set_id: int, db: Session = Depends(get_db)):
+async def reset_set_progress(set_id: int, db: AsyncSession = Depends(get_db)):
     """
     Reset learning progress for all cards in a set.
-    Deletes all CardProgress records for the set's cards.
+    Deletes all CardProgress records for the set's cards and the daily
+    activity rollup. review_log is kept: card history and accuracy still
+    show past reviews, and reschedule only replays reviews made since.
     """
-    # Check if set exists
-    set_obj = db.query(SetModel).filter(SetModel.id == set_id).first()
+    # 404 if the set does not exist
+    await _bump_set_version_or_404(db, set_id)
 
-    if not set_obj:
+    # Delete all progress records for the set's cards
+    await db.execute(
+        delete(CardProgress).where(CardProgress.set_id == set_id).execution_options(synchronize_session=False)
+    )
+
+    # Streaks and the heatmap start over; the review_log rows stay
+    await db.execute(delete(SetDailyActivity).where(SetDailyActivity.set_id == set_id))
+    await db.commit()
+
+    return None
+
+
+@router.post("/sets/{set_id}/reschedule", response_model=RescheduleResult)
+async def reschedule_set(set_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Recompute every card's schedule in a set from its review history.
+
+    Meant to run after the SpacedRepetitionService constants change: each
+    card's reviews since it was last new are replayed through the current
+    rules and its progress is overwritten. Cards are read in chunks of
+    RESCHEDULE_CHUNK_SIZE, replayed with one vectorized pass per review round
+    and committed chunk by chunk. Cards without that history in review_log
+    keep their progress.
+    """
+    settings = get_settings()
+    if not settings.review_log_enabled:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Set with id {set_id} not found"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Rescheduling replays review_log, which is disabled"
+        )
+    result = RescheduleResult(set_id=set_id, cards=0, rescheduled=0, skipped=0)
+    last_card_id = 0
+    while True:
+        chunk = (await db.execute(
+            select(CardProgress.id, CardProgress.card_id)
+            .where(CardProgress.set_id == set_id, CardProgress.card_id > last_card_id)
+            .order_by(CardProgress.card_id)
+            .limit(settings.reschedule_chunk_size)
+        )).all()
+        if not chunk:
+            break
+        card_ids = [row.card_id for row in chunk]
+        last_card_id = card_ids[-1]
+
+        in_chunk = ReviewLog.card_id.in_(card_ids)
+        log = (await db.execute(
+            select(ReviewLog.card_id, ReviewLog.quality, ReviewLog.prev_interval, ReviewLog.prev_ease)
+            .where(in_chunk)
+            .order_by(ReviewLog.card_id, ReviewLog.ts, ReviewLog.id)
+        )).all()
+        replayed, states = replay_review_log(card_ids, *(zip(*log) if log else ([], [], [], [])))
+        # Only the last timestamp of each card is needed, which saves parsing every ts
+        last_reviewed = dict((await db.execute(
+            select(ReviewLog.card_id, func.max(ReviewLog.ts)).where(in_chunk).group_by(ReviewLog.card_id)
+        )).all())
+
+        # tolist() turns the numpy values into the Python types the drivers expect
+        indices = replayed.nonzero()[0]
+        columns = zip(
+            indices.tolist(),
+            states.ease_factor[indices].tolist(),
+            states.interval_days[indices].tolist(),
+            states.repetitions[indices].tolist(),
+            states.lapses[indices].tolist(),
+            states.due_in_days[indices].tolist()
         )
+        params = []
+        for i, ease, interval, repetitions, lapses, due_in_days in columns:
+            reviewed = last_reviewed[card_ids[i]]
+            params.append({
+                "id": chunk[i].id, "ease_factor": ease, "interval_days": interval, "repetitions": repetitions,
+                "lapses": lapses, "last_reviewed": reviewed, "next_review": reviewed + timedelta(days=due_in_days)
+            })
+        if params:
+            await db.execute(update(CardProgress), params)
+            await _bump_set_versions(db, [set_id])
+            await db.commit()
+
+        result.cards += len(chunk)
+        result.rescheduled += len(params)
+        logger.info("Rescheduled %d of %d cards in set %d", result.rescheduled, result.cards, set_id)
+
+    if result.cards == 0:
+        # Nothing to replay: either no card was studied yet or the set is missing
+        await _ensure_set_exists(set_id, db)
+
+    result.skipped = result.cards - result.rescheduled
+    return result
+
+
+@router.get("/sets/{set_id}/activity", response_model=SetActivity)
+async def get_set_activity(
+        set_id: int,
+        days: int = Query(default=365, ge=1, le=3650),
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Get daily review counts for a set, e.g. for a heatmap.
+    Only days with reviews are returned, oldest first.
+    """
+    since = datetime.now().date() - timedelta(days=days - 1)
 
-    # Get all card IDs from this set
-    card_ids = [card.id for card in set_obj.cards]
+    result = await db.execute(
+        select(SetDailyActivity)
+        .where(SetDailyActivity.set_id == set_id, SetDailyActivity.day >= since)
+        .order_by(SetDailyActivity.day)
+    )
+    activity = result.scalars().all()
 
-    # Delete all progress records for these cards
-    if card_ids:
-        db.query(CardProgress).filter(CardProgress.card_id.in_(card_ids)).delete(synchronize_session=False)
-        db.commit()
+    if not activity:
+        # No reviews in the window: the set may also be missing
+        await _ensure_set_exists(set_id, db)
 
-    return None
+    return SetActivity(set_id=set_id, days=days, activity=activity)
+
+
+def _days_until(db: AsyncSession, column, day: date):
+    """Whole days from `day` to the date part of a timestamp column, computed by the database"""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.julianday(func.date(column)) - func.julianday(day.isoformat())
+    return cast(column, Date) - day
+
+
+@router.get("/sets/{set_id}/forecast", response_model=ReviewForecast)
+async def get_set_forecast(
+        set_id: int,
+        days: int = Query(default=30, ge=1, le=3650),
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Project how many reviews fall due on each of the next `days` days, today first.
+
+    Reads the current progress in one query and simulates future reviews with
+    the SM-2 rules, answering each one with a rating drawn from
+    FORECAST_QUALITY_WEIGHTS. Reviews of cards that are not started yet are
+    not included.
+    """
+    today = datetime.now().date()
+    # Cards in the same state are grouped by the database, and the day offsets
+    # are computed there, which saves building a row and parsing a timestamp per card
+    due_day = _days_until(db, CardProgress.next_review, today)
+    state = (CardProgress.ease_factor, CardProgress.interval_days, CardProgress.repetitions, due_day)
+    rows = (await db.execute(
+        select(*state, func.count())
+        .where(CardProgress.set_id == set_id, CardProgress.next_review.is_not(None))
+        .group_by(*state)
+    )).all()
+
+    if not rows:
+        # No scheduled cards: the set may also be missing
+        await _ensure_set_exists(set_id, db)
+
+    ease, interval, repetitions, due_day, card_counts = zip(*rows) if rows else ([], [], [], [], [])
+
+    weights = {
+        QUALITY_MAP[ReviewQualityEnum(name)]: weight
+        for name, weight in get_settings().forecast_quality_weights.items()
+    }
+    counts = forecast_due_counts(ease, interval, repetitions, due_day, days, weights, card_counts)
+
+    return ReviewForecast(
+        set_id=set_id,
+        days=days,
+        cards=sum(card_counts),
+        overdue=sum(count for day, count in zip(due_day, card_counts) if day < 0),
+        forecast=[
+            ForecastDay(day=today + timedelta(days=offset), due_count=count)
+            for offset, count in enumerate(counts.tolist())
+        ]
+    )
+
+
+@router.get("/cache/sets", response_model=SetCacheStats)
+async def get_set_cache_stats():
+    """Counters of this worker's GET /api/sets/{id} payload cache"""
+    return set_cache.stats()
+
+
+@router.get("/admin/slow-queries", response_model=list[SlowQueryEntry])
+async def get_slow_queries(
+        limit: int = Query(default=100, ge=1, le=1000),
+        route: Optional[str] = Query(default=None, description='e.g. "GET /api/sets/{set_id}/study-sr"'),
+        min_duration_ms: float = Query(default=0, ge=0)
+):
+    """
+    Entries of the slow query log (SLOW_QUERY_THRESHOLD_MS), newest first,
+    optionally only those from one route or over a duration.
+    """
+    return await run_in_threadpool(slow_query_log.read, limit, route, min_duration_ms)
+
+
+@router.get("/search", response_model=SearchResults)
+async def search_cards(
+        q: str = Query(min_length=1, max_length=500),
+        limit: int = Query(default=20, ge=1, le=100),
+        after: Optional[str] = None,
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over card terms and definitions in all sets.
+    Every word of `q` has to match, the last one also as a prefix. Hits are
+    ranked by relevance (a match in the term counts more than one in the
+    definition); `next_cursor` points at the next page, pass it back as `after`.
+    """
+    words = search_words(q)
+    if not words:
+        return SearchResults(hits=[])
+
+    # rank: lower is better
+    if db.get_bind().dialect.name == "sqlite":
+        rank = func.bm25(literal_column("cards_fts"), 2.0, 1.0)
+        card_id = cards_fts.c.rowid
+        page = select(card_id.label("card_id"), rank.label("rank")).where(
+            literal_column("cards_fts").op("MATCH")(fts5_match(words))
+        )
+    else:
+        tsquery = func.to_tsquery(literal_column("'simple'::regconfig"), pg_tsquery(words))
+        rank = -func.ts_rank(card_search_vector, tsquery)
+        card_id = CardModel.id
+        page = select(card_id.label("card_id"), rank.label("rank")).where(card_search_vector.op("@@")(tsquery))
+
+    if after is not None:
+        after_rank, after_id = _decode_cursor(after, ((int, float), int))
+        page = page.where(tuple_(rank, card_id) > tuple_(after_rank, after_id))
+
+    # Only the page is joined to cards and sets
+    page = page.order_by(rank, card_id).limit(limit + 1).subquery()
+    result = await db.execute(
+        select(page.c.card_id, page.c.rank, CardModel.set_id, SetModel.title, CardModel.term, CardModel.definition)
+        .join(CardModel, CardModel.id == page.c.card_id)
+        .join(SetModel, SetModel.id == CardModel.set_id)
+        .order_by(page.c.rank, page.c.card_id)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].rank, rows[-1].card_id)
+
+    return SearchResults(
+        hits=[
+            SearchHit(
+                card_id=row.card_id,
+                set_id=row.set_id,
+                set_title=row.title,
+                term=row.term,
+                definition=row.definition,
+                term_highlight=highlight(row.term, words),
+                definition_highlight=highlight(row.definition, words)
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/cards/{card_id}/history", response_model=list[ReviewLogEntry])
+async def get_card_history(
+        card_id: int,
+        limit: int = Query(default=100, ge=1, le=1000),
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the review history of a card, newest first.
+    """
+    result = await db.execute(
+        select(ReviewLog)
+        .where(ReviewLog.card_id == card_id)
+        .order_by(ReviewLog.ts.desc(), ReviewLog.id.desc())
+        .limit(limit)
+    )
+    entries = result.scalars().all()
+
+    if not entries:
+        # No history: the card may also be missing
+        card_exists = await db.scalar(select(CardModel.id).where(CardModel.id == card_id))
+
+        if card_exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Card with id {card_id} not found"
+            )
+
+    return entries
+
+
+@router.get("/sets/{set_id}/accuracy", response_model=ReviewAccuracy)
+async def get_set_accuracy(
+        set_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Get exact review accuracy for a set from the review log.
+    Defaults to the last 30 days; a review is correct unless rated "again".
+    """
+    end = end or datetime.now()
+    start = start or end - timedelta(days=30)
+
+    result = await db.execute(
+        select(
+            func.count(ReviewLog.id).label("reviews"),
+            func.sum(case((ReviewLog.quality != ReviewQuality.AGAIN.value, 1), else_=0)).label("correct")
+        )
+        .join(CardModel, CardModel.id == ReviewLog.card_id)
+        .where(CardModel.set_id == set_id, ReviewLog.ts >= start, ReviewLog.ts < end)
+    )
+    row = result.one()
+
+    if not row.reviews:
+        # No reviews in the window: the set may also be missing
+        await _ensure_set_exists(set_id, db)
+
+    correct = row.correct or 0
+
+    return ReviewAccuracy(
+        set_id=set_id,
+        start=start,
+        end=end,
+        reviews=row.reviews,
+        correct=correct,
+        accuracy=round(correct / row.reviews * 100, 1) if row.reviews else 0.0
+    )
+
+
+async def _export_lines(bind, set_id: Optional[int], yield_per: int):
+    """
+    NDJSON lines of the export, one chunk per yield_per cards.
+    Reads through its own session on `bind`: the request's session may be
+    closed by the time the response body streams.
+    """
+    async with AsyncSession(bind) as db:
+        async for lines in _export_chunks(db, set_id, yield_per):
+            yield lines
+
+
+async def _export_chunks(db: AsyncSession, set_id: Optional[int], yield_per: int):
+    """The lines of _export_lines, read through `db`"""
+    chunk = [ExportHeader(exported_at=datetime.now()).model_dump_json()]
+
+    sets_query = select(
+        SetModel.id, SetModel.title, SetModel.description, SetModel.created_at, SetModel.updated_at
+    ).order_by(SetModel.id)
+    if set_id is not None:
+        sets_query = sets_query.where(SetModel.id == set_id)
+
+    sets = await db.stream(sets_query.execution_options(yield_per=yield_per))
+    async for set_row in sets:
+        chunk.append(ExportSet.model_validate(set_row, from_attributes=True).model_dump_json())
+
+        cards = await db.stream(
+            select(
+                CardModel.id, CardModel.set_id, CardModel.term, CardModel.definition, CardModel.order,
+                CardProgress.ease_factor, CardProgress.interval_days, CardProgress.repetitions,
+                CardProgress.lapses, CardProgress.last_reviewed, CardProgress.next_review,
+                CardProgress.id.label("progress_id")
+            )
+            .outerjoin(CardProgress, CardProgress.card_id == CardModel.id)
+            .where(CardModel.set_id == set_row.id)
+            .order_by(CardModel.order, CardModel.id)
+            .execution_options(yield_per=yield_per)
+        )
+        async for rows in cards.partitions():
+            # Rows come from our own tables, so the records are built without re-validation
+            for card_row in rows:
+                chunk.append(ExportCard.model_construct(
+                    id=card_row.id,
+                    set_id=card_row.set_id,
+                    term=card_row.term,
+                    definition=card_row.definition,
+                    order=card_row.order
+                ).model_dump_json())
+                if card_row.progress_id is not None:
+                    chunk.append(ExportProgress.model_construct(
+                        card_id=card_row.id,
+                        ease_factor=card_row.ease_factor,
+                        interval_days=card_row.interval_days,
+                        repetitions=card_row.repetitions,
+                        lapses=card_row.lapses,
+                        last_reviewed=card_row.last_reviewed,
+                        next_review=card_row.next_review
+                    ).model_dump_json())
+
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+@router.get("/export")
+async def export_sets(
+        set_id: Optional[int] = None,
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream all sets (or one set) with their cards and review progress as NDJSON.
+    Rows are read through server-side cursors, so memory use does not grow
+    with the size of the database. POST /api/import/ndjson restores the file.
+    """
+    if set_id is not None:
+        await _ensure_set_exists(set_id, db)
+
+    filename = f"studycards-set-{set_id}.ndjson" if set_id is not None else "studycards-export.ndjson"
+    return StreamingResponse(
+        _export_lines(db.bind, set_id, get_settings().export_yield_per),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/import/ndjson", response_model=NdjsonImportResult, status_code=status.HTTP_201_CREATED)
+async def import_ndjson(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Restore sets from a GET /api/export file sent as the raw request body.
+
+    Sets are always created anew (ids are reassigned), so a file can be
+    restored next to existing data. Cards and progress are inserted and
+    committed every import_batch_size cards; only the current batch's card
+    ids are kept, which is why progress must follow its card as in the
+    export. Invalid records are skipped and reported with their line number.
+    If the upload cannot be read to the end the restored sets are removed.
+    """
+    batch_size = get_settings().import_batch_size
+
+    created_set_ids = []
+    # (exported id, new id) of the set whose cards are being read
+    current_set = None
+    # Pending batch: card rows keyed by exported card id, progress by exported card id
+    cards = {}
+    progress = {}
+    errors = []
+    counts = {"sets": 0, "cards": 0, "progress": 0, "failed": 0}
+
+    async def flush_batch():
+        if cards:
+            # New rows get ascending ids in insert order (SQLite rowids, PostgreSQL
+            # sequences), so the batch's ids are read back as a primary key range.
+            # An ordered RETURNING would run one INSERT per row on SQLite.
+            last_card_id = await db.scalar(select(func.max(CardModel.id))) or 0
+            await db.execute(insert(CardModel.__table__), list(cards.values()))
+            new_ids = [
+                row.id for row in await db.execute(
+                    select(CardModel.id, CardModel.set_id)
+                    .where(CardModel.id > last_card_id)
+                    .order_by(CardModel.id)
+                )
+                # Other requests may have added cards to other sets meanwhile
+                if row.set_id == current_set[1]
+            ]
+            id_map = dict(zip(cards.keys(), new_ids))
+            if progress:
+                await db.execute(insert(CardProgress.__table__), [
+                    {**row, "card_id": id_map[card_id], "set_id": current_set[1]}
+                    for card_id, row in progress.items()
+                ])
+            counts["cards"] += len(cards)
+            counts["progress"] += len(progress)
+            cards.clear()
+            progress.clear()
+            await _bump_set_versions(db, [current_set[1]])
+        await db.commit()
+        logger.info("NDJSON import: %d sets, %d cards, %d progress rows restored, %d failed",
+                    counts["sets"], counts["cards"], counts["progress"], counts["failed"])
+
+    def fail(line: int, detail: str):
+        counts["failed"] += 1
+        if len(errors) < IMPORT_ERROR_LIMIT:
+            errors.append(SetImportRowError(line=line, detail=detail))
+
+    try:
+        async for line_no, line in iter_lines(request.stream()):
+            if not line.strip():
+                continue
+            try:
+                record = EXPORT_RECORD_ADAPTER.validate_json(line)
+            except ValidationError as e:
+                first = e.errors()[0]
+                fail(line_no, f"{'.'.join(map(str, first['loc']))}: {first['msg']}")
+                continue
+
+            if isinstance(record, ExportHeader):
+                if record.version != EXPORT_FORMAT_VERSION:
+                    raise DeckImportError(line_no, f"Unsupported export version {record.version}")
+
+            elif isinstance(record, ExportSet):
+                await flush_batch()
+                new_set = SetModel(
+                    title=record.title,
+                    description=record.description,
+                    created_at=record.created_at or datetime.now(),
+                    updated_at=record.updated_at
+                )
+                db.add(new_set)
+                await db.flush()
+                current_set = (record.id, new_set.id)
+                created_set_ids.append(new_set.id)
+                counts["sets"] += 1
+
+            elif isinstance(record, ExportCard):
+                if current_set is None or record.set_id != current_set[0]:
+                    fail(line_no, f"Card {record.id} does not follow its set {record.set_id}")
+                    continue
+                if record.id in cards:
+                    fail(line_no, f"Duplicate card {record.id}")
+                    continue
+                if len(cards) >= batch_size:
+                    await flush_batch()
+                cards[record.id] = {
+                    "set_id": current_set[1],
+                    "term": record.term,
+                    "definition": record.definition,
+                    "order": record.order
+                }
+
+            else:
+                if record.card_id not in cards:
+                    fail(line_no, f"Progress for card {record.card_id} does not follow the card")
+                    continue
+                if record.card_id in progress:
+                    fail(line_no, f"Duplicate progress for card {record.card_id}")
+                    continue
+                progress[record.card_id] = record.model_dump(exclude={"type", "card_id"})
+
+        await flush_batch()
+    except (DeckImportError, ClientDisconnect) as e:
+        if created_set_ids:
+            await _discard_imported_sets(db, created_set_ids)
+        if isinstance(e, ClientDisconnect):
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Import failed: {e}"
+        )
+
+    return NdjsonImportResult(
+        **counts,
+        errors=errors,
+        errors_truncated=counts["failed"] > len(errors)
+    )
@@ -1,9 +1,18 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
-from typing import Optional
+from typing import Annotated, Literal, Optional, Union
 
 from pydantic import BaseModel, Field, ConfigDict
 
+from app.services import SpacedRepetitionService
+
+
+# Upper bound on cards in one create/update request; larger decks go through the import endpoints
+MAX_CARDS_PER_REQUEST = 100_000
+
+# Row errors returned by POST /api/sets/import
+IMPORT_ERROR_LIMIT = 100
+
 
 class ReviewQualityEnum(str, Enum):
     AGAIN = "again"
@@ -54,6 +63,23 @@ class ReviewInput(BaseModel):
     quality: ReviewQualityEnum
 
 
+class ReviewBatchInput(BaseModel):
+    reviews: list[ReviewInput] = Field(..., min_length=1, max_length=1000)
+
+
+class ReviewBatchItemResult(BaseModel):
+    card_id: int
+    status_code: int
+    progress: Optional[CardProgressResponse] = None
+    detail: Optional[str] = None
+
+
+class ReviewBatchResponse(BaseModel):
+    results: list[ReviewBatchItemResult]
+    succeeded: int
+    failed: int
+
+
 class StudySessionStats(BaseModel):
     total_cards: int
     new_cards: int
@@ -66,13 +92,111 @@ class StudySessionResponse(BaseModel):
     stats: StudySessionStats
 
 
+class StudyQueue(BaseModel):
+    cards: list[CardWithProgress]
+    next_cursor: Optional[str] = None
+
+
 class SetBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
     description: Optional[str] = None
 
 
 class SetCreate(SetBase):
-    cards: list[CardCreate] = Field(..., min_length=1)
+    cards: list[CardCreate] = Field(..., min_length=1, max_length=MAX_CARDS_PER_REQUEST)
+
+
+class CardUpdate(CardBase):
+    # Existing card to change; omit to add a new card
+    id: Optional[int] = None
+
+
+class SetUpdate(SetBase):
+    cards: list[CardUpdate] = Field(..., min_length=1, max_length=MAX_CARDS_PER_REQUEST)
+
+
+class SetPatch(BaseModel):
+    title: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    description: Optional[str] = None
+    # Cards to add (no id) or change (with id); cards not listed stay as they are
+    cards: list[CardUpdate] = Field(default_factory=list, max_length=MAX_CARDS_PER_REQUEST)
+    deleted_card_ids: list[int] = Field(default_factory=list)
+
+
+class SetImportRowError(BaseModel):
+    line: int
+    detail: str
+
+
+class SetImportResult(BaseModel):
+    set_id: int
+    rows_read: int
+    imported: int
+    failed: int
+    # First IMPORT_ERROR_LIMIT failed rows; errors_truncated is set when there were more
+    errors: list[SetImportRowError]
+    errors_truncated: bool = False
+
+
+# NDJSON export records (GET /api/export, POST /api/import/ndjson).
+# Each set is followed by its cards, each card by its progress if it has any.
+EXPORT_FORMAT_VERSION = 1
+
+
+class ExportHeader(BaseModel):
+    type: Literal["header"] = "header"
+    version: int = EXPORT_FORMAT_VERSION
+    exported_at: datetime
+
+
+class ExportSet(SetBase):
+    type: Literal["set"] = "set"
+    id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class ExportCard(CardBase):
+    type: Literal["card"] = "card"
+    id: int
+    set_id: int
+
+
+class ExportProgress(BaseModel):
+    type: Literal["progress"] = "progress"
+    card_id: int
+    ease_factor: float = Field(
+        ..., ge=SpacedRepetitionService.MIN_EASE_FACTOR, le=SpacedRepetitionService.MAX_EASE_FACTOR
+    )
+    interval_days: int = Field(..., ge=0)
+    repetitions: int = Field(..., ge=0)
+    lapses: int = Field(..., ge=0)
+    last_reviewed: Optional[datetime] = None
+    next_review: Optional[datetime] = None
+
+
+ExportRecord = Annotated[
+    Union[ExportHeader, ExportSet, ExportCard, ExportProgress],
+    Field(discriminator="type")
+]
+
+
+class NdjsonImportResult(BaseModel):
+    sets: int
+    cards: int
+    progress: int
+    failed: int
+    # Same cap as SetImportResult.errors
+    errors: list[SetImportRowError]
+    errors_truncated: bool = False
+
+
+class RescheduleResult(BaseModel):
+    set_id: int
+    # Cards with progress; skipped ones have no history in review_log to replay
+    cards: int
+    rescheduled: int
+    skipped: int
 
 
 class SetListItem(SetBase):
@@ -88,6 +212,8 @@ class Set(SetBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     cards: list[Card]
+    # Set when the cards were requested page by page and more remain
+    next_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -103,3 +229,95 @@ class SetStats(BaseModel):
     reviews_total: int
     current_streak: int
     accuracy: float
+
+
+class DailyActivity(BaseModel):
+    day: date
+    review_count: int
+    correct_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SetActivity(BaseModel):
+    set_id: int
+    days: int
+    activity: list[DailyActivity]
+
+
+class ForecastDay(BaseModel):
+    day: date
+    due_count: int
+
+
+class ReviewForecast(BaseModel):
+    set_id: int
+    days: int
+    # Cards with progress; new cards are not scheduled yet and are not simulated
+    cards: int
+    # Cards already past due, counted on the first day
+    overdue: int
+    forecast: list[ForecastDay]
+
+
+class SearchHit(BaseModel):
+    card_id: int
+    set_id: int
+    set_title: str
+    term: str
+    definition: str
+    # HTML-escaped term/definition with matches wrapped in <mark></mark>
+    term_highlight: str
+    definition_highlight: str
+
+
+class SearchResults(BaseModel):
+    hits: list[SearchHit]
+    next_cursor: Optional[str] = None
+
+
+class SetCacheStats(BaseModel):
+    entries: int
+    size_bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class SlowQueryEntry(BaseModel):
+    ts: datetime
+    duration_ms: float
+    # "METHOD /route/{template}", or None outside a request
+    route: Optional[str] = None
+    statement: str
+    # Types and lengths of the bound parameters, never their values
+    parameters: Union[list[str], dict[str, str], str]
+    # Parameter sets of an executemany
+    rows: int = 1
+    plan: Optional[list[str]] = None
+    pid: int
+
+
+class ReviewLogEntry(BaseModel):
+    id: int
+    card_id: int
+    ts: datetime
+    quality: int
+    prev_interval: int
+    new_interval: int
+    prev_ease: float
+    new_ease: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReviewAccuracy(BaseModel):
+    set_id: int
+    start: datetime
+    end: datetime
+    reviews: int
+    correct: int
+    accuracy: float
@@ -1,7 +1,21 @@
 from datetime import datetime, timedelta
+from typing import NamedTuple
+
+import numpy as np
+
 from app.models import CardProgress, ReviewQuality
 
 
+class ReviewStates(NamedTuple):
+    """SM-2 state of many cards as parallel arrays (see calculate_next_review_batch)"""
+    ease_factor: np.ndarray
+    interval_days: np.ndarray
+    repetitions: np.ndarray
+    lapses: np.ndarray
+    # Days from the review to next_review; -1 where no review was applied
+    due_in_days: np.ndarray
+
+
 class SpacedRepetitionService:
     """
     Service implementing SM-2 spaced repetition algorithm.
@@ -16,6 +30,19 @@ class SpacedRepetitionService:
     MAX_EASE_FACTOR = 2.5
     DEFAULT_EASE_FACTOR = 2.5
 
+    # Ease factor adjustments per rating
+    AGAIN_EASE_PENALTY = 0.2
+    HARD_EASE_PENALTY = 0.15
+    EASY_EASE_BONUS = 0.15
+
+    # Intervals (days) for the first reviews and multipliers after that
+    FIRST_INTERVAL = 1
+    SECOND_INTERVAL = 6
+    EASY_FIRST_INTERVAL = 4
+    HARD_INTERVAL_MULTIPLIER = 1.2
+    EASY_INTERVAL_MULTIPLIER = 1.3
+    AGAIN_DELAY_DAYS = 1
+
     @staticmethod
     def calculate_next_review(
             current_progress: CardProgress,
@@ -44,21 +71,23 @@ class SpacedRepetitionService:
             current_progress.repetitions = 0
             current_progress.lapses += 1
             current_progress.ease_factor = max(
-                current_progress.ease_factor - 0.2,
+                current_progress.ease_factor - SpacedRepetitionService.AGAIN_EASE_PENALTY,
                 SpacedRepetitionService.MIN_EASE_FACTOR
             )
             # Review again today or tomorrow
-            current_progress.next_review = now + timedelta(days=1)
+            current_progress.next_review = now + timedelta(days=SpacedRepetitionService.AGAIN_DELAY_DAYS)
 
         elif quality == ReviewQuality.HARD:
             # Correct but difficult
             if current_progress.repetitions == 0:
-                current_progress.interval_days = 1
+                current_progress.interval_days = SpacedRepetitionService.FIRST_INTERVAL
             else:
-                current_progress.interval_days = int(current_progress.interval_days * 1.2)
+                current_progress.interval_days = int(
+                    current_progress.interval_days * SpacedRepetitionService.HARD_INTERVAL_MULTIPLIER
+                )
 
             current_progress.ease_factor = max(
-                current_progress.ease_factor - 0.15,
+                current_progress.ease_factor - SpacedRepetitionService.HARD_EASE_PENALTY,
                 SpacedRepetitionService.MIN_EASE_FACTOR
             )
             current_progress.repetitions += 1
@@ -67,9 +96,9 @@ class SpacedRepetitionService:
         elif quality == ReviewQuality.GOOD:
             # Correct with some hesitation
             if current_progress.repetitions == 0:
-                current_progress.interval_days = 1
+                current_progress.interval_days = SpacedRepetitionService.FIRST_INTERVAL
             elif current_progress.repetitions == 1:
-                current_progress.interval_days = 6
+                current_progress.interval_days = SpacedRepetitionService.SECOND_INTERVAL
             else:
                 current_progress.interval_days = int(
                     current_progress.interval_days * current_progress.ease_factor
@@ -81,14 +110,15 @@ class SpacedRepetitionService:
         elif quality == ReviewQuality.EASY:
             # Perfect recall
             if current_progress.repetitions == 0:
-                current_progress.interval_days = 4
+                current_progress.interval_days = SpacedRepetitionService.EASY_FIRST_INTERVAL
             else:
                 current_progress.interval_days = int(
-                    current_progress.interval_days * current_progress.ease_factor * 1.3
+                    current_progress.interval_days * current_progress.ease_factor
+                    * SpacedRepetitionService.EASY_INTERVAL_MULTIPLIER
                 )
 
             current_progress.ease_factor = min(
-                current_progress.ease_factor + 0.15,
+                current_progress.ease_factor + SpacedRepetitionService.EASY_EASE_BONUS,
                 SpacedRepetitionService.MAX_EASE_FACTOR
             )
             current_progress.repetitions += 1
@@ -98,6 +128,125 @@ class SpacedRepetitionService:
 
         return current_progress
 
+    @staticmethod
+    def calculate_next_review_batch(
+            ease_factor: np.ndarray,
+            interval_days: np.ndarray,
+            repetitions: np.ndarray,
+            lapses: np.ndarray,
+            quality: np.ndarray
+    ) -> ReviewStates:
+        """
+        Vectorized calculate_next_review: one review for each of many cards.
+
+        Gives exactly what calculate_next_review would for each element - the
+        float arithmetic runs in float64 in the same order and int() truncation
+        becomes astype(int64) on non-negative values. Elements whose quality is
+        not a ReviewQuality value keep their state, with due_in_days -1.
+
+        Args:
+            ease_factor: Current ease factors (0 for a new card)
+            interval_days: Current intervals
+            repetitions: Current repetition counts
+            lapses: Current lapse counts
+            quality: ReviewQuality values
+
+        Returns:
+            ReviewStates with the updated arrays
+        """
+        cls = SpacedRepetitionService
+        ease = np.asarray(ease_factor, dtype=np.float64)
+        ease = np.where(ease == 0, cls.DEFAULT_EASE_FACTOR, ease)
+        interval = np.asarray(interval_days, dtype=np.int64)
+        repetitions = np.asarray(repetitions, dtype=np.int64)
+        lapses = np.asarray(lapses, dtype=np.int64)
+        quality = np.asarray(quality)
+
+        again = quality == ReviewQuality.AGAIN.value
+        hard = quality == ReviewQuality.HARD.value
+        good = quality == ReviewQuality.GOOD.value
+        easy = quality == ReviewQuality.EASY.value
+        passed = hard | good | easy
+        first = repetitions == 0
+
+        # interval * 1.2 for Hard, interval * ease for Good and (interval * ease) * 1.3
+        # for Easy: the scalar operations in the scalar order
+        grown = interval * np.where(hard, cls.HARD_INTERVAL_MULTIPLIER, ease)
+        grown = np.where(easy, grown * cls.EASY_INTERVAL_MULTIPLIER, grown).astype(np.int64)
+        new_interval = np.where(first, np.where(easy, cls.EASY_FIRST_INTERVAL, cls.FIRST_INTERVAL), grown)
+        new_interval = np.where(good & (repetitions == 1), cls.SECOND_INTERVAL, new_interval)
+        new_interval = np.where(passed, new_interval, np.where(again, 0, interval))
+
+        # ease - penalty is computed as ease + (-penalty), which rounds identically
+        lowered = again | hard
+        adjusted = ease + np.where(
+            again, -cls.AGAIN_EASE_PENALTY, np.where(hard, -cls.HARD_EASE_PENALTY, cls.EASY_EASE_BONUS)
+        )
+        new_ease = np.where(
+            lowered,
+            np.maximum(adjusted, cls.MIN_EASE_FACTOR),
+            np.where(easy, np.minimum(adjusted, cls.MAX_EASE_FACTOR), ease)
+        )
+
+        return ReviewStates(
+            ease_factor=new_ease,
+            interval_days=new_interval,
+            repetitions=np.where(passed, repetitions + 1, np.where(again, 0, repetitions)),
+            lapses=lapses + again,
+            due_in_days=np.where(passed, new_interval, np.where(again, cls.AGAIN_DELAY_DAYS, -1))
+        )
+
+    @staticmethod
+    def replay_reviews(card_index: np.ndarray, quality: np.ndarray, card_count: int) -> ReviewStates:
+        """
+        Replay review histories starting from new cards, vectorized across cards.
+
+        Round k applies the k-th review of every card in one
+        calculate_next_review_batch call, so the number of Python-level steps
+        is the length of the longest history, not the number of reviews.
+
+        Args:
+            card_index: Card position (0..card_count-1) of each review; a card's
+                reviews must appear in chronological order
+            quality: ReviewQuality value of each review
+            card_count: Number of cards
+
+        Returns:
+            ReviewStates after each card's last review (due_in_days is -1 for cards without reviews)
+        """
+        cls = SpacedRepetitionService
+        card_index = np.asarray(card_index, dtype=np.int64)
+        quality = np.asarray(quality)
+        states = ReviewStates(
+            ease_factor=np.full(card_count, cls.DEFAULT_EASE_FACTOR),
+            interval_days=np.zeros(card_count, dtype=np.int64),
+            repetitions=np.zeros(card_count, dtype=np.int64),
+            lapses=np.zeros(card_count, dtype=np.int64),
+            due_in_days=np.full(card_count, -1, dtype=np.int64)
+        )
+        if len(card_index) == 0:
+            return states
+
+        # Rank of each review within its card's history (a stable sort keeps the order)
+        by_card = np.argsort(card_index, kind="stable")
+        sorted_cards = card_index[by_card]
+        rank = np.empty_like(card_index)
+        rank[by_card] = np.arange(len(card_index)) - np.searchsorted(sorted_cards, sorted_cards)
+
+        by_rank = np.argsort(rank, kind="stable")
+        bounds = np.searchsorted(rank[by_rank], np.arange(rank.max() + 2))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            rows = by_rank[start:end]
+            cards = card_index[rows]
+            step = cls.calculate_next_review_batch(
+                states.ease_factor[cards], states.interval_days[cards],
+                states.repetitions[cards], states.lapses[cards], quality[rows]
+            )
+            for current, updated in zip(states, step):
+                current[cards] = updated
+
+        return states
+
     @staticmethod
     def get_card_status(progress: CardProgress) -> str:
         """
@@ -0,0 +1,226 @@
+import codecs
+import csv
+from enum import Enum
+from typing import AsyncIterable, AsyncIterator, NamedTuple, Optional
+
+
+# Longest record (a line, or several lines of one quoted CSV field) we buffer
+# before giving up; keeps memory bounded for files without line breaks
+MAX_RECORD_LENGTH = 1_000_000
+# Most lines one quoted CSV field may span. A stray opening quote would
+# otherwise swallow the rest of the file into one record.
+MAX_RECORD_LINES = 100
+
+# Values of the "#separator:" header in Anki text exports
+ANKI_SEPARATORS = {
+    "tab": "\t",
+    "comma": ",",
+    "semicolon": ";",
+    "pipe": "|",
+    "colon": ":",
+    "space": " ",
+}
+
+
+class DeckFormat(str, Enum):
+    CSV = "csv"
+    TSV = "tsv"
+    TEXT = "text"
+
+
+class DeckImportError(Exception):
+    """The upload cannot be parsed any further (bad encoding, runaway record)."""
+
+    def __init__(self, line: int, detail: str):
+        super().__init__(f"Line {line}: {detail}")
+        self.line = line
+        self.detail = detail
+
+
+class DeckRow(NamedTuple):
+    line: int
+    term: Optional[str] = None
+    definition: Optional[str] = None
+    # Set instead of term/definition when the row cannot be used
+    error: Optional[str] = None
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Decode a UTF-8 byte stream and yield (line number, line) without the line break."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_no = 0
+
+    def decode(chunk: bytes, final: bool = False) -> str:
+        try:
+            return decoder.decode(chunk, final)
+        except UnicodeDecodeError:
+            raise DeckImportError(line_no + 1, "File is not valid UTF-8")
+
+    async for chunk in chunks:
+        pending += decode(chunk)
+        if "\n" not in pending:
+            if len(pending) > MAX_RECORD_LENGTH:
+                raise DeckImportError(line_no + 1, f"Line is longer than {MAX_RECORD_LENGTH} characters")
+            continue
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.removesuffix("\r")
+
+    pending += decode(b"", final=True)
+    if pending:
+        yield line_no + 1, pending.removesuffix("\r")
+
+
+# Where a CSV record stands after a character, as tracked by _scan_quotes
+_FIELD_START, _IN_FIELD, _IN_QUOTES, _QUOTE_IN_QUOTES = range(4)
+
+
+def _scan_quotes(line: str, delimiter: str, state: int) -> int:
+    """
+    Follow csv's quoting through one line, starting from `state`.
+    The record continues on the next line if the result is _IN_QUOTES.
+    """
+    if '"' not in line:
+        # Nothing can open or close a quoted field
+        return _IN_QUOTES if state == _IN_QUOTES else _FIELD_START
+
+    # Jump straight to the next character that can change the state
+    i = 0
+    while i < len(line):
+        if state == _IN_QUOTES:
+            i = line.find('"', i)
+            if i < 0:
+                break
+            state = _QUOTE_IN_QUOTES
+        elif state == _IN_FIELD:
+            i = line.find(delimiter, i)
+            if i < 0:
+                break
+            state = _FIELD_START
+        elif line[i] == delimiter:
+            state = _FIELD_START
+        elif state == _FIELD_START:
+            state = _IN_QUOTES if line[i] == '"' else _IN_FIELD
+        else:
+            # '""' is an escaped quote; anything else is left for csv to report
+            state = _IN_QUOTES if line[i] == '"' else _IN_FIELD
+        i += 1
+    return state
+
+
+def _lines(start: int, end: int) -> str:
+    """'line 3' or 'lines 3-7', for error messages"""
+    return f"line {start}" if start == end else f"lines {start}-{end}"
+
+
+async def _iter_delimited(
+        lines: AsyncIterator[tuple[int, str]],
+        delimiter: str
+) -> AsyncIterator[DeckRow]:
+    """
+    CSV/TSV records; a quoted field may span several lines.
+
+    Quoting is tracked line by line, so each record is handed to csv once,
+    complete. A quoted field still open after MAX_RECORD_LINES lines (or
+    csv's field size limit) is reported as one error and parsing resumes
+    on the next line.
+    """
+    max_open_length = min(MAX_RECORD_LENGTH, csv.field_size_limit())
+    record: list[str] = []
+    record_length = 0
+    start = 0
+    state = _FIELD_START
+
+    async for line_no, line in lines:
+        if not record:
+            start = line_no
+        record.append(line)
+        record_length += len(line)
+
+        state = _scan_quotes(line, delimiter, state)
+        if state == _IN_QUOTES:
+            # Quoted field continues on the next line
+            if len(record) >= MAX_RECORD_LINES or record_length > max_open_length:
+                record, record_length, state = [], 0, _FIELD_START
+                yield DeckRow(start, error=f"Unterminated quoted field, skipped {_lines(start, line_no)}")
+            continue
+
+        text = "\n".join(record)
+        record, record_length, state = [], 0, _FIELD_START
+        try:
+            fields = next(csv.reader([text], delimiter=delimiter, strict=True), [])
+        except csv.Error as e:
+            yield DeckRow(start, error=f"Malformed row ({_lines(start, line_no)}): {e}")
+            continue
+
+        if not any(field.strip() for field in fields):
+            continue
+        if len(fields) < 2:
+            yield DeckRow(start, error="Expected a term and a definition")
+            continue
+        # Columns after the first two (tags, notes) are ignored
+        yield DeckRow(start, fields[0].strip(), fields[1].strip())
+
+    if record:
+        yield DeckRow(start, error=f"Unterminated quoted field, skipped {_lines(start, line_no)}")
+
+
+async def _iter_text(
+        lines: AsyncIterator[tuple[int, str]],
+        separator: str
+) -> AsyncIterator[DeckRow]:
+    """Lines of term<separator>definition, as in Anki's plain-text export."""
+    async for line_no, line in lines:
+        if line.startswith("#"):
+            # Anki header lines ("#separator:tab", "#html:false", ...)
+            key, _, value = line[1:].partition(":")
+            if key.strip().lower() == "separator" and value.strip():
+                value = value.strip()
+                separator = ANKI_SEPARATORS.get(value.lower(), value)
+            continue
+        if not line.strip():
+            continue
+
+        term, found, definition = line.partition(separator)
+        if not found:
+            yield DeckRow(line_no, error="Separator not found")
+            continue
+        yield DeckRow(line_no, term.strip(), definition.strip())
+
+
+async def iter_deck_rows(
+        chunks: AsyncIterable[bytes],
+        deck_format: DeckFormat,
+        separator: str = "\t",
+        has_header: bool = False
+) -> AsyncIterator[DeckRow]:
+    """
+    Parse an uploaded deck incrementally.
+
+    Args:
+        chunks: Raw body of the upload, in arbitrary chunks
+        deck_format: csv, tsv or text ("term<separator>definition" per line)
+        separator: Separator for the text format
+        has_header: Skip the first row
+
+    Yields:
+        One DeckRow per non-blank row, in file order. Rows that cannot be
+        used carry an error instead of a term and definition.
+
+    Raises:
+        DeckImportError: When the rest of the upload cannot be read
+    """
+    lines = iter_lines(chunks)
+    if deck_format == DeckFormat.TEXT:
+        rows = _iter_text(lines, separator)
+    else:
+        rows = _iter_delimited(lines, "," if deck_format == DeckFormat.CSV else "\t")
+
+    skip_header = has_header
+    async for row in rows:
+        if skip_header:
+            skip_header = False
+            continue
+        yield row
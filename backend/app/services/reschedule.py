@@ -0,0 +1,67 @@
+"""
+Rebuilding stored schedules from review_log.
+
+A card's CardProgress is what its reviews produce when fed through SM-2 one
+by one, so after the SpacedRepetitionService constants change the schedule
+can be recomputed by replaying review_log with the current rules.
+
+Resetting progress keeps the log, so only the reviews since a card was last
+new are replayed. A review whose previous state is that of a new card
+(interval 0, default or unset ease) starts a new history: the only other
+state with interval 0 follows an Again, which always lowers the ease.
+"""
+from typing import Sequence
+
+import numpy as np
+
+from app.services import ReviewStates, SpacedRepetitionService
+
+
+def replay_review_log(
+        card_ids: Sequence[int],
+        log_card_ids: Sequence[int],
+        quality: Sequence[int],
+        prev_interval: Sequence[int],
+        prev_ease: Sequence[float]
+) -> tuple[np.ndarray, ReviewStates]:
+    """
+    Recompute the schedules of a chunk of cards from their review_log rows.
+
+    Args:
+        card_ids: Cards to reschedule, ascending
+        log_card_ids, quality, prev_interval, prev_ease: review_log columns,
+            ordered by card and then time; rows of cards not in card_ids are ignored
+
+    Returns:
+        (replayed, states) aligned with card_ids; replayed is False where the
+        log holds no history starting from a new card. A replayed card's
+        next review is due states.due_in_days after its last logged review.
+    """
+    card_ids = np.asarray(card_ids, dtype=np.int64)
+    log_card_ids = np.asarray(log_card_ids, dtype=np.int64)
+    quality = np.asarray(quality, dtype=np.int64)
+    prev_interval = np.asarray(prev_interval, dtype=np.int64)
+    prev_ease = np.asarray(prev_ease, dtype=np.float64)
+
+    card_index = np.searchsorted(card_ids, log_card_ids)
+    known = card_index < len(card_ids)
+    known[known] = card_ids[card_index[known]] == log_card_ids[known]
+    card_index, quality = card_index[known], quality[known]
+    prev_interval, prev_ease = prev_interval[known], prev_ease[known]
+
+    # Latest review so far that started from a new card, and the one that counts for each card
+    rows = np.arange(len(card_index))
+    starts_new = (prev_interval == 0) & (
+        (prev_ease == 0) | (prev_ease == SpacedRepetitionService.DEFAULT_EASE_FACTOR)
+    )
+    latest_start = np.maximum.accumulate(np.where(starts_new, rows, -1))
+    first_row = np.searchsorted(card_index, card_index, side="left")
+    last_row = np.searchsorted(card_index, card_index, side="right") - 1
+    history_start = latest_start[last_row]
+    keep = (history_start >= first_row) & (rows >= history_start)
+
+    states = SpacedRepetitionService.replay_reviews(card_index[keep], quality[keep], len(card_ids))
+
+    replayed = np.zeros(len(card_ids), dtype=bool)
+    replayed[card_index[keep]] = True
+    return replayed, states
@@ -0,0 +1,65 @@
+"""
+Query parsing and highlighting for card full-text search.
+
+User input is never passed to the database's query syntax as is: it is
+split into words and every word must match. The last one also matches as a
+prefix once it is MIN_PREFIX_LENGTH long, so results show up while typing
+(shorter prefixes match most of the index, and ranking that is slow). The
+same words become an FTS5 MATCH string on SQLite and a to_tsquery() string
+on PostgreSQL.
+
+Highlighting happens here rather than in SQL (highlight() / ts_headline()),
+only for the returned page, and looks the same on both databases.
+"""
+import html
+import re
+import unicodedata
+
+# Longer queries are cut to this many words
+MAX_QUERY_WORDS = 16
+MIN_PREFIX_LENGTH = 3
+
+# Letters and digits; "_" separates words like it does for FTS5 and PostgreSQL
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _fold(word: str) -> str:
+    """Lowercase and drop diacritics the way FTS5's unicode61 tokenizer does"""
+    decomposed = unicodedata.normalize("NFKD", word.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def search_words(query: str) -> list[str]:
+    """Lowercased words of a search query, at most MAX_QUERY_WORDS"""
+    return _WORD.findall(query.lower())[:MAX_QUERY_WORDS]
+
+
+def _prefix_search(words: list[str]) -> bool:
+    return len(words[-1]) >= MIN_PREFIX_LENGTH
+
+
+def fts5_match(words: list[str]) -> str:
+    """FTS5 MATCH expression for search_words()"""
+    return " ".join(f'"{word}"' for word in words) + ("*" if _prefix_search(words) else "")
+
+
+def pg_tsquery(words: list[str]) -> str:
+    """to_tsquery() input for search_words()"""
+    return " & ".join(words) + (":*" if _prefix_search(words) else "")
+
+
+def highlight(text: str, words: list[str]) -> str:
+    """HTML-escape `text` and wrap the words that match the query in <mark></mark>"""
+    folded = [_fold(word) for word in words]
+    exact = set(folded)
+    prefix = folded[-1] if _prefix_search(words) else None
+    parts = []
+    position = 0
+    for match in _WORD.finditer(text):
+        token = _fold(match.group())
+        if token in exact or (prefix and token.startswith(prefix)):
+            parts.append(html.escape(text[position:match.start()], quote=False))
+            parts.append(f"<mark>{html.escape(match.group(), quote=False)}</mark>")
+            position = match.end()
+    parts.append(html.escape(text[position:], quote=False))
+    return "".join(parts)
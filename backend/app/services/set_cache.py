@@ -0,0 +1,103 @@
+"""
+In-process cache of serialized `GET /api/sets/{id}` payloads.
+
+Entries are keyed by set id and remember the set version they were built
+from. The route reads the current version anyway for its ETag, and an entry
+is only served while that version still matches. Every change to a set bumps
+its version and set ids are never reused, so (id, version) names one payload
+for good and an entry built by this worker cannot go stale behind its back
+when another worker changes or deletes the set. The write paths also drop
+entries right away, but only in their own worker, to release the memory.
+
+Eviction is least-recently-used once the payloads exceed `max_bytes`;
+entries also expire `ttl` seconds after they were stored. Everything runs on
+the event loop, so no locking is needed.
+"""
+import time
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
+
+class _Entry(NamedTuple):
+    version: int
+    expires_at: float
+    payload: bytes
+
+
+class SetPayloadCache:
+    """Bounded LRU/TTL cache of JSON payloads with hit/miss/eviction counters"""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # Dropped to stay under max_bytes
+        self.evictions = 0
+        self.expirations = 0
+        # Dropped by a write, or found outdated by a version check
+        self.invalidations = 0
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+
+    def get(self, set_id: int, version: int) -> Optional[bytes]:
+        """Return the cached payload if it was built from `version` and has not expired"""
+        entry = self._entries.get(set_id)
+        if entry is not None and entry.version != version:
+            self._remove(set_id)
+            self.invalidations += 1
+            entry = None
+        elif entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(set_id)
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(set_id)
+        self.hits += 1
+        return entry.payload
+
+    def put(self, set_id: int, version: int, payload: bytes) -> None:
+        """Store a payload, evicting the least recently used ones beyond max_bytes"""
+        self._remove(set_id)
+        # Also covers max_bytes == 0, which disables the cache
+        if len(payload) > self.max_bytes:
+            return
+
+        self._entries[set_id] = _Entry(version, time.monotonic() + self.ttl, payload)
+        self.size += len(payload)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, set_ids: Iterable[int]) -> None:
+        """Drop the entries of sets that were changed or deleted"""
+        for set_id in set_ids:
+            if self._remove(set_id):
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+    def _remove(self, set_id: int) -> bool:
+        entry = self._entries.pop(set_id, None)
+        if entry is None:
+            return False
+        self.size -= len(entry.payload)
+        return True
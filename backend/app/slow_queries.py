@@ -0,0 +1,224 @@
+"""
+Slow query log (SLOW_QUERY_THRESHOLD_MS, off by default).
+
+Every statement that takes longer than the threshold to execute is written
+as one JSON line to a rotating file, with:
+- the statement (placeholders only) and the shapes of its bound parameters:
+  types, and lengths for strings and sequences, never the values;
+- the route that issued it, e.g. "GET /api/sets/{set_id}/study-sr";
+- on SQLite and PostgreSQL the EXPLAIN plan, captured on the same
+  connection right after the statement (SLOW_QUERY_EXPLAIN). On PostgreSQL
+  it runs inside a savepoint, so a failing EXPLAIN cannot abort the
+  request's transaction. Plans are estimated, never EXPLAIN ANALYZE, which
+  would run the statement again.
+
+GET /api/admin/slow-queries reads the entries back, newest first. Workers
+sharing the file write whole lines, but only one process should own its
+rotation; give each worker its own SLOW_QUERY_LOG_PATH when running several.
+"""
+import json
+import logging
+import os
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from time import perf_counter
+from typing import Any, Optional
+
+from app.config import Settings
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request being handled; routing adds its "route" later
+_request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+class RequestScopeMiddleware:
+    """ASGI middleware letting the slow query log name the route behind a statement"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
+
+
+def _current_route() -> Optional[str]:
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+def _value_shape(value) -> str:
+    if isinstance(value, (str, bytes, list, tuple, set, frozenset)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters) -> Any:
+    """Types (and lengths) of bound parameters; runs of the same shape, e.g. an IN list, are folded"""
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if not isinstance(parameters, (list, tuple)):
+        return _value_shape(parameters)
+
+    folded = []
+    for shape in map(_value_shape, parameters):
+        if folded and folded[-1][0] == shape:
+            folded[-1][1] += 1
+        else:
+            folded.append([shape, 1])
+    return [shape if count == 1 else f"{shape} x{count}" for shape, count in folded]
+
+
+def _plan_lines(dialect: str, rows) -> list[str]:
+    if dialect == "postgresql":
+        return [row[0] for row in rows]
+    # SQLite: (id, parent, notused, detail); indent each step under its parent
+    depths = {0: -1}
+    lines = []
+    for step_id, parent, _, detail in rows:
+        depths[step_id] = depths.get(parent, -1) + 1
+        lines.append("  " * depths[step_id] + detail)
+    return lines
+
+
+class SlowQueryLog:
+    """Statements over `threshold_ms`, as JSON lines in a rotating file"""
+
+    def __init__(self, threshold_ms: float, path: str, max_bytes: int, backup_count: int, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.explain = explain
+        self._handler: Optional[RotatingFileHandler] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SlowQueryLog":
+        return cls(
+            settings.slow_query_threshold_ms,
+            settings.slow_query_log_path,
+            settings.slow_query_log_max_bytes,
+            settings.slow_query_log_backups,
+            settings.slow_query_explain,
+        )
+
+    def install(self, engine) -> None:
+        """Time the statements of `engine` (sync or async); while disabled each one costs a threshold check"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.threshold_ms > 0:
+            context.slow_query_start = perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "slow_query_start", None)
+        if start is None:
+            return
+        duration_ms = (perf_counter() - start) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        try:
+            self._record(conn, statement, parameters, executemany, duration_ms)
+        except Exception:
+            # Never fail the statement (and the request) over its log entry
+            logger.exception("Could not record a slow query")
+
+    def _record(self, conn, statement: str, parameters, executemany: bool, duration_ms: float) -> None:
+        rows = 1
+        if executemany:
+            rows = len(parameters)
+            parameters = parameters[0] if parameters else ()
+        route = _current_route()
+        entry = {
+            "ts": datetime.now().isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "route": route,
+            "statement": statement,
+            "parameters": parameter_shape(parameters),
+            "rows": rows,
+            "plan": self._explain(conn, statement, parameters) if self.explain else None,
+            "pid": os.getpid(),
+        }
+        self._write(entry)
+        logger.warning("Slow query (%.1f ms) from %s: %s", duration_ms, route, " ".join(statement.split())[:200])
+
+    def _explain(self, conn, statement: str, parameters) -> Optional[list[str]]:
+        """Plan of `statement`, read through the DBAPI connection so no engine events fire"""
+        dialect = conn.dialect.name
+        prefix = EXPLAIN_PREFIXES.get(dialect)
+        if prefix is None or not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return None
+
+        savepoint = dialect == "postgresql"
+        cursor = conn.connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                plan = _plan_lines(dialect, cursor.fetchall())
+            except Exception:
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                raise
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        except Exception:
+            logger.warning("Could not EXPLAIN a slow query", exc_info=True)
+            plan = None
+        finally:
+            cursor.close()
+        return plan
+
+    def _write(self, entry: dict) -> None:
+        # Opened on first use, and again if the path was changed
+        path = os.path.abspath(self.path)
+        if self._handler is None or self._handler.baseFilename != path:
+            if self._handler is not None:
+                self._handler.close()
+            self._handler = RotatingFileHandler(
+                path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+            )
+        self._handler.emit(logging.makeLogRecord({"msg": json.dumps(entry, default=str)}))
+
+    def read(self, limit: int, route: Optional[str] = None, min_duration_ms: float = 0) -> list[dict]:
+        """Entries from the log file and its backups, newest first"""
+        entries = []
+        for index in range(self.backup_count + 1):
+            path = self.path if index == 0 else f"{self.path}.{index}"
+            try:
+                with open(path, encoding="utf-8") as file:
+                    lines = file.readlines()
+            except FileNotFoundError:
+                continue
+            for line in reversed(lines):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash or a concurrent rotation
+                    continue
+                if route is not None and entry.get("route") != route:
+                    continue
+                if entry.get("duration_ms", 0) < min_duration_ms:
+                    continue
+                entries.append(entry)
+                if len(entries) == limit:
+                    return entries
+        return entries
@@ -0,0 +1,105 @@
+"""
+Concurrency benchmark: latency of cheap endpoints while a heavy one runs.
+
+Seeds a throwaway SQLite database with one large set (every card has
+progress), starts uvicorn against it and keeps `/api/sets/{id}/stats`
+busy in the background while measuring `/health` and `/api/review`.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_concurrency --cards 50000 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import seed_set, percentile
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+async def hammer_stats(client: httpx.AsyncClient, set_id: int, stop: asyncio.Event) -> int:
+    count = 0
+    while not stop.is_set():
+        await client.get(f"/api/sets/{set_id}/stats", timeout=120)
+        count += 1
+    return count
+
+
+async def measure(client: httpx.AsyncClient, method: str, url: str, requests: int, body_factory=None) -> list[float]:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await client.request(method, url, json=body_factory() if body_factory else None, timeout=120)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def run(set_id: int, card_ids: list[int], requests: int) -> None:
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        stop = asyncio.Event()
+        stats_task = asyncio.create_task(hammer_stats(client, set_id, stop))
+        await asyncio.sleep(0.2)
+
+        health = await measure(client, "GET", "/health", requests)
+        review = await measure(
+            client, "POST", "/api/review", requests,
+            body_factory=lambda: {"card_id": random.choice(card_ids), "quality": "good"}
+        )
+
+        stop.set()
+        stats_runs = await stats_task
+
+    print(f"background stats requests completed: {stats_runs}")
+    for name, samples in (("/health", health), ("/api/review", review)):
+        print(
+            f"{name:<12} p50={statistics.median(samples):8.1f} ms  "
+            f"p99={percentile(samples, 99):8.1f} ms  max={max(samples):8.1f} ms"
+        )
+
+
+def wait_for_server(timeout: float = 15.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(f"{BASE_URL}/health", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        set_id, card_ids = seed_set(f"sqlite:///{db_path}", args.cards)
+
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+            env=env
+        )
+        try:
+            wait_for_server()
+            asyncio.run(run(set_id, card_ids, args.requests))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Latency of `POST /api/sets` for large decks.
+
+Times the full request (validation, insert, reload of the created set and
+serialization) through the ASGI app in-process.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_create_set --cards 1000 10000 100000 --repeat 3
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+
+async def time_create(app, card_count: int, repeat: int) -> list[float]:
+    payload = {
+        "title": f"Benchmark {card_count}",
+        "cards": [
+            {"term": f"Term {i}", "definition": f"Definition {i}", "order": i}
+            for i in range(card_count)
+        ]
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.post("/api/sets", json=payload, timeout=600)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from sqlalchemy import create_engine
+        from app.database import Base
+        from app.main import app
+
+        engine = create_engine(db_url)
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+
+        for card_count in args.cards:
+            latencies = asyncio.run(time_create(app, card_count, args.repeat))
+            print(
+                f"{card_count:>8} cards  median={statistics.median(latencies):9.1f} ms  "
+                f"min={min(latencies):9.1f} ms  max={max(latencies):9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
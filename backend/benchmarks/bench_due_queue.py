@@ -0,0 +1,89 @@
+"""
+One `GET /api/study/due` queue versus a `/study-sr` request per set.
+
+Seeds `--sets` decks of `--cards` cards each (every card with randomized
+progress, about half due; a fifth of the cards are then made new again) and
+times, through the ASGI app in-process:
+- fetching every deck's session with `/api/sets/{id}/study-sr`,
+- the first page of `/api/study/due` and walking the whole queue page by page.
+Both use the default per-set caps.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_due_queue --sets 40 --cards 2500 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+
+async def time_sessions(app, set_ids: list[int], page_size: int, repeat: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        per_set, first_page, whole_queue = [], [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            per_set_cards = 0
+            for set_id in set_ids:
+                response = await client.get(f"/api/sets/{set_id}/study-sr", timeout=600)
+                response.raise_for_status()
+                per_set_cards += len(response.json()["cards"])
+            per_set.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            params = {"limit": page_size}
+            queue_cards = pages = 0
+            while True:
+                response = await client.get("/api/study/due", params=params, timeout=600)
+                response.raise_for_status()
+                page = response.json()
+                pages += 1
+                queue_cards += len(page["cards"])
+                if pages == 1:
+                    first_page.append((time.perf_counter() - start) * 1000)
+                if page["next_cursor"] is None:
+                    break
+                params["after"] = page["next_cursor"]
+            whole_queue.append((time.perf_counter() - start) * 1000)
+
+    print(f"{len(set_ids)} x /study-sr         {per_set_cards:>6} cards  median={statistics.median(per_set):8.1f} ms")
+    print(f"/study/due first page     {page_size:>6} cards  median={statistics.median(first_page):8.1f} ms")
+    print(
+        f"/study/due all {pages:>3} pages  {queue_cards:>6} cards  "
+        f"median={statistics.median(whole_queue):8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sets", type=int, default=40)
+    parser.add_argument("--cards", type=int, default=2_500, help="Cards per set")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from sqlalchemy import create_engine, delete
+        from app.main import app
+        from app.models import CardProgress
+        from benchmarks.common import seed_set
+
+        set_ids = [seed_set(db_url, args.cards)[0] for _ in range(args.sets)]
+        engine = create_engine(db_url)
+        with engine.begin() as conn:
+            conn.execute(delete(CardProgress).where(CardProgress.card_id % 5 == 0))
+        engine.dispose()
+
+        asyncio.run(time_sessions(app, set_ids, args.page_size, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Throughput and peak Python memory of `GET /api/export` and `POST /api/import/ndjson`.
+
+Seeds one set with progress on every card, streams the export to a temporary
+file and restores that file in 64 KiB chunks. The app is driven through raw
+ASGI calls (httpx's ASGITransport buffers whole bodies, which would hide what
+the server holds). Each direction runs once for timing and once under
+tracemalloc; the peak should stay roughly the same as the database grows.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_export --cards 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+
+async def call(app, method: str, path: str, body_path: str = None, out_path: str = None) -> int:
+    """Run one request against the ASGI app; returns the response status"""
+    scope = {
+        # spec_version 2.4: responses do not poll receive() for disconnects
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    body = open(body_path, "rb") if body_path else None
+    out = open(out_path, "wb") if out_path else None
+    status = 0
+    body_done = False
+
+    async def receive():
+        nonlocal body_done
+        if body_done:
+            return {"type": "http.disconnect"}
+        chunk = body.read(64 * 1024) if body else b""
+        body_done = not chunk
+        return {"type": "http.request", "body": chunk, "more_body": not body_done}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and out is not None:
+            out.write(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        for f in (body, out):
+            if f is not None:
+                f.close()
+    return status
+
+
+def measure(app, *args, **kwargs) -> tuple[float, float]:
+    """(seconds, tracemalloc peak in MiB) of one request, from two separate runs"""
+    start = time.perf_counter()
+    status = asyncio.run(call(app, *args, **kwargs))
+    elapsed = time.perf_counter() - start
+    assert status in (200, 201), status
+
+    tracemalloc.start()
+    asyncio.run(call(app, *args, **kwargs))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db_url = f"sqlite:///{db_path}"
+        export_path = os.path.join(tmp, "export.ndjson")
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from app.database import engine
+        from app.main import app
+        from benchmarks.common import seed_set
+
+        for card_count in args.cards:
+            # Start each size from an empty database
+            asyncio.run(engine.dispose())
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            seed_set(db_url, card_count)
+
+            elapsed, peak = measure(app, "GET", "/api/export", out_path=export_path)
+            size = os.path.getsize(export_path) / 1024 / 1024
+            print(f"export   {card_count:>9} cards  {elapsed:7.2f} s  {card_count / elapsed:8.0f} cards/s  "
+                  f"peak={peak:6.1f} MiB  file={size:.0f} MiB")
+
+            elapsed, peak = measure(app, "POST", "/api/import/ndjson", body_path=export_path)
+            print(f"restore  {card_count:>9} cards  {elapsed:7.2f} s  {card_count / elapsed:8.0f} cards/s  "
+                  f"peak={peak:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
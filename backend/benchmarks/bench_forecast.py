@@ -0,0 +1,92 @@
+"""
+Latency of `GET /api/sets/{id}/forecast` on large decks.
+
+Seeds a deck where every card has progress due around today and reports,
+per horizon, the median time of the simulation alone (forecast_due_counts on
+arrays already in memory) and of the whole request through the ASGI app.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_forecast --cards 100000 --days 30 365 --repeat 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+
+async def time_forecast(app, set_id: int, days: int, repeat: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.get(f"/api/sets/{set_id}/forecast", params={"days": days}, timeout=600)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return latencies
+
+
+def time_simulation(db_url: str, set_id: int, days: int, repeat: int) -> tuple[list[float], int]:
+    from datetime import datetime
+    from sqlalchemy import create_engine, select
+    from app.config import get_settings
+    from app.models import CardProgress, ReviewQuality
+    from app.services.forecast import forecast_due_counts
+
+    engine = create_engine(db_url)
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(CardProgress.ease_factor, CardProgress.interval_days, CardProgress.repetitions,
+                   CardProgress.next_review)
+            .where(CardProgress.set_id == set_id)
+        ).all()
+    engine.dispose()
+
+    today = datetime.now().date()
+    ease = np.array([row[0] for row in rows])
+    interval = np.array([row[1] for row in rows])
+    repetitions = np.array([row[2] for row in rows])
+    due_day = np.array([(row[3].date() - today).days for row in rows])
+    weights = {ReviewQuality[name.upper()]: w for name, w in get_settings().forecast_quality_weights.items()}
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        counts = forecast_due_counts(ease, interval, repetitions, due_day, days, weights)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, int(counts.sum())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 365])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from app.main import app
+        from benchmarks.common import seed_set
+
+        set_id, _ = seed_set(db_url, args.cards)
+        for days in args.days:
+            simulation, reviews = time_simulation(db_url, set_id, days, args.repeat)
+            request = asyncio.run(time_forecast(app, set_id, days, args.repeat))
+            print(
+                f"{args.cards:>8} cards  {days:>4} days  {reviews:>9} simulated reviews  "
+                f"simulation median={statistics.median(simulation):7.1f} ms  "
+                f"request median={statistics.median(request):7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Throughput and peak Python memory of `POST /api/sets/import`.
+
+Streams generated term<TAB>definition decks through the ASGI app in-process
+and reports rows/s and the tracemalloc peak for each size; the peak should
+stay roughly the same as the deck grows.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_import --rows 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+import httpx
+
+
+async def deck(row_count: int, lines_per_chunk: int = 500):
+    chunk = []
+    for i in range(row_count):
+        chunk.append(f"Term {i}\tDefinition of term number {i}\n")
+        if len(chunk) == lines_per_chunk:
+            yield "".join(chunk).encode()
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+async def time_import(app, row_count: int) -> tuple[float, int]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/sets/import",
+            params={"title": f"Import {row_count}"},
+            content=deck(row_count),
+            timeout=3600
+        )
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        response.raise_for_status()
+        assert response.json()["imported"] == row_count
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from sqlalchemy import create_engine
+        from app.database import Base
+        from app.main import app
+
+        engine = create_engine(db_url)
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+
+        for row_count in args.rows:
+            elapsed, peak = asyncio.run(time_import(app, row_count))
+            print(
+                f"{row_count:>9} rows  {elapsed:7.2f} s  {row_count / elapsed:9.0f} rows/s  "
+                f"peak={peak / 1024 / 1024:6.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+`POST /api/sets/{id}/reschedule` on a set with a long review history.
+
+Seeds one set whose cards each have `--reviews` logged reviews (progress is
+generated by the scalar SM-2 code, so it matches the log), then reports:
+  - the time to replay that history card by card with calculate_next_review,
+  - the same replay through SpacedRepetitionService.replay_reviews,
+  - the full endpoint (reading the log in chunks and writing progress back).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_reschedule --cards 100000 --reviews 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+
+QUALITIES = [0, 3, 4, 5]
+
+
+def scalar_replay(histories: list[list[int]]) -> list:
+    from app.models import ReviewQuality
+    from app.services import SpacedRepetitionService
+
+    states = []
+    for history in histories:
+        progress = SimpleNamespace(ease_factor=2.5, interval_days=0, repetitions=0, lapses=0)
+        for quality in history:
+            SpacedRepetitionService.calculate_next_review(progress, ReviewQuality(quality))
+        states.append(progress)
+    return states
+
+
+def seed_history(db_url: str, set_id: int, card_ids: list[int], histories: list[list[int]]) -> None:
+    """Write review_log rows and the matching progress for every card"""
+    from sqlalchemy import create_engine, insert
+    from app.models import CardProgress, ReviewLog, ReviewQuality
+    from app.services import SpacedRepetitionService
+
+    start = datetime.now() - timedelta(days=365)
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        progress_rows, log_rows = [], []
+        for card_id, history in zip(card_ids, histories):
+            state = SimpleNamespace(ease_factor=2.5, interval_days=0, repetitions=0, lapses=0)
+            for day, quality in enumerate(history):
+                prev_interval, prev_ease = state.interval_days, state.ease_factor
+                state = SpacedRepetitionService.calculate_next_review(state, ReviewQuality(quality))
+                state.last_reviewed = start + timedelta(days=day * 3, seconds=card_id)
+                log_rows.append({
+                    "card_id": card_id, "ts": state.last_reviewed, "quality": quality,
+                    "prev_interval": prev_interval, "new_interval": state.interval_days,
+                    "prev_ease": prev_ease, "new_ease": state.ease_factor
+                })
+            progress_rows.append({
+                "card_id": card_id, "set_id": set_id, "ease_factor": state.ease_factor,
+                "interval_days": state.interval_days, "repetitions": state.repetitions,
+                "lapses": state.lapses, "last_reviewed": state.last_reviewed, "next_review": state.last_reviewed
+            })
+        conn.execute(insert(ReviewLog), log_rows)
+        conn.execute(insert(CardProgress), progress_rows)
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--reviews", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from app.main import app
+        from app.services import SpacedRepetitionService
+        from benchmarks.common import seed_set
+
+        rng = random.Random(1)
+        histories = [[rng.choice(QUALITIES) for _ in range(args.reviews)] for _ in range(args.cards)]
+        set_id, card_ids = seed_set(db_url, args.cards, with_progress=False)
+        seed_history(db_url, set_id, card_ids, histories)
+        review_count = args.cards * args.reviews
+
+        start = time.perf_counter()
+        scalar_replay(histories)
+        elapsed = time.perf_counter() - start
+        print(f"scalar replay      {review_count:>9} reviews  {elapsed * 1000:9.1f} ms")
+
+        card_index = np.repeat(np.arange(args.cards), args.reviews)
+        quality = np.array(histories).ravel()
+        start = time.perf_counter()
+        SpacedRepetitionService.replay_reviews(card_index, quality, args.cards)
+        elapsed = time.perf_counter() - start
+        print(f"vectorized replay  {review_count:>9} reviews  {elapsed * 1000:9.1f} ms")
+
+        async def reschedule():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                start = time.perf_counter()
+                response = await client.post(f"/api/sets/{set_id}/reschedule", timeout=3600)
+                elapsed = time.perf_counter() - start
+                response.raise_for_status()
+                assert response.json()["rescheduled"] == args.cards, response.json()
+            return elapsed
+
+        elapsed = asyncio.run(reschedule())
+        print(f"endpoint           {args.cards:>9} cards    {elapsed * 1000:9.1f} ms  "
+              f"{args.cards / elapsed:8.0f} cards/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Review submission throughput with and without review_log writes.
+
+Runs the same sequence of `POST /api/review` calls and 50-card
+`POST /api/reviews/batch` calls twice, toggling
+`Settings.review_log_enabled`, through the ASGI app in-process.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_reviews --cards 5000 --reviews 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+QUALITIES = ["again", "hard", "good", "easy"]
+
+
+async def run_reviews(app, card_ids: list[int], reviews: int, batch_size: int) -> tuple[float, float]:
+    """Return (single reviews/s, batched reviews/s)"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        for _ in range(reviews):
+            response = await client.post("/api/review", json={
+                "card_id": random.choice(card_ids), "quality": random.choice(QUALITIES)
+            })
+            response.raise_for_status()
+        single_rate = reviews / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(reviews // batch_size):
+            response = await client.post("/api/reviews/batch", json={"reviews": [
+                {"card_id": random.choice(card_ids), "quality": random.choice(QUALITIES)}
+                for _ in range(batch_size)
+            ]})
+            response.raise_for_status()
+        batch_rate = (reviews // batch_size * batch_size) / (time.perf_counter() - start)
+
+    return single_rate, batch_rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=5_000)
+    parser.add_argument("--reviews", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from app.config import get_settings
+        from app.main import app
+        from benchmarks.common import seed_set
+
+        _, card_ids = seed_set(db_url, args.cards, with_progress=False)
+
+        for enabled in (False, True):
+            get_settings().review_log_enabled = enabled
+            single_rate, batch_rate = asyncio.run(run_reviews(app, card_ids, args.reviews, args.batch_size))
+            label = "with review_log" if enabled else "without review_log"
+            print(f"{label:<20} single={single_rate:8.1f} reviews/s  batch={batch_rate:8.1f} reviews/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Default versus FAST_SERIALIZATION responses for 10k-item payloads.
+
+Seeds one set whose cards are all due (so `/study-sr?review_limit=N` returns
+every card) and N small sets for `GET /api/sets`, then times both endpoints
+through the ASGI app in-process with the fast path off and on. The bodies are
+compared byte for byte.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_serialization --items 10000 --repeat 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+
+async def time_get(app, url: str, repeat: int) -> tuple[list[float], bytes]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.get(url, timeout=600)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return latencies, response.content
+
+
+def seed_sets(db_url: str, count: int) -> None:
+    from sqlalchemy import create_engine, insert
+    from app.models import Set as SetModel
+
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        conn.execute(insert(SetModel), [{"title": f"Set {i}", "description": "Benchmark"} for i in range(count)])
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from sqlalchemy import create_engine, update
+        from app.config import get_settings
+        from app.main import app
+        from app.models import CardProgress
+        from benchmarks.common import seed_set
+
+        set_id, _ = seed_set(db_url, args.items)
+        engine = create_engine(db_url)
+        with engine.begin() as conn:
+            conn.execute(update(CardProgress).values(next_review=CardProgress.last_reviewed))
+        engine.dispose()
+        seed_sets(db_url, args.items - 1)
+
+        urls = {
+            "study-sr": f"/api/sets/{set_id}/study-sr?review_limit={args.items}",
+            "get_sets": "/api/sets",
+        }
+        for name, url in urls.items():
+            bodies = []
+            for fast in (False, True):
+                get_settings().fast_serialization = fast
+                latencies, body = asyncio.run(time_get(app, url, args.repeat))
+                bodies.append(body)
+                print(
+                    f"{name:<9} {args.items:>6} items  fast={str(fast):<5}  "
+                    f"median={statistics.median(latencies):8.1f} ms  min={min(latencies):8.1f} ms  "
+                    f"body={len(body) / 1024:7.0f} KiB"
+                )
+            assert bodies[0] == bodies[1], f"{name}: bodies differ"
+
+
+if __name__ == "__main__":
+    main()
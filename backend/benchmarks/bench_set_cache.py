@@ -0,0 +1,63 @@
+"""
+Latency of `GET /api/sets/{id}` with the set payload cache off and on.
+
+Seeds one set per size (every card with progress) and times repeated full
+reads through the ASGI app in-process. With the cache on, the first read
+fills it and the rest only check the set version.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_set_cache --cards 1000 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+
+async def time_get_set(app, set_id: int, repeat: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.get(f"/api/sets/{set_id}", timeout=600)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from app.main import app
+        from app.routes import set_cache
+        from benchmarks.common import seed_set
+
+        max_bytes = set_cache.max_bytes
+        for card_count in args.cards:
+            set_id, _ = seed_set(db_url, card_count)
+            for label, cache_bytes in (("off", 0), ("on", max_bytes)):
+                set_cache.clear()
+                set_cache.max_bytes = cache_bytes
+                latencies = asyncio.run(time_get_set(app, set_id, args.repeat))
+                print(
+                    f"{card_count:>8} cards  cache {label:<3}  first={latencies[0]:8.1f} ms  "
+                    f"median={statistics.median(latencies[1:]):8.1f} ms  "
+                    f"max={max(latencies[1:]):8.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Read/write contention on SQLite with the old defaults versus the pragma profile.
+
+For each profile, seeds a fresh database with one large set and starts uvicorn
+with several worker processes. Writer tasks then submit reviews while reader
+tasks fetch `/api/sets/{id}/study-sr` and a page of `/api/sets/{id}`, all for a
+fixed duration. The "before" profile reproduces what the engine used before
+the pragmas were configurable (rollback journal, synchronous=FULL, 2 MiB
+cache, no mmap); "after" uses the Settings defaults.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_sqlite_pragmas --cards 5000 --seconds 20 --workers 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_concurrency import BASE_URL, PORT, wait_for_server
+from benchmarks.common import seed_set, percentile
+
+PROFILES = {
+    "before": {
+        "SQLITE_JOURNAL_MODE": "delete",
+        "SQLITE_SYNCHRONOUS": "full",
+        "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_BUSY_TIMEOUT": "5000",
+        "SQLITE_TEMP_STORE": "default",
+    },
+    "after": {},
+}
+
+
+async def reader(client: httpx.AsyncClient, set_id: int, deadline: float, samples: list, errors: list) -> None:
+    urls = [f"/api/sets/{set_id}/study-sr", f"/api/sets/{set_id}?limit=50"]
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(random.choice(urls), timeout=60)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        samples.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def writer(client: httpx.AsyncClient, card_ids: list[int], deadline: float, samples: list, errors: list) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.post("/api/review", json={
+                "card_id": random.choice(card_ids), "quality": random.choice(["again", "good", "easy"])
+            }, timeout=60)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        samples.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def run(set_id: int, card_ids: list[int], seconds: float, readers: int, writers: int) -> dict:
+    reads, writes, errors = [], [], []
+    limits = httpx.Limits(max_connections=readers + writers)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *(reader(client, set_id, deadline, reads, errors) for _ in range(readers)),
+            *(writer(client, card_ids, deadline, writes, errors) for _ in range(writers))
+        )
+    return {"reads": reads, "writes": writes, "errors": errors}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=5_000)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--profile", choices=[*PROFILES, "both"], default="both")
+    args = parser.parse_args()
+
+    profiles = list(PROFILES) if args.profile == "both" else [args.profile]
+    for profile in profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            set_id, card_ids = seed_set(db_url, args.cards)
+
+            env = {**os.environ, "DATABASE_URL": db_url, "LOG_LEVEL": "WARNING", **PROFILES[profile]}
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT),
+                 "--workers", str(args.workers), "--log-level", "warning"],
+                env=env
+            )
+            try:
+                wait_for_server()
+                result = asyncio.run(run(set_id, card_ids, args.seconds, args.readers, args.writers))
+            finally:
+                server.terminate()
+                server.wait()
+
+        failed = {str(e): result["errors"].count(e) for e in set(result["errors"])}
+        print(f"[{profile}] failed requests: {failed or 0}")
+        for name in ("reads", "writes"):
+            samples = result[name]
+            if not samples:
+                continue
+            print(
+                f"  {name:<6} {len(samples) / args.seconds:8.1f}/s  p50={statistics.median(samples):8.1f} ms  "
+                f"p99={percentile(samples, 99):8.1f} ms  max={max(samples):8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
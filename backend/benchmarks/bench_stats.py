@@ -0,0 +1,57 @@
+"""
+Latency of `GET /api/sets/{id}/stats` on large sets.
+
+Every card is seeded with progress, so the status buckets, averages and
+review windows all have work to do. Requests go through the ASGI app
+in-process, which keeps network noise out of the numbers.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_stats --cards 10000 100000 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+
+async def time_stats(app, set_id: int, repeat: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.get(f"/api/sets/{set_id}/stats", timeout=600)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # The app reads DATABASE_URL at import time
+        os.environ["DATABASE_URL"] = db_url
+
+        from app.main import app
+        from benchmarks.common import seed_set
+
+        for card_count in args.cards:
+            set_id, _ = seed_set(db_url, card_count)
+            latencies = asyncio.run(time_stats(app, set_id, args.repeat))
+            print(
+                f"{card_count:>8} cards  median={statistics.median(latencies):8.1f} ms  "
+                f"min={min(latencies):8.1f} ms  max={max(latencies):8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Shared helpers for the benchmark scripts."""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+
+from app.database import Base
+from app.models import Set as SetModel, Card as CardModel, CardProgress
+
+
+def seed_set(db_url: str, card_count: int, with_progress: bool = True) -> tuple[int, list[int]]:
+    """
+    Create one set with `card_count` cards through a sync engine.
+    When `with_progress` is set, every card gets a randomized CardProgress row.
+
+    Returns:
+        (set_id, card_ids)
+    """
+    engine = create_engine(db_url)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now()
+
+    with engine.begin() as conn:
+        set_id = conn.execute(insert(SetModel).values(title="Benchmark set")).inserted_primary_key[0]
+        conn.execute(insert(CardModel), [
+            {"set_id": set_id, "term": f"Term {i}", "definition": f"Definition {i}", "order": i}
+            for i in range(card_count)
+        ])
+        card_ids = list(conn.execute(select(CardModel.id).where(CardModel.set_id == set_id)).scalars())
+
+        if with_progress:
+            conn.execute(insert(CardProgress), [
+                {
+                    "card_id": card_id,
+                    "set_id": set_id,
+                    "ease_factor": random.choice([1.7, 2.1, 2.5]),
+                    "interval_days": 3,
+                    "repetitions": random.randint(0, 5),
+                    "lapses": random.randint(0, 2),
+                    "last_reviewed": now - timedelta(days=random.randint(0, 30)),
+                    "next_review": now + timedelta(days=random.randint(-5, 5)),
+                }
+                for card_id in card_ids
+            ])
+
+    engine.dispose()
+    return set_id, card_ids
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
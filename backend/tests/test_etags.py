@@ -0,0 +1,86 @@
+def create_set(client):
+    set_data = {
+        "title": "ETag Set",
+        "cards": [
+            {"term": "Card 1", "definition": "Def 1", "order": 0},
+            {"term": "Card 2", "definition": "Def 2", "order": 1}
+        ]
+    }
+    response = client.post("/api/sets", json=set_data)
+    return response.json()["id"], [card["id"] for card in response.json()["cards"]]
+
+
+def test_get_endpoints_answer_304_for_current_etag(client):
+    """Test that set, stats and study-sr honour If-None-Match"""
+    set_id, _ = create_set(client)
+
+    for url in (f"/api/sets/{set_id}", f"/api/sets/{set_id}/stats", f"/api/sets/{set_id}/study-sr"):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["ETag"] == etag
+
+
+def test_etag_differs_per_query(client):
+    """Test that different pages of a set get different ETags"""
+    set_id, _ = create_set(client)
+
+    full = client.get(f"/api/sets/{set_id}").headers["ETag"]
+    page = client.get(f"/api/sets/{set_id}", params={"limit": 1}).headers["ETag"]
+    assert full != page
+
+    response = client.get(f"/api/sets/{set_id}", params={"limit": 1}, headers={"If-None-Match": full})
+    assert response.status_code == 200
+
+
+def test_writes_invalidate_etag(client):
+    """Test that reviews, updates and resets bump the set version"""
+    set_id, card_ids = create_set(client)
+    url = f"/api/sets/{set_id}/stats"
+
+    etag = client.get(url).headers["ETag"]
+    client.post("/api/review", json={"card_id": card_ids[0], "quality": "good"})
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    etag = client.get(url).headers["ETag"]
+    client.post("/api/reviews/batch", json={"reviews": [{"card_id": card_ids[1], "quality": "easy"}]})
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    etag = client.get(url).headers["ETag"]
+    client.post(f"/api/sets/{set_id}/reset-progress")
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    etag = client.get(f"/api/sets/{set_id}").headers["ETag"]
+    client.put(f"/api/sets/{set_id}", json={
+        "title": "Renamed",
+        "cards": [{"term": "Card 1", "definition": "Def 1", "order": 0}]
+    })
+    response = client.get(f"/api/sets/{set_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+
+
+def test_deleted_set_is_not_served_from_etag(client):
+    """Test that a deleted set answers 404 even with a previously valid ETag, and a new set never matches it"""
+    set_id, _ = create_set(client)
+    urls = (f"/api/sets/{set_id}", f"/api/sets/{set_id}/stats")
+    etags = {url: client.get(url).headers["ETag"] for url in urls}
+
+    client.delete(f"/api/sets/{set_id}")
+    for url in urls:
+        assert client.get(url, headers={"If-None-Match": etags[url]}).status_code == 404
+
+    # The id is not handed out again, so neither is the (id, version) pair
+    new_set_id, _ = create_set(client)
+    assert new_set_id != set_id
+    for url in urls:
+        assert client.get(url, headers={"If-None-Match": etags[url]}).status_code == 404
+        new_url = url.replace(f"/sets/{set_id}", f"/sets/{new_set_id}")
+        response = client.get(new_url, headers={"If-None-Match": etags[url]})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etags[url]
@@ -0,0 +1,220 @@
+import asyncio
+import json
+
+from sqlalchemy import event
+
+from app.config import get_settings
+from app.services.deck_import import MAX_RECORD_LINES, DeckFormat, iter_deck_rows
+from tests.conftest import async_engine
+
+
+def parse(chunks, deck_format, **kwargs):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [row async for row in iter_deck_rows(stream(), deck_format, **kwargs)]
+
+    return asyncio.run(collect())
+
+
+def test_parser_handles_chunk_boundaries():
+    """Test that lines and multi-byte characters split across chunks are reassembled"""
+    data = "żółw\tturtle\r\nkot\tcat\n".encode()
+    chunks = [data[i:i + 3] for i in range(0, len(data), 3)]
+
+    rows = parse(chunks, DeckFormat.TEXT)
+
+    assert [(r.line, r.term, r.definition) for r in rows] == [(1, "żółw", "turtle"), (2, "kot", "cat")]
+
+
+def test_parser_csv_quoted_field_spans_lines():
+    """Test that a quoted CSV field with a line break stays one row"""
+    data = b'term,definition\n"a, b","line one\nline two"\nc,d,tags\n'
+
+    rows = parse([data[:20], data[20:]], DeckFormat.CSV, has_header=True)
+
+    assert [(r.line, r.term, r.definition) for r in rows] == [
+        (2, "a, b", "line one\nline two"),
+        (4, "c", "d")
+    ]
+
+
+def test_parser_csv_stray_quote_loses_bounded_line_range():
+    """Test that an unterminated quote is reported with its line range and parsing resumes after it"""
+    data = '"stray,quote\n' + "".join(f"term {i},def {i}\n" for i in range(MAX_RECORD_LINES + 50))
+
+    rows = parse([data.encode()], DeckFormat.CSV)
+
+    assert rows[0].line == 1
+    assert rows[0].error == f"Unterminated quoted field, skipped lines 1-{MAX_RECORD_LINES}"
+    assert (rows[1].line, rows[1].term) == (MAX_RECORD_LINES + 1, f"term {MAX_RECORD_LINES - 1}")
+    assert len(rows) == 52
+
+    rows = parse([b'a,b\n"open,c\nd,e\n'], DeckFormat.CSV)
+    assert rows[-1].error == "Unterminated quoted field, skipped lines 2-3"
+
+
+def test_parser_reports_bad_rows_and_anki_headers():
+    """Test row errors and the Anki #separator header"""
+    data = b"#separator:semicolon\n#html:false\nhola;hello\nno separator here\n\n"
+
+    rows = parse([data], DeckFormat.TEXT)
+
+    assert (rows[0].term, rows[0].definition) == ("hola", "hello")
+    assert rows[1].line == 4
+    assert rows[1].error == "Separator not found"
+    assert len(rows) == 2
+
+
+def test_import_endpoint_commits_in_batches(client, monkeypatch):
+    """Test streamed import of a TSV deck larger than one batch"""
+    monkeypatch.setattr(get_settings(), "import_batch_size", 10)
+
+    def body():
+        yield b"term\tdefinition\n"
+        for i in range(25):
+            yield f"Term {i}\tDefinition {i}\n".encode()
+        yield b"only one column\n"
+        yield b"\tmissing term\n"
+
+    response = client.post(
+        "/api/sets/import",
+        params={"title": "Imported", "format": "tsv", "has_header": True},
+        content=body()
+    )
+
+    assert response.status_code == 201
+    result = response.json()
+    assert result["rows_read"] == 27
+    assert result["imported"] == 25
+    assert result["failed"] == 2
+    assert [e["line"] for e in result["errors"]] == [27, 28]
+    assert result["errors"][0]["detail"] == "Expected a term and a definition"
+    assert result["errors"][1]["detail"].startswith("term:")
+
+    cards = client.get(f"/api/sets/{result['set_id']}").json()["cards"]
+    assert len(cards) == 25
+    assert [c["order"] for c in cards] == list(range(25))
+    assert cards[24]["term"] == "Term 24"
+
+
+def test_import_endpoint_rejects_unreadable_upload(client):
+    """Test that a failed import leaves no partial set behind"""
+    response = client.post(
+        "/api/sets/import",
+        params={"title": "Broken"},
+        content=b"ok\tfine\n\xff\xfe\tbad bytes\n"
+    )
+    assert response.status_code == 400
+    assert "not valid UTF-8" in response.json()["detail"]
+
+    response = client.post("/api/sets/import", params={"title": "Empty"}, content=b"\n\n")
+    assert response.status_code == 400
+
+    assert client.get("/api/sets").json() == []
+
+
+def create_reviewed_set(client, title="Export Set"):
+    response = client.post("/api/sets", json={
+        "title": title,
+        "description": "To back up",
+        "cards": [{"term": f"Card {i}", "definition": f"Def {i}", "order": i} for i in range(5)]
+    })
+    set_data = response.json()
+    client.post("/api/review", json={"card_id": set_data["cards"][1]["id"], "quality": "good"})
+    client.post("/api/review", json={"card_id": set_data["cards"][3]["id"], "quality": "again"})
+    return set_data
+
+
+def test_export_streams_sets_cards_and_progress(client):
+    """Test the NDJSON export record order and content"""
+    set_data = create_reviewed_set(client)
+    create_reviewed_set(client, title="Other Set")
+
+    response = client.get("/api/export", params={"set_id": set_data["id"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["type"] for r in records] == [
+        "header", "set", "card", "card", "progress", "card", "card", "progress", "card"
+    ]
+    assert records[1]["title"] == "Export Set"
+    assert records[4]["card_id"] == set_data["cards"][1]["id"]
+    assert records[7]["lapses"] == 1
+
+    everything = client.get("/api/export").text.splitlines()
+    assert sum(json.loads(line)["type"] == "set" for line in everything) == 2
+
+    assert client.get("/api/export", params={"set_id": 999}).status_code == 404
+
+
+def test_export_returns_its_connections(client):
+    """Test that every connection the streamed export checks out goes back to the pool"""
+    create_reviewed_set(client)
+    counts = {"checkout": 0, "checkin": 0}
+
+    def count(name):
+        def listener(*args):
+            counts[name] += 1
+        return listener
+
+    listeners = {name: count(name) for name in counts}
+    for name, listener in listeners.items():
+        event.listen(async_engine.sync_engine.pool, name, listener)
+    try:
+        for _ in range(5):
+            assert client.get("/api/export").status_code == 200
+    finally:
+        for name, listener in listeners.items():
+            event.remove(async_engine.sync_engine.pool, name, listener)
+
+    assert counts["checkout"] > 0
+    assert counts["checkin"] == counts["checkout"]
+
+
+def test_ndjson_import_restores_export(client, monkeypatch):
+    """Test that an export round-trips through POST /api/import/ndjson in small batches"""
+    monkeypatch.setattr(get_settings(), "import_batch_size", 2)
+    monkeypatch.setattr(get_settings(), "export_yield_per", 3)
+
+    original = create_reviewed_set(client)
+    exported = client.get("/api/export").content
+
+    response = client.post("/api/import/ndjson", content=iter(exported.splitlines(keepends=True)))
+
+    assert response.status_code == 201
+    result = response.json()
+    assert (result["sets"], result["cards"], result["progress"], result["failed"]) == (1, 5, 2, 0)
+
+    sets = client.get("/api/sets").json()
+    restored_id = next(s["id"] for s in sets if s["id"] != original["id"])
+    restored = client.get(f"/api/sets/{restored_id}").json()
+    assert restored["description"] == "To back up"
+    assert [c["term"] for c in restored["cards"]] == [c["term"] for c in original["cards"]]
+    assert [c["progress"] is not None for c in restored["cards"]] == [False, True, False, True, False]
+    assert restored["cards"][3]["progress"]["lapses"] == 1
+
+
+def test_ndjson_import_reports_bad_records(client):
+    """Test row errors for invalid and out-of-place records"""
+    lines = [
+        {"type": "card", "id": 1, "set_id": 1, "term": "Orphan", "definition": "No set", "order": 0},
+        {"type": "set", "id": 1, "title": "Restored"},
+        {"type": "card", "id": 2, "set_id": 1, "term": "Kept", "definition": "Yes", "order": 0},
+        {"type": "progress", "card_id": 2, "ease_factor": -1.0, "interval_days": 1, "repetitions": 1, "lapses": 0},
+        {"type": "progress", "card_id": 7, "ease_factor": 2.5, "interval_days": 1, "repetitions": 1, "lapses": 0},
+        {"type": "unknown"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\nnot json\n"
+
+    result = client.post("/api/import/ndjson", content=body.encode()).json()
+
+    assert (result["sets"], result["cards"], result["progress"]) == (1, 1, 0)
+    assert [e["line"] for e in result["errors"]] == [1, 4, 5, 6, 7]
+    assert result["errors"][1]["detail"].startswith("progress.ease_factor:")
+
+    response = client.post("/api/import/ndjson", content=b'{"type": "header", "version": 99, "exported_at": "2026-01-01T00:00:00"}\n')
+    assert response.status_code == 400
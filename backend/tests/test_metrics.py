@@ -0,0 +1,69 @@
+from app.metrics import Histogram
+
+
+def scrape(client) -> dict:
+    """GET /metrics -> {sample name with labels: value}"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test the exposition of a histogram: cumulative buckets, sum and count"""
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/a"b')
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a\\"b",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a\\"b",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a\\"b"} 3.65',
+        'latency_seconds_count{route="/a\\"b"} 4',
+    ]
+
+
+def test_metrics_endpoint(client):
+    """Test that requests are counted by route template and reviews by quality"""
+    create_response = client.post("/api/sets", json={
+        "title": "Metrics Set",
+        "cards": [{"term": f"Term {i}", "definition": f"Def {i}", "order": i} for i in range(2)]
+    })
+    set_id = create_response.json()["id"]
+    cards = create_response.json()["cards"]
+    study_count = 'studycards_http_request_duration_seconds_count{method="GET",route="/api/sets/{set_id}/study-sr"}'
+    before = scrape(client)
+
+    for _ in range(2):
+        assert client.get(f"/api/sets/{set_id}/study-sr").status_code == 200
+    client.post("/api/review", json={"card_id": cards[0]["id"], "quality": "good"})
+    client.post("/api/reviews/batch", json={"reviews": [
+        {"card_id": cards[0]["id"], "quality": "again"},
+        {"card_id": cards[1]["id"], "quality": "good"},
+        {"card_id": 999_999, "quality": "easy"},
+    ]})
+    client.get("/api/no-such-route")
+    after = scrape(client)
+
+    def delta(name):
+        return after.get(name, 0) - before.get(name, 0)
+
+    assert delta(study_count) == 2
+    assert delta(study_count.replace("_count{", '_bucket{').replace('"}', '",le="+Inf"}')) == 2
+    assert delta('studycards_http_requests_total{method="GET",route="/api/sets/{set_id}/study-sr",status="200"}') == 2
+    assert delta('studycards_http_requests_total{method="GET",route="<unmatched>",status="404"}') == 1
+    assert delta('studycards_reviews_total{quality="good"}') == 2
+    assert delta('studycards_reviews_total{quality="again"}') == 1
+    assert delta('studycards_reviews_total{quality="easy"}') == 0
+    # The scrape itself is in flight
+    assert after["studycards_http_requests_in_flight"] == 1
+    assert delta("studycards_db_pool_checkout_seconds_count") >= 4
+    assert "studycards_set_cache_hits_total" in after
@@ -0,0 +1,55 @@
+import logging
+import re
+
+import pytest
+
+from app.config import get_settings
+
+
+@pytest.fixture
+def profile_every_request(monkeypatch):
+    monkeypatch.setattr(get_settings(), "profiling_sample_rate", 1.0)
+
+
+def parse_server_timing(header: str) -> dict:
+    """Server-Timing header -> {name: (duration in ms, description)}"""
+    metrics = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        values = dict(param.split("=", 1) for param in params)
+        metrics[name] = (float(values["dur"]), values.get("desc", "").strip('"'))
+    return metrics
+
+
+def test_server_timing_counts_queries(client, profile_every_request, sql_statements, caplog):
+    """Test that a sampled request reports its statements, handler and serialization time"""
+    create_response = client.post("/api/sets", json={
+        "title": "Profiled Set",
+        "cards": [{"term": f"Term {i}", "definition": f"Def {i}", "order": i} for i in range(3)]
+    })
+    assert "server-timing" in create_response.headers
+    set_id = create_response.json()["id"]
+
+    sql_statements.clear()
+    with caplog.at_level(logging.INFO, logger="app.profiling"):
+        response = client.get(f"/api/sets/{set_id}/study-sr")
+    assert response.status_code == 200
+
+    metrics = parse_server_timing(response.headers["server-timing"])
+    assert set(metrics) == {"sql", "handler", "serialize", "total"}
+    assert metrics["sql"][1] == f"{len(sql_statements)} queries"
+    assert 0 < metrics["sql"][0] <= metrics["handler"][0] <= metrics["total"][0]
+    assert metrics["serialize"][0] > 0
+
+    line = [record.getMessage() for record in caplog.records if record.name == "app.profiling"][-1]
+    assert re.search(r"method=GET route=/api/sets/\{set_id\}/study-sr status=200 ", line)
+    assert f"queries={len(sql_statements)} " in line
+
+
+def test_unsampled_requests_have_no_server_timing(client, caplog):
+    """Test that profiling is off by default"""
+    with caplog.at_level(logging.INFO, logger="app.profiling"):
+        response = client.get("/health")
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert not [record for record in caplog.records if record.name == "app.profiling"]
@@ -0,0 +1,121 @@
+"""
+Query budgets: the most statements each endpoint may send to the database.
+
+A change that adds a round trip has to raise the budget here on purpose, and
+counts must not depend on how many cards a set has (no per-card lazy loads).
+"""
+import pytest
+
+# Endpoint -> statement budget, for a set whose cards all have progress and history
+QUERY_BUDGETS = {
+    "GET /api/sets": 1,
+    "GET /api/sets/{set_id}": 2,
+    "GET /api/sets/{set_id}?limit": 2,
+    "GET /api/sets/{set_id}/study": 1,
+    "GET /api/sets/{set_id}/study-sr": 3,
+    "GET /api/study/due": 1,
+    "POST /api/review": 5,
+    "POST /api/reviews/batch": 5,
+    "GET /api/sets/{set_id}/stats": 3,
+    "GET /api/sets/{set_id}/activity": 1,
+    "GET /api/sets/{set_id}/accuracy": 1,
+    "GET /api/sets/{set_id}/forecast": 1,
+    "GET /api/cards/{card_id}/history": 1,
+    "GET /api/search": 1,
+    "GET /api/export": 3,
+    "POST /api/sets/import": 3,
+    "POST /api/import/ndjson": 6,
+    "POST /api/sets/{set_id}/reschedule": 6,
+    "PUT /api/sets/{set_id}": 4,
+    "PATCH /api/sets/{set_id}": 3,
+    "POST /api/sets/{set_id}/reset-progress": 3,
+    "DELETE /api/sets/{set_id}": 5,
+}
+
+
+def count_endpoint_queries(client, count_queries, card_count: int) -> dict:
+    """Call every budgeted endpoint on a fresh set of `card_count` studied cards"""
+    create_response = client.post("/api/sets", json={
+        "title": "Budget Set",
+        "cards": [{"term": f"Card {i}", "definition": "Def", "order": i} for i in range(card_count)]
+    })
+    set_id = create_response.json()["id"]
+    card_ids = [card["id"] for card in create_response.json()["cards"]]
+    client.post("/api/reviews/batch", json={"reviews": [
+        {"card_id": card_id, "quality": "good"} for card_id in card_ids
+    ]})
+    export = client.get("/api/export", params={"set_id": set_id}).content
+    tsv = "".join(f"Term {i}\tDef {i}\n" for i in range(card_count)).encode()
+
+    calls = [
+        ("GET /api/sets", "GET", "/api/sets", {}),
+        ("GET /api/sets/{set_id}", "GET", f"/api/sets/{set_id}", {}),
+        ("GET /api/sets/{set_id}?limit", "GET", f"/api/sets/{set_id}", {"params": {"limit": 5}}),
+        ("GET /api/sets/{set_id}/study", "GET", f"/api/sets/{set_id}/study", {}),
+        ("GET /api/sets/{set_id}/study-sr", "GET", f"/api/sets/{set_id}/study-sr", {}),
+        ("GET /api/study/due", "GET", "/api/study/due", {}),
+        ("POST /api/review", "POST", "/api/review", {"json": {"card_id": card_ids[0], "quality": "hard"}}),
+        ("POST /api/reviews/batch", "POST", "/api/reviews/batch", {"json": {"reviews": [
+            {"card_id": card_id, "quality": "again"} for card_id in card_ids
+        ]}}),
+        ("GET /api/sets/{set_id}/stats", "GET", f"/api/sets/{set_id}/stats", {}),
+        ("GET /api/sets/{set_id}/activity", "GET", f"/api/sets/{set_id}/activity", {}),
+        ("GET /api/sets/{set_id}/accuracy", "GET", f"/api/sets/{set_id}/accuracy", {}),
+        ("GET /api/sets/{set_id}/forecast", "GET", f"/api/sets/{set_id}/forecast", {}),
+        ("GET /api/cards/{card_id}/history", "GET", f"/api/cards/{card_ids[0]}/history", {}),
+        ("GET /api/search", "GET", "/api/search", {"params": {"q": "card"}}),
+        ("GET /api/export", "GET", "/api/export", {"params": {"set_id": set_id}}),
+        ("POST /api/sets/import", "POST", "/api/sets/import", {"params": {"title": "Imported"}, "content": tsv}),
+        ("POST /api/import/ndjson", "POST", "/api/import/ndjson", {"content": export}),
+        ("POST /api/sets/{set_id}/reschedule", "POST", f"/api/sets/{set_id}/reschedule", {}),
+        ("PUT /api/sets/{set_id}", "PUT", f"/api/sets/{set_id}", {"json": {"title": "Renamed", "cards": [
+            {"id": card_id, "term": "Changed", "definition": "Def", "order": i} for i, card_id in enumerate(card_ids)
+        ]}}),
+        ("PATCH /api/sets/{set_id}", "PATCH", f"/api/sets/{set_id}", {"json": {"description": "Patched"}}),
+        ("POST /api/sets/{set_id}/reset-progress", "POST", f"/api/sets/{set_id}/reset-progress", {}),
+        ("DELETE /api/sets/{set_id}", "DELETE", f"/api/sets/{set_id}", {}),
+    ]
+
+    counts = {}
+    for endpoint, method, url, kwargs in calls:
+        with count_queries() as statements:
+            response = client.request(method, url, **kwargs)
+        assert response.status_code < 400, f"{endpoint}: {response.status_code} {response.text}"
+        counts[endpoint] = len(statements)
+    return counts
+
+
+def test_endpoints_stay_within_query_budget(client, count_queries):
+    """Test that no endpoint sends more statements than its budget"""
+    counts = count_endpoint_queries(client, count_queries, card_count=20)
+
+    assert counts.keys() == QUERY_BUDGETS.keys()
+    over_budget = {
+        endpoint: f"{count} statements, budget {QUERY_BUDGETS[endpoint]}"
+        for endpoint, count in counts.items() if count > QUERY_BUDGETS[endpoint]
+    }
+    assert not over_budget
+
+
+def test_query_counts_do_not_grow_with_set_size(client, count_queries):
+    """Test that endpoints do not send a statement per card (N+1 queries)"""
+    assert count_endpoint_queries(client, count_queries, card_count=2) == \
+        count_endpoint_queries(client, count_queries, card_count=40)
+
+
+@pytest.mark.parametrize("url", [
+    "/api/sets/999/study",
+    "/api/sets/999/activity",
+    "/api/sets/999/accuracy",
+    "/api/sets/999/forecast",
+    "/api/cards/999/history",
+])
+def test_missing_set_or_card_still_404(client, url):
+    """Test that routes which only check existence on an empty result still answer 404"""
+    response = client.get(url)
+    assert response.status_code == 404
+
+
+def test_reset_progress_of_missing_set_is_404(client):
+    """Test that the version bump alone detects a missing set"""
+    assert client.post("/api/sets/999/reset-progress").status_code == 404
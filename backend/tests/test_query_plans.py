@@ -0,0 +1,98 @@
+"""
+Query plan checks: every statement the routes issue must reach `cards`
+and `card_progress` through an index, never through a full table scan.
+"""
+import pytest
+
+from tests.conftest import engine
+
+WATCHED_TABLES = ("cards", "card_progress")
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "sqlite", reason="EXPLAIN QUERY PLAN output is SQLite-specific"
+)
+
+
+def exercise_all_routes(client):
+    """Call every endpoint once so their statements get recorded"""
+    set_data = {
+        "title": "Plan Set",
+        "cards": [{"term": f"Card {i}", "definition": "Def", "order": i} for i in range(3)]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    set_id = create_response.json()["id"]
+    card_ids = [card["id"] for card in create_response.json()["cards"]]
+
+    client.get("/api/sets")
+    client.get(f"/api/sets/{set_id}")
+    next_cursor = client.get(f"/api/sets/{set_id}", params={"limit": 1}).json()["next_cursor"]
+    client.get(f"/api/sets/{set_id}", params={"limit": 1, "after": next_cursor})
+    client.get(f"/api/sets/{set_id}/study")
+    client.get(f"/api/sets/{set_id}/study-sr")
+    queue_cursor = client.get("/api/study/due", params={"limit": 1}).json()["next_cursor"]
+    client.get("/api/study/due", params={"limit": 1, "after": queue_cursor})
+    client.post("/api/review", json={"card_id": card_ids[0], "quality": "good"})
+    client.post("/api/reviews/batch", json={"reviews": [
+        {"card_id": card_ids[1], "quality": "again"},
+        {"card_id": card_ids[2], "quality": "easy"}
+    ]})
+    client.get(f"/api/sets/{set_id}/stats")
+    client.get(f"/api/sets/{set_id}/activity")
+    client.get(f"/api/cards/{card_ids[0]}/history")
+    client.get(f"/api/sets/{set_id}/accuracy")
+    client.post("/api/sets/import", params={"title": "Imported"}, content=b"term\tdefinition\n")
+    client.post("/api/import/ndjson", content=client.get("/api/export", params={"set_id": set_id}).content)
+    client.post(f"/api/sets/{set_id}/reschedule")
+    client.get("/api/study/due", params={"limit": 1})
+    due_cursor = client.get("/api/study/due", params={"limit": 1}).json()["next_cursor"]
+    client.get("/api/study/due", params={"limit": 1, "after": due_cursor})
+    client.get(f"/api/sets/{set_id}/forecast")
+    search_cursor = client.get("/api/search", params={"q": "card", "limit": 1}).json()["next_cursor"]
+    client.get("/api/search", params={"q": "card", "limit": 1, "after": search_cursor})
+    client.put(f"/api/sets/{set_id}", json=set_data)
+    client.patch(f"/api/sets/{set_id}", json={
+        "cards": [{"id": card_ids[0], "term": "Changed", "definition": "Def", "order": 0}],
+        "deleted_card_ids": [card_ids[1]]
+    })
+    client.post(f"/api/sets/{set_id}/reset-progress")
+    client.delete(f"/api/sets/{set_id}")
+
+
+def explain(statement, parameters):
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan):
+    return [
+        step for step in plan
+        if step.startswith("SCAN ") and step.split()[1] in WATCHED_TABLES
+    ]
+
+
+def test_routes_do_not_full_scan_cards_or_progress(client, sql_statements):
+    """Test that no route statement scans cards or card_progress end to end"""
+    exercise_all_routes(client)
+
+    checked = set()
+    offenders = []
+    for statement, parameters in sql_statements:
+        if statement in checked or not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            continue
+        checked.add(statement)
+
+        scans = full_scans(explain(statement, parameters))
+        if scans:
+            offenders.append(f"{statement}\n    -> {scans}")
+
+    assert checked, "no statements were recorded"
+    assert not offenders, "full table scans:\n" + "\n".join(offenders)
+
+
+def test_full_scan_detection():
+    """Test that the plan check itself flags a scan on a watched table"""
+    assert full_scans(["SCAN cards"]) == ["SCAN cards"]
+    assert full_scans(["SCAN card_progress USING COVERING INDEX ix_x"]) != []
+    assert full_scans(["SEARCH cards USING INDEX ix_cards_set_id_order (set_id=?)"]) == []
+    assert full_scans(["SCAN sets"]) == []
@@ -0,0 +1,95 @@
+def create_set(client, title, cards):
+    response = client.post("/api/sets", json={
+        "title": title,
+        "cards": [{"term": term, "definition": definition, "order": i} for i, (term, definition) in enumerate(cards)]
+    })
+    return response.json()
+
+
+def search(client, q, **params):
+    response = client.get("/api/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_search_ranks_and_highlights_hits_across_sets(client):
+    """Test that hits from every set come back ranked, with the set title and marked matches"""
+    animals = create_set(client, "Zwierzęta", [
+        ("Kot", "Cat"), ("Pies", 'Dog, not a "cat" <3 & co'), ("Żółw", "Turtle")
+    ])
+    create_set(client, "Music", [("Catalog", "Katalog"), ("Piano", "Fortepian")])
+
+    result = search(client, "cat")
+
+    assert [hit["term"] for hit in result["hits"]] == ["Catalog", "Kot", "Pies"]
+    assert result["next_cursor"] is None
+    assert result["hits"][0]["term_highlight"] == "<mark>Catalog</mark>"
+    assert result["hits"][0]["set_title"] == "Music"
+    dog = result["hits"][2]
+    assert dog["set_id"] == animals["id"]
+    assert dog["card_id"] == animals["cards"][1]["id"]
+    assert dog["set_title"] == "Zwierzęta"
+    assert dog["definition"] == 'Dog, not a "cat" <3 & co'
+    assert dog["definition_highlight"] == 'Dog, not a "<mark>cat</mark>" &lt;3 &amp; co'
+
+    # Every word has to match; the last one also as a prefix
+    assert [hit["term"] for hit in search(client, "dog CAT")["hits"]] == ["Pies"]
+    assert [hit["term"] for hit in search(client, "fortep")["hits"]] == ["Piano"]
+    # Too short to be a prefix
+    assert search(client, "ca")["hits"] == []
+    assert search(client, "żółw")["hits"][0]["term_highlight"] == "<mark>Żółw</mark>"
+    # Query syntax characters are not passed through
+    assert search(client, '"!*')["hits"] == []
+    assert search(client, 'cat" -"dog')["hits"][0]["term"] == "Pies"
+
+
+def test_search_pagination(client):
+    """Test that following next_cursor returns every hit exactly once"""
+    create_set(client, "Big", [(f"Word {i}", "word " * (i % 4 + 1)) for i in range(25)])
+    expected = [hit["card_id"] for hit in search(client, "word", limit=100)["hits"]]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 7} if cursor is None else {"limit": 7, "after": cursor}
+        page = search(client, "word", **params)
+        seen.extend(hit["card_id"] for hit in page["hits"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(expected) == 25
+    assert seen == expected
+    assert client.get("/api/search", params={"q": "word", "after": "bad"}).status_code == 400
+    # Well-formed token, wrong value types: [{"a": 1}, "1"]
+    assert client.get("/api/search", params={"q": "word", "after": "W3siYSI6IDF9LCAiMSJd"}).status_code == 400
+    assert client.get("/api/search", params={"q": ""}).status_code == 422
+
+
+def test_search_index_follows_writes(client):
+    """Test that created, edited, imported and deleted cards are reflected in search"""
+    created = create_set(client, "Original", [("Jabłko", "Apple"), ("Gruszka", "Pear")])
+    set_id = created["id"]
+    apple_id, pear_id = (card["id"] for card in created["cards"])
+
+    client.put(f"/api/sets/{set_id}", json={
+        "title": "Renamed",
+        "cards": [{"id": apple_id, "term": "Banan", "definition": "Banana", "order": 0}]
+    })
+    assert search(client, "apple")["hits"] == []
+    assert search(client, "pear")["hits"] == []
+    hit = search(client, "banana")["hits"][0]
+    assert (hit["card_id"], hit["set_title"]) == (apple_id, "Renamed")
+
+    client.patch(f"/api/sets/{set_id}", json={
+        "cards": [{"term": "Śliwka", "definition": "Plum", "order": 1}]
+    })
+    assert search(client, "plum")["hits"][0]["term"] == "Śliwka"
+
+    client.post("/api/sets/import", params={"title": "Imported"}, content="Wiśnia\tCherry\n".encode())
+    assert search(client, "cherry")["hits"][0]["set_title"] == "Imported"
+
+    client.delete(f"/api/sets/{set_id}")
+    assert search(client, "banana")["hits"] == []
+    assert search(client, "plum")["hits"] == []
+    assert pear_id not in [hit["card_id"] for hit in search(client, "pear")["hits"]]
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import get_settings
+from app.models import CardProgress
+
+
+@pytest.fixture
+def fast_and_default(client, monkeypatch):
+    """Fetch a URL with FAST_SERIALIZATION off and on"""
+    def fetch(url, **kwargs):
+        responses = []
+        for fast in (False, True):
+            monkeypatch.setattr(get_settings(), "fast_serialization", fast)
+            responses.append(client.get(url, **kwargs))
+        return responses
+
+    return fetch
+
+
+def test_fast_study_sr_matches_default(client, db_session, fast_and_default):
+    """Test that the fast path returns the same bytes and headers for /study-sr"""
+    create_response = client.post("/api/sets", json={
+        "title": "Fast Set",
+        "cards": [{"term": f"Żółw {i}", "definition": f"Turtle \"{i}\"", "order": i} for i in range(5)]
+    })
+    set_id = create_response.json()["id"]
+    cards = create_response.json()["cards"]
+
+    now = datetime.now().replace(microsecond=0)
+    for card, offset, ease in zip(cards[:3], (-2, 0, 4), (2.5, 2.3499999999999996, 1.3)):
+        db_session.add(CardProgress(
+            card_id=card["id"], set_id=set_id, ease_factor=ease, interval_days=3, repetitions=2,
+            lapses=1, last_reviewed=now - timedelta(days=3, microseconds=1500), next_review=now + timedelta(days=offset)
+        ))
+    db_session.commit()
+
+    default, fast = fast_and_default(f"/api/sets/{set_id}/study-sr")
+
+    assert fast.status_code == 200
+    assert fast.content == default.content
+    assert fast.headers["etag"] == default.headers["etag"]
+    assert fast.json()["stats"] == {"total_cards": 4, "new_cards": 2, "review_cards": 2, "overdue_cards": 1}
+
+    not_modified = client.get(f"/api/sets/{set_id}/study-sr", headers={"If-None-Match": fast.headers["etag"]})
+    assert not_modified.status_code == 304
+
+
+def test_fast_get_sets_matches_default(client, fast_and_default):
+    """Test that the fast path returns the same bytes and cursor for GET /api/sets"""
+    for i in range(3):
+        client.post("/api/sets", json={
+            "title": f"Set {i}",
+            "description": None if i else "Opis",
+            "cards": [{"term": "Term", "definition": "Def", "order": j} for j in range(i + 1)]
+        })
+
+    default, fast = fast_and_default("/api/sets")
+    assert fast.content == default.content
+    assert len(fast.json()) == 3
+
+    default, fast = fast_and_default("/api/sets", params={"limit": 2})
+    assert fast.content == default.content
+    assert fast.headers["x-next-cursor"] == default.headers["x-next-cursor"]
@@ -0,0 +1,99 @@
+from app.routes import set_cache
+from app.services import set_cache as set_cache_module
+from app.services.set_cache import SetPayloadCache
+
+
+def test_cache_evicts_least_recently_used_beyond_memory_cap():
+    """Test LRU eviction by payload size and that oversized payloads are not kept"""
+    cache = SetPayloadCache(max_bytes=10, ttl=60)
+    cache.put(1, 1, b"aaaa")
+    cache.put(2, 1, b"bbbb")
+    assert cache.get(1, 1) == b"aaaa"
+
+    cache.put(3, 1, b"cccc")
+
+    assert cache.get(2, 1) is None
+    assert cache.get(1, 1) == b"aaaa"
+    assert cache.get(3, 1) == b"cccc"
+    assert (cache.size, cache.evictions) == (8, 1)
+
+    cache.put(4, 1, b"x" * 11)
+    assert cache.get(4, 1) is None
+    assert cache.size == 8
+
+
+def test_cache_rejects_expired_and_outdated_entries(monkeypatch):
+    """Test TTL expiry and the version check"""
+    now = [1000.0]
+    monkeypatch.setattr(set_cache_module.time, "monotonic", lambda: now[0])
+    cache = SetPayloadCache(max_bytes=100, ttl=30)
+    cache.put(1, 1, b"old")
+    cache.put(2, 1, b"other")
+
+    assert cache.get(1, 2) is None
+    now[0] += 31
+    assert cache.get(2, 1) is None
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["size_bytes"]) == (0, 0)
+    assert (stats["hits"], stats["misses"], stats["invalidations"], stats["expirations"]) == (0, 2, 1, 1)
+
+
+def test_get_set_served_from_cache(client):
+    """Test that repeated reads hit the cache and return the same body and ETag"""
+    set_id = client.post("/api/sets", json={
+        "title": "Cached", "cards": [{"term": "Kot", "definition": "Cat", "order": 0}]
+    }).json()["id"]
+
+    before = client.get("/api/cache/sets").json()
+    first = client.get(f"/api/sets/{set_id}")
+    second = client.get(f"/api/sets/{set_id}")
+    client.get(f"/api/sets/{set_id}", params={"limit": 1})
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["content-type"] == "application/json"
+    assert first.json()["cards"][0]["term"] == "Kot"
+    stats = client.get("/api/cache/sets").json()
+    assert stats["entries"] == 1
+    assert (stats["hits"] - before["hits"], stats["misses"] - before["misses"]) == (1, 1)
+    assert stats["size_bytes"] == len(first.content)
+
+
+def test_writes_invalidate_cached_set(client):
+    """Test that every write path drops the cached payload"""
+    response = client.post("/api/sets", json={
+        "title": "Original", "cards": [{"term": "Kot", "definition": "Cat", "order": 0}]
+    })
+    set_id = response.json()["id"]
+    card_id = response.json()["cards"][0]["id"]
+
+    def cached_read():
+        client.get(f"/api/sets/{set_id}")
+        return client.get(f"/api/sets/{set_id}").json()
+
+    invalidations = client.get("/api/cache/sets").json()["invalidations"]
+    cached_read()
+    client.post("/api/review", json={"card_id": card_id, "quality": "good"})
+    assert cached_read()["cards"][0]["progress"]["repetitions"] == 1
+
+    client.post(f"/api/sets/{set_id}/reset-progress")
+    assert cached_read()["cards"][0]["progress"] is None
+
+    client.put(f"/api/sets/{set_id}", json={
+        "title": "Renamed", "cards": [{"id": card_id, "term": "Pies", "definition": "Dog", "order": 0}]
+    })
+    assert cached_read()["title"] == "Renamed"
+    assert client.get("/api/cache/sets").json()["invalidations"] - invalidations == 3
+
+    stale = client.get(f"/api/sets/{set_id}").content
+    client.delete(f"/api/sets/{set_id}")
+    assert client.get(f"/api/sets/{set_id}").status_code == 404
+    # Another worker's cache would still hold the deleted set's first version
+    set_cache.put(set_id, 1, stale)
+    new_id = client.post("/api/sets", json={
+        "title": "New", "cards": [{"term": "Ryba", "definition": "Fish", "order": 0}]
+    }).json()["id"]
+    assert new_id != set_id
+    assert client.get(f"/api/sets/{new_id}").json()["title"] == "New"
@@ -312,4 +312,197 @@ def test_delete_set_not_in_list(client):
     sets = list_response.json()
     assert len(sets) == 1
     assert sets[0]["id"] == set_id_2
-    assert sets[0]["title"] == "Set 2"
\ No newline at end of file
+    assert sets[0]["title"] == "Set 2"
+
+
+def test_get_sets_keyset_pagination(client):
+    """Test paging through sets with limit and the X-Next-Cursor header"""
+    for i in range(5):
+        client.post("/api/sets", json={
+            "title": f"Set {i}",
+            "cards": [{"term": "A", "definition": "B", "order": 0}]
+        })
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["after"] = cursor
+        response = client.get("/api/sets", params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+
+        seen.extend(s["title"] for s in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    # Same order as the unpaginated list, without gaps or duplicates
+    assert seen == [s["title"] for s in client.get("/api/sets").json()]
+    assert sorted(seen) == [f"Set {i}" for i in range(5)]
+
+
+def test_get_set_cards_keyset_pagination(client):
+    """Test paging through the cards of a set"""
+    cards = [
+        {"term": f"Term {i}", "definition": f"Definition {i}", "order": i}
+        for i in range(7)
+    ]
+    create_response = client.post("/api/sets", json={"title": "Paged Set", "cards": cards})
+    set_id = create_response.json()["id"]
+
+    first_page = client.get(f"/api/sets/{set_id}", params={"limit": 3}).json()
+    assert [c["term"] for c in first_page["cards"]] == ["Term 0", "Term 1", "Term 2"]
+    assert first_page["title"] == "Paged Set"
+    assert first_page["next_cursor"] is not None
+
+    second_page = client.get(
+        f"/api/sets/{set_id}", params={"limit": 3, "after": first_page["next_cursor"]}
+    ).json()
+    assert [c["term"] for c in second_page["cards"]] == ["Term 3", "Term 4", "Term 5"]
+
+    last_page = client.get(
+        f"/api/sets/{set_id}", params={"limit": 3, "after": second_page["next_cursor"]}
+    ).json()
+    assert [c["term"] for c in last_page["cards"]] == ["Term 6"]
+    assert last_page["next_cursor"] is None
+
+    # Without a limit the whole set is returned as before
+    full = client.get(f"/api/sets/{set_id}").json()
+    assert len(full["cards"]) == 7
+    assert full["next_cursor"] is None
+
+
+def test_get_set_invalid_cursor(client):
+    """Test that a malformed cursor is rejected"""
+    create_response = client.post("/api/sets", json={
+        "title": "Set",
+        "cards": [{"term": "A", "definition": "B", "order": 0}]
+    })
+    set_id = create_response.json()["id"]
+
+    assert client.get(f"/api/sets/{set_id}", params={"after": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/sets", params={"after": "not-a-cursor"}).status_code == 400
+
+    # Well-formed tokens with values of the wrong type: [{"a": 1}, 1] and ["0", "1"]
+    for cursor in ("W3siYSI6IDF9LCAxXQ==", "WyIwIiwgIjEiXQ=="):
+        assert client.get(f"/api/sets/{set_id}", params={"after": cursor}).status_code == 400
+        assert client.get("/api/sets", params={"after": cursor}).status_code == 400
+
+
+def test_update_set_preserves_card_identity_and_progress(client):
+    """Test that cards sent with their id keep id and progress"""
+    set_data = {
+        "title": "Test Set",
+        "cards": [
+            {"term": "Card 1", "definition": "Def 1", "order": 0},
+            {"term": "Card 2", "definition": "Def 2", "order": 1}
+        ]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    set_id = create_response.json()["id"]
+    card_1 = create_response.json()["cards"][0]
+
+    client.post("/api/review", json={"card_id": card_1["id"], "quality": "good"})
+
+    # Fix a typo in card 1, drop card 2, add card 3
+    response = client.put(f"/api/sets/{set_id}", json={
+        "title": "Test Set",
+        "cards": [
+            {"id": card_1["id"], "term": "Card 1", "definition": "Definition 1", "order": 0},
+            {"term": "Card 3", "definition": "Def 3", "order": 1}
+        ]
+    })
+    assert response.status_code == 200
+
+    cards = response.json()["cards"]
+    assert [c["term"] for c in cards] == ["Card 1", "Card 3"]
+    assert cards[0]["id"] == card_1["id"]
+    assert cards[0]["definition"] == "Definition 1"
+    assert cards[0]["progress"]["repetitions"] == 1
+    assert cards[1]["progress"] is None
+
+
+def test_update_set_rejects_foreign_card_id(client):
+    """Test that card ids from another set are rejected"""
+    first = client.post("/api/sets", json={
+        "title": "First", "cards": [{"term": "A", "definition": "B", "order": 0}]
+    }).json()
+    second = client.post("/api/sets", json={
+        "title": "Second", "cards": [{"term": "C", "definition": "D", "order": 0}]
+    }).json()
+
+    response = client.put(f"/api/sets/{second['id']}", json={
+        "title": "Second",
+        "cards": [{"id": first["cards"][0]["id"], "term": "C", "definition": "D", "order": 0}]
+    })
+    assert response.status_code == 400
+
+    # Nothing was changed
+    assert client.get(f"/api/sets/{first['id']}").json()["cards"][0]["term"] == "A"
+
+
+def test_update_set_rejects_repeated_card_ids(client):
+    """Test that a card listed twice, or both edited and deleted, is rejected before any write"""
+    created = client.post("/api/sets", json={
+        "title": "Set", "cards": [{"term": "A", "definition": "B", "order": 0}]
+    }).json()
+    card_id = created["cards"][0]["id"]
+
+    response = client.put(f"/api/sets/{created['id']}", json={
+        "title": "Renamed",
+        "cards": [
+            {"id": card_id, "term": "A1", "definition": "B", "order": 0},
+            {"id": card_id, "term": "A2", "definition": "B", "order": 1}
+        ]
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Cards [{card_id}] are listed more than once"
+
+    response = client.patch(f"/api/sets/{created['id']}", json={
+        "title": "Renamed",
+        "cards": [{"id": card_id, "term": "A1", "definition": "B", "order": 0}],
+        "deleted_card_ids": [card_id]
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Cards [{card_id}] are both edited and deleted"
+
+    # Nothing was changed
+    data = client.get(f"/api/sets/{created['id']}").json()
+    assert data["title"] == "Set"
+    assert [(c["id"], c["term"]) for c in data["cards"]] == [(card_id, "A")]
+
+
+def test_patch_set_touches_only_listed_cards(client):
+    """Test partial updates of title and individual cards"""
+    set_data = {
+        "title": "Patch Set",
+        "description": "Keep me",
+        "cards": [{"term": f"Card {i}", "definition": "Def", "order": i} for i in range(3)]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    set_id = create_response.json()["id"]
+    cards = create_response.json()["cards"]
+
+    response = client.patch(f"/api/sets/{set_id}", json={
+        "title": "Patched",
+        "cards": [
+            {"id": cards[1]["id"], "term": "Card 1 fixed", "definition": "Def", "order": 1},
+            {"term": "Card 3", "definition": "Def", "order": 3}
+        ],
+        "deleted_card_ids": [cards[0]["id"]]
+    })
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["title"] == "Patched"
+    assert data["description"] == "Keep me"
+    assert [c["term"] for c in data["cards"]] == ["Card 1 fixed", "Card 2", "Card 3"]
+    assert [c["id"] for c in data["cards"][:2]] == [cards[1]["id"], cards[2]["id"]]
+
+
+def test_patch_nonexistent_set(client):
+    """Test patching a set that doesn't exist"""
+    response = client.patch("/api/sets/999", json={"title": "Test"})
+    assert response.status_code == 404
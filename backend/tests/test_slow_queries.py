@@ -0,0 +1,54 @@
+import pytest
+
+from app.database import slow_query_log
+from app.slow_queries import parameter_shape
+from tests.conftest import engine
+
+
+@pytest.fixture
+def log_every_statement(monkeypatch, tmp_path):
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 1e-9)
+    monkeypatch.setattr(slow_query_log, "path", str(tmp_path / "slow_queries.log"))
+    return tmp_path / "slow_queries.log"
+
+
+def test_parameter_shape_hides_values():
+    """Test that only types and lengths are kept, with IN lists folded"""
+    assert parameter_shape((5, "secret", None, 1, 2, 3)) == ["int", "str[6]", "NoneType", "int x3"]
+    assert parameter_shape({"term": "abc", "set_id": 7}) == {"term": "str[3]", "set_id": "int"}
+
+
+def test_slow_queries_are_logged_with_route_and_plan(client, log_every_statement):
+    """Test that statements are written with their route and plan and can be read back"""
+    create_response = client.post("/api/sets", json={
+        "title": "Slow Set",
+        "cards": [{"term": "Secret term", "definition": "Def", "order": 0}]
+    })
+    set_id = create_response.json()["id"]
+    assert client.get(f"/api/sets/{set_id}/study-sr").status_code == 200
+    assert log_every_statement.exists()
+    assert "Secret term" not in log_every_statement.read_text()
+
+    response = client.get("/api/admin/slow-queries", params={"route": "GET /api/sets/{set_id}/study-sr"})
+    assert response.status_code == 200
+    entries = response.json()
+    assert entries
+    assert all(entry["route"] == "GET /api/sets/{set_id}/study-sr" for entry in entries)
+    selects = [entry for entry in entries if entry["statement"].lstrip().startswith("SELECT")]
+    assert selects and all(entry["plan"] for entry in selects)
+    if engine.dialect.name == "sqlite":
+        assert any("USING INDEX" in step for entry in selects for step in entry["plan"])
+
+    # Newest first, and limited
+    all_entries = client.get("/api/admin/slow-queries", params={"limit": 2}).json()
+    assert len(all_entries) == 2
+    assert all_entries[0]["ts"] >= all_entries[1]["ts"]
+    assert client.get("/api/admin/slow-queries", params={"min_duration_ms": 1e6}).json() == []
+
+
+def test_slow_query_log_is_off_by_default(client, tmp_path, monkeypatch):
+    """Test that nothing is written below the default (disabled) threshold"""
+    monkeypatch.setattr(slow_query_log, "path", str(tmp_path / "slow_queries.log"))
+    client.get("/api/sets")
+    assert not (tmp_path / "slow_queries.log").exists()
+    assert client.get("/api/admin/slow-queries").json() == []
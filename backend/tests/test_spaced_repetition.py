@@ -1,5 +1,10 @@
+import random
 from datetime import datetime, timedelta
+
+import numpy as np
+
 from app.services import SpacedRepetitionService
+from app.services.forecast import forecast_due_counts
 from app.models import CardProgress, ReviewQuality
 
 
@@ -172,4 +177,99 @@ def test_get_card_status_mature():
 def test_get_card_status_none():
     """Test card status when progress is None"""
     status = SpacedRepetitionService.get_card_status(None)
-    assert status == 'new'
\ No newline at end of file
+    assert status == 'new'
+
+
+QUALITIES = [ReviewQuality.AGAIN, ReviewQuality.HARD, ReviewQuality.GOOD, ReviewQuality.EASY]
+
+
+def scalar_review(ease, interval, repetitions, lapses, quality):
+    progress = CardProgress(ease_factor=ease, interval_days=interval, repetitions=repetitions, lapses=lapses)
+    updated = SpacedRepetitionService.calculate_next_review(progress, quality)
+    due_in_days = round((updated.next_review - updated.last_reviewed) / timedelta(days=1))
+    return updated.ease_factor, updated.interval_days, updated.repetitions, updated.lapses, due_in_days
+
+
+def test_batch_matches_scalar():
+    """Test that the vectorized update gives exactly the scalar results"""
+    rng = random.Random(42)
+    eases = [0, 1.3, 1.45, 2.05, 2.35, 2.5] + [rng.uniform(1.3, 2.5) for _ in range(20)]
+    states = [
+        (rng.choice(eases), rng.choice([0, 1, 6, rng.randint(0, 40_000)]), rng.randint(0, 12), rng.randint(0, 5), q)
+        for _ in range(5000)
+        for q in [rng.choice(QUALITIES)]
+    ]
+
+    batch = SpacedRepetitionService.calculate_next_review_batch(*(
+        np.array([state[i] for state in states]) for i in range(4)
+    ), np.array([state[4].value for state in states]))
+
+    for i, state in enumerate(states):
+        expected = scalar_review(*state)
+        assert tuple(column[i].item() for column in batch) == expected, state
+
+
+def test_batch_leaves_unknown_quality_unchanged():
+    """Test that a value outside ReviewQuality does not change a card"""
+    batch = SpacedRepetitionService.calculate_next_review_batch(
+        np.array([2.0]), np.array([10]), np.array([3]), np.array([1]), np.array([1])
+    )
+    assert [column[0].item() for column in batch] == [2.0, 10, 3, 1, -1]
+
+
+def test_replay_matches_sequential_scalar_reviews():
+    """Test that replaying interleaved histories matches reviewing each card in turn"""
+    rng = random.Random(7)
+    histories = [[rng.choice(QUALITIES) for _ in range(rng.randint(0, 30))] for _ in range(300)]
+    reviews = [(card, quality) for card, history in enumerate(histories) for quality in history]
+    # Interleave cards; each card's own reviews stay in order
+    rng.shuffle(reviews)
+    order = {card: iter(history) for card, history in enumerate(histories)}
+    reviews = [(card, next(order[card])) for card, _ in reviews]
+
+    states = SpacedRepetitionService.replay_reviews(
+        np.array([card for card, _ in reviews]), np.array([q.value for _, q in reviews]), len(histories)
+    )
+
+    for card, history in enumerate(histories):
+        state = (2.5, 0, 0, 0, -1)
+        for quality in history:
+            state = scalar_review(*state[:4], quality)
+        assert tuple(column[card].item() for column in states) == state
+
+
+def test_forecast_follows_sm2_intervals():
+    """Test the simulated review days of a card that is always answered Good"""
+    counts = forecast_due_counts(
+        np.array([2.5, 2.0]), np.array([6, 1]), np.array([2, 1]), np.array([-3, 58]), 60,
+        {ReviewQuality.GOOD: 1.0}
+    )
+
+    # 6 -> 15 -> 37 days for the first card; the second is due on day 58 and then in 6 days
+    expected = np.zeros(60, dtype=np.int64)
+    expected[[0, 15, 52, 58]] = 1
+    assert counts.tolist() == expected.tolist()
+
+
+def test_forecast_handles_states_sm2_does_not_produce():
+    """Test that zero intervals after repetitions and negative ease still leave the horizon"""
+    counts = forecast_due_counts(
+        np.array([2.5, -1.0]), np.array([0, 3]), np.array([2, 2]), np.array([0, 0]), 10,
+        {ReviewQuality.GOOD: 1.0}
+    )
+
+    assert counts.sum() > 0
+    assert (counts <= 2).all()
+
+
+def test_forecast_is_reproducible():
+    """Test that the sampled ratings follow the weights and use a fixed seed"""
+    args = (np.full(1000, 2.5), np.zeros(1000), np.zeros(1000), np.zeros(1000), 30)
+    weights = {ReviewQuality.AGAIN: 0.5, ReviewQuality.EASY: 0.5}
+
+    counts = forecast_due_counts(*args, weights)
+
+    assert counts.tolist() == forecast_due_counts(*args, weights).tolist()
+    # About half fail and come back tomorrow; Easy puts the rest 4 days out
+    assert 400 < counts[1] < 600
+    assert counts[0] == 1000
@@ -1,5 +1,9 @@
 from datetime import datetime, timedelta
 
+from app.config import get_settings
+from app.models import CardProgress, SetDailyActivity
+from app.services import SpacedRepetitionService
+
 
 def test_get_study_sr_cards_new_set(client):
     """Test getting study cards for a new set with no progress"""
@@ -181,3 +185,495 @@ def test_submit_review_invalid_quality(client):
     response = client.post("/api/review", json=review_data)
     assert response.status_code == 422  # Validation error
 
+
+
+def test_submit_reviews_batch(client):
+    """Test submitting a whole session of reviews in one request"""
+    set_data = {
+        "title": "Batch Set",
+        "cards": [
+            {"term": "Card 1", "definition": "Def 1", "order": 0},
+            {"term": "Card 2", "definition": "Def 2", "order": 1}
+        ]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    card_ids = [card["id"] for card in create_response.json()["cards"]]
+
+    response = client.post("/api/reviews/batch", json={"reviews": [
+        {"card_id": card_ids[0], "quality": "good"},
+        {"card_id": card_ids[1], "quality": "easy"}
+    ]})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["succeeded"] == 2
+    assert data["failed"] == 0
+    assert data["results"][0]["progress"]["interval_days"] == 1
+    assert data["results"][1]["progress"]["interval_days"] == 4
+
+    # Progress is persisted the same way as with single reviews
+    stats = client.get(f"/api/sets/{create_response.json()['id']}/stats").json()
+    assert stats["new_cards"] == 0
+
+
+def test_submit_reviews_batch_repeated_card(client):
+    """Test that repeated reviews of one card are applied in order"""
+    set_data = {
+        "title": "Batch Set",
+        "cards": [{"term": "Card", "definition": "Def", "order": 0}]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    card_id = create_response.json()["cards"][0]["id"]
+
+    response = client.post("/api/reviews/batch", json={"reviews": [
+        {"card_id": card_id, "quality": "good"},
+        {"card_id": card_id, "quality": "good"},
+        {"card_id": card_id, "quality": "good"}
+    ]})
+    results = response.json()["results"]
+
+    assert [r["progress"]["interval_days"] for r in results] == [1, 6, 15]
+    assert [r["progress"]["repetitions"] for r in results] == [1, 2, 3]
+
+
+def test_submit_reviews_batch_unknown_card(client):
+    """Test that unknown cards fail per item without failing the batch"""
+    set_data = {
+        "title": "Batch Set",
+        "cards": [{"term": "Card", "definition": "Def", "order": 0}]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    card_id = create_response.json()["cards"][0]["id"]
+
+    response = client.post("/api/reviews/batch", json={"reviews": [
+        {"card_id": 999, "quality": "good"},
+        {"card_id": card_id, "quality": "hard"}
+    ]})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["succeeded"] == 1
+    assert data["failed"] == 1
+    assert data["results"][0]["status_code"] == 404
+    assert data["results"][0]["progress"] is None
+    assert data["results"][1]["status_code"] == 200
+
+
+def test_submit_reviews_batch_empty(client):
+    """Test that an empty batch is rejected"""
+    response = client.post("/api/reviews/batch", json={"reviews": []})
+    assert response.status_code == 422
+
+
+def test_get_set_stats_buckets_and_accuracy(client, db_session):
+    """Test stats aggregates over new, learning and mature cards"""
+    set_data = {
+        "title": "Stats Set",
+        "cards": [
+            {"term": "New", "definition": "Def", "order": 0},
+            {"term": "Learning", "definition": "Def", "order": 1},
+            {"term": "Mature", "definition": "Def", "order": 2}
+        ]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    set_id = create_response.json()["id"]
+    cards = create_response.json()["cards"]
+
+    now = datetime.now()
+    db_session.add_all([
+        CardProgress(card_id=cards[1]["id"], set_id=set_id, ease_factor=2.0, interval_days=1,
+                     repetitions=1, lapses=1, last_reviewed=now, next_review=now + timedelta(days=1)),
+        CardProgress(card_id=cards[2]["id"], set_id=set_id, ease_factor=2.5, interval_days=15,
+                     repetitions=3, lapses=0, last_reviewed=now - timedelta(days=1),
+                     next_review=now + timedelta(days=15)),
+        SetDailyActivity(set_id=set_id, day=now.date(), review_count=3, correct_count=2),
+        SetDailyActivity(set_id=set_id, day=now.date() - timedelta(days=1), review_count=2, correct_count=2),
+        SetDailyActivity(set_id=set_id, day=now.date() - timedelta(days=3), review_count=1, correct_count=1),
+    ])
+    db_session.commit()
+
+    stats = client.get(f"/api/sets/{set_id}/stats").json()
+
+    assert stats["total_cards"] == 3
+    assert stats["new_cards"] == 1
+    assert stats["learning_cards"] == 1
+    assert stats["mature_cards"] == 1
+    assert stats["average_ease_factor"] == 2.25
+    assert stats["reviews_today"] == 3
+    assert stats["reviews_this_week"] == 6
+    assert stats["reviews_total"] == 6
+    assert stats["accuracy"] == 83.3
+    assert stats["current_streak"] == 2
+
+
+def test_get_set_stats_nonexistent_set(client):
+    """Test getting stats for non-existent set"""
+    response = client.get("/api/sets/999/stats")
+    assert response.status_code == 404
+
+
+def test_reviews_update_daily_activity(client):
+    """Test that single and batch reviews are counted in the daily rollup"""
+    set_data = {
+        "title": "Activity Set",
+        "cards": [
+            {"term": "Card 1", "definition": "Def 1", "order": 0},
+            {"term": "Card 2", "definition": "Def 2", "order": 1}
+        ]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    set_id = create_response.json()["id"]
+    card_ids = [card["id"] for card in create_response.json()["cards"]]
+
+    client.post("/api/review", json={"card_id": card_ids[0], "quality": "good"})
+    client.post("/api/reviews/batch", json={"reviews": [
+        {"card_id": card_ids[0], "quality": "again"},
+        {"card_id": card_ids[1], "quality": "easy"}
+    ]})
+
+    response = client.get(f"/api/sets/{set_id}/activity?days=30")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["days"] == 30
+    assert data["activity"] == [{
+        "day": datetime.now().date().isoformat(),
+        "review_count": 3,
+        "correct_count": 2
+    }]
+
+    stats = client.get(f"/api/sets/{set_id}/stats").json()
+    assert stats["reviews_today"] == 3
+    assert stats["current_streak"] == 1
+
+
+def test_reset_progress_clears_daily_activity(client):
+    """Test that resetting progress also resets the streak"""
+    set_data = {
+        "title": "Activity Set",
+        "cards": [{"term": "Card", "definition": "Def", "order": 0}]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    set_id = create_response.json()["id"]
+    card_id = create_response.json()["cards"][0]["id"]
+
+    client.post("/api/review", json={"card_id": card_id, "quality": "good"})
+    client.post(f"/api/sets/{set_id}/reset-progress")
+
+    assert client.get(f"/api/sets/{set_id}/activity").json()["activity"] == []
+    assert client.get(f"/api/sets/{set_id}/stats").json()["current_streak"] == 0
+
+
+def test_get_set_activity_nonexistent_set(client):
+    """Test getting activity for non-existent set"""
+    response = client.get("/api/sets/999/activity")
+    assert response.status_code == 404
+
+
+def test_review_log_history_and_accuracy(client):
+    """Test that every review is logged and accuracy is exact"""
+    set_data = {
+        "title": "History Set",
+        "cards": [
+            {"term": "Card 1", "definition": "Def 1", "order": 0},
+            {"term": "Card 2", "definition": "Def 2", "order": 1}
+        ]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    set_id = create_response.json()["id"]
+    card_ids = [card["id"] for card in create_response.json()["cards"]]
+
+    client.post("/api/review", json={"card_id": card_ids[0], "quality": "good"})
+    client.post("/api/review", json={"card_id": card_ids[0], "quality": "good"})
+    client.post("/api/reviews/batch", json={"reviews": [
+        {"card_id": card_ids[0], "quality": "again"},
+        {"card_id": card_ids[1], "quality": "easy"}
+    ]})
+
+    response = client.get(f"/api/cards/{card_ids[0]}/history")
+    assert response.status_code == 200
+
+    history = response.json()
+    assert len(history) == 3
+    # Newest first: the lapse after 1 -> 6 day intervals
+    assert history[0]["quality"] == 0
+    assert history[0]["prev_interval"] == 6
+    assert history[0]["new_interval"] == 0
+    assert history[0]["new_ease"] < history[0]["prev_ease"]
+
+    accuracy = client.get(f"/api/sets/{set_id}/accuracy").json()
+    assert accuracy["reviews"] == 4
+    assert accuracy["correct"] == 3
+    assert accuracy["accuracy"] == 75.0
+
+
+def test_accuracy_time_range(client):
+    """Test that accuracy only counts reviews inside the range"""
+    set_data = {
+        "title": "History Set",
+        "cards": [{"term": "Card", "definition": "Def", "order": 0}]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    set_id = create_response.json()["id"]
+    card_id = create_response.json()["cards"][0]["id"]
+
+    client.post("/api/review", json={"card_id": card_id, "quality": "good"})
+
+    past = (datetime.now() - timedelta(days=10)).isoformat()
+    response = client.get(f"/api/sets/{set_id}/accuracy", params={"end": past})
+    assert response.json()["reviews"] == 0
+    assert response.json()["accuracy"] == 0.0
+
+
+def test_card_history_nonexistent_card(client):
+    """Test getting history for non-existent card"""
+    response = client.get("/api/cards/999/history")
+    assert response.status_code == 404
+
+
+def test_get_study_sr_cards_due_queue_order_and_limits(client, db_session):
+    """Test that due cards come most overdue first and both limits apply"""
+    set_data = {
+        "title": "Queue Set",
+        "cards": [{"term": f"Card {i}", "definition": "Def", "order": i} for i in range(6)]
+    }
+    create_response = client.post("/api/sets", json=set_data)
+    set_id = create_response.json()["id"]
+    cards = create_response.json()["cards"]
+
+    now = datetime.now()
+    # Card 0: due in a week, card 1: 1 day overdue, card 2: 5 days overdue; cards 3-5 are new
+    for card, offset in zip(cards[:3], (7, -1, -5)):
+        db_session.add(CardProgress(
+            card_id=card["id"], set_id=set_id, ease_factor=2.5, interval_days=1,
+            repetitions=1, lapses=0, last_reviewed=now, next_review=now + timedelta(days=offset)
+        ))
+    db_session.commit()
+
+    data = client.get(f"/api/sets/{set_id}/study-sr").json()
+    assert [c["term"] for c in data["cards"]] == ["Card 2", "Card 1", "Card 3", "Card 4", "Card 5"]
+    assert data["stats"]["review_cards"] == 2
+    assert data["stats"]["overdue_cards"] == 2
+    assert data["stats"]["new_cards"] == 3
+
+    data = client.get(f"/api/sets/{set_id}/study-sr?new_limit=1&review_limit=1").json()
+    assert [c["term"] for c in data["cards"]] == ["Card 2", "Card 3"]
+
+
+def test_reschedule_replays_review_log(client, monkeypatch):
+    """Test that rescheduling keeps progress as is and follows changed constants"""
+    create_response = client.post("/api/sets", json={
+        "title": "Reschedule Set",
+        "cards": [{"term": f"Card {i}", "definition": f"Def {i}", "order": i} for i in range(4)]
+    })
+    set_id = create_response.json()["id"]
+    card_ids = [card["id"] for card in create_response.json()["cards"]]
+
+    for quality in ["good", "again", "good", "good", "easy"]:
+        client.post("/api/review", json={"card_id": card_ids[0], "quality": quality})
+    # Card 1's first reviews are dropped by the reset
+    for quality in ["easy", "easy"]:
+        client.post("/api/review", json={"card_id": card_ids[1], "quality": quality})
+    client.post(f"/api/sets/{set_id}/reset-progress")
+    for quality in ["good", "good"]:
+        client.post("/api/review", json={"card_id": card_ids[1], "quality": quality})
+        client.post("/api/review", json={"card_id": card_ids[0], "quality": quality})
+    # Card 2 has progress but no logged history
+    monkeypatch.setattr(get_settings(), "review_log_enabled", False)
+    client.post("/api/review", json={"card_id": card_ids[2], "quality": "hard"})
+    monkeypatch.setattr(get_settings(), "review_log_enabled", True)
+
+    def progress():
+        cards = client.get(f"/api/sets/{set_id}").json()["cards"]
+        return [card["progress"] for card in cards]
+
+    before = progress()
+    monkeypatch.setattr(get_settings(), "reschedule_chunk_size", 1)
+
+    response = client.post(f"/api/sets/{set_id}/reschedule")
+
+    assert response.status_code == 200
+    assert response.json() == {"set_id": set_id, "cards": 3, "rescheduled": 2, "skipped": 1}
+    assert progress() == before
+
+    monkeypatch.setattr(SpacedRepetitionService, "SECOND_INTERVAL", 3)
+    client.post(f"/api/sets/{set_id}/reschedule")
+
+    after = progress()
+    assert after[1]["interval_days"] == 3
+    assert after[1]["repetitions"] == 2
+    last_reviewed = datetime.fromisoformat(after[1]["last_reviewed"])
+    assert datetime.fromisoformat(after[1]["next_review"]) == last_reviewed + timedelta(days=3)
+    assert after[0]["interval_days"] == 3
+    assert after[0]["lapses"] == 0
+    assert after[2] == before[2]
+
+
+def test_reschedule_errors(client, monkeypatch):
+    """Test reschedule on a missing set and with review_log disabled"""
+    assert client.post("/api/sets/999/reschedule").status_code == 404
+
+    monkeypatch.setattr(get_settings(), "review_log_enabled", False)
+    set_id = client.post("/api/sets", json={
+        "title": "No Log", "cards": [{"term": "Card", "definition": "Def", "order": 0}]
+    }).json()["id"]
+    assert client.post(f"/api/sets/{set_id}/reschedule").status_code == 409
+
+
+def test_get_set_forecast(client, db_session, monkeypatch):
+    """Test the projected due counts per day"""
+    monkeypatch.setattr(get_settings(), "forecast_quality_weights", {"good": 1.0})
+    create_response = client.post("/api/sets", json={
+        "title": "Forecast Set",
+        "cards": [{"term": f"Card {i}", "definition": "Def", "order": i} for i in range(4)]
+    })
+    set_id = create_response.json()["id"]
+    cards = create_response.json()["cards"]
+
+    now = datetime.now()
+    # Card 0: 2 days overdue, card 1: due in 3 days, card 2: due after the horizon; card 3 is new
+    for card, offset in zip(cards[:3], (-2, 3, 30)):
+        db_session.add(CardProgress(
+            card_id=card["id"], set_id=set_id, ease_factor=2.5, interval_days=6,
+            repetitions=2, lapses=0, last_reviewed=now, next_review=now + timedelta(days=offset)
+        ))
+    db_session.commit()
+
+    response = client.get(f"/api/sets/{set_id}/forecast", params={"days": 20})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["days"], data["cards"], data["overdue"]) == (20, 3, 1)
+    assert len(data["forecast"]) == 20
+    assert data["forecast"][0]["day"] == now.date().isoformat()
+    # Good after 6 days schedules the next review 15 days later
+    due = {i: day["due_count"] for i, day in enumerate(data["forecast"]) if day["due_count"]}
+    assert due == {0: 1, 3: 1, 15: 1, 18: 1}
+
+
+def test_get_set_forecast_validation(client):
+    """Test forecast on a missing set and out-of-range horizons"""
+    assert client.get("/api/sets/999/forecast").status_code == 404
+
+    set_id = client.post("/api/sets", json={
+        "title": "Empty Forecast", "cards": [{"term": "Card", "definition": "Def", "order": 0}]
+    }).json()["id"]
+    assert client.get(f"/api/sets/{set_id}/forecast", params={"days": 0}).status_code == 422
+
+    data = client.get(f"/api/sets/{set_id}/forecast", params={"days": 7}).json()
+    assert [day["due_count"] for day in data["forecast"]] == [0] * 7
+
+
+def create_queue_sets(client, db_session):
+    """Two sets with due and new cards; returns the due-queue order of card terms"""
+    now = datetime.now()
+    for name, offsets in (("A", (-3, -1, 2, None, None, None)), ("B", (-2, -4, 0, None, None))):
+        response = client.post("/api/sets", json={
+            "title": f"Set {name}",
+            "cards": [{"term": f"{name}{i}", "definition": "Def", "order": i} for i in range(len(offsets))]
+        })
+        set_id = response.json()["id"]
+        for card, offset in zip(response.json()["cards"], offsets):
+            if offset is not None:
+                db_session.add(CardProgress(
+                    card_id=card["id"], set_id=set_id, ease_factor=2.5, interval_days=1,
+                    repetitions=1, lapses=0, last_reviewed=now, next_review=now + timedelta(days=offset)
+                ))
+    db_session.commit()
+
+
+def test_get_due_queue_merges_sets_with_per_set_caps(client, db_session):
+    """Test that due cards of all sets come most overdue first, then new cards set by set in turn"""
+    create_queue_sets(client, db_session)
+
+    data = client.get("/api/study/due").json()
+    assert [c["term"] for c in data["cards"]] == ["B1", "A0", "B0", "A1", "B2", "A3", "B3", "A4", "B4", "A5"]
+    assert data["next_cursor"] is None
+    assert data["cards"][0]["progress"]["repetitions"] == 1
+    assert data["cards"][-1]["progress"] is None
+
+    data = client.get("/api/study/due", params={"review_limit": 1, "new_limit": 2}).json()
+    assert [c["term"] for c in data["cards"]] == ["B1", "A0", "A3", "B3", "A4", "B4"]
+
+    data = client.get("/api/study/due", params={"review_limit": 0, "new_limit": 0}).json()
+    assert data == {"cards": [], "next_cursor": None}
+
+
+def test_get_due_queue_pagination(client, db_session, monkeypatch):
+    """Test that following next_cursor across the due/new boundary returns the queue once"""
+    create_queue_sets(client, db_session)
+    full = [c["id"] for c in client.get("/api/study/due").json()["cards"]]
+
+    for fast in (False, True):
+        monkeypatch.setattr(get_settings(), "fast_serialization", fast)
+        seen = []
+        params = {"limit": 3}
+        while True:
+            page = client.get("/api/study/due", params=params).json()
+            seen.extend(c["id"] for c in page["cards"])
+            if page["next_cursor"] is None:
+                break
+            params["after"] = page["next_cursor"]
+        assert seen == full
+
+    for cursor in (
+        "bad",
+        "WzIsIDEsIDJd",
+        "WzIsIDEsIDIsICIyMDI2LTEwLTE4VDAwOjAwOjAwIl0=",
+        "WzAsICJub3QgYSBkYXRlIiwgMSwgIjIwMjYtMTAtMThUMDA6MDA6MDAiXQ==",
+        "WzEsIDEsIDEsICJub3QgYSBkYXRlIl0="
+    ):
+        assert client.get("/api/study/due", params={"after": cursor}).status_code == 400
+    assert client.get("/api/study/due", params={"limit": 0}).status_code == 422
+
+
+def test_get_due_queue_pages_survive_reviews(client, db_session):
+    """Test that reviewing each page before fetching the next still returns every queued card once"""
+    create_queue_sets(client, db_session)
+    for name in ("C", "D"):
+        client.post("/api/sets", json={"title": f"Set {name}", "cards": [
+            {"term": f"{name}{i}", "definition": "Def", "order": i} for i in range(6)
+        ]})
+    full = [c["id"] for c in client.get("/api/study/due").json()["cards"]]
+
+    seen = []
+    params = {"limit": 4}
+    while True:
+        page = client.get("/api/study/due", params=params).json()
+        seen.extend(c["id"] for c in page["cards"])
+        client.post("/api/reviews/batch", json={"reviews": [
+            {"card_id": c["id"], "quality": "good"} for c in page["cards"]
+        ]})
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+
+    assert seen == full
+
+
+def test_get_due_queue_review_limit_holds_across_reviewed_pages(client, db_session):
+    """Test that reviewing each page does not let more than review_limit due cards of a set through"""
+    response = client.post("/api/sets", json={
+        "title": "Overdue", "cards": [{"term": f"C{i}", "definition": "Def", "order": i} for i in range(5)]
+    })
+    set_id = response.json()["id"]
+    now = datetime.now()
+    for i, card in enumerate(response.json()["cards"]):
+        db_session.add(CardProgress(
+            card_id=card["id"], set_id=set_id, ease_factor=2.5, interval_days=1,
+            repetitions=1, lapses=0, last_reviewed=now, next_review=now - timedelta(days=5 - i)
+        ))
+    db_session.commit()
+
+    seen = []
+    params = {"limit": 1, "review_limit": 2}
+    while True:
+        page = client.get("/api/study/due", params=params).json()
+        seen.extend(c["term"] for c in page["cards"])
+        for card in page["cards"]:
+            client.post("/api/review", json={"card_id": card["id"], "quality": "good"})
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+
+    assert seen == ["C0", "C1"]
@@ -54,7 +54,7 @@ const EditSetPage = () => {
   const addCard = () => {
     setCards([
       ...cards,
-      { id: Date.now(), term: '', definition: '', order: cards.length }
+      { id: Date.now(), isNew: true, term: '', definition: '', order: cards.length }
     ]);
   };
 
@@ -103,7 +103,9 @@ const EditSetPage = () => {
       const setData = {
         title: title.trim(),
         description: description.trim() || null,
+        // Existing cards keep their id so the server preserves their progress
         cards: cards.map((card, index) => ({
+          ...(card.isNew ? {} : { id: card.id }),
           term: card.term.trim(),
           definition: card.definition.trim(),
           order: index
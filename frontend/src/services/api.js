@@ -10,19 +10,29 @@ const apiClient = axios.create({
 });
 
 export const setsApi = {
-  getAll: () => apiClient.get('/sets'),
-  getById: (id) => apiClient.get(`/sets/${id}`),
+  getAll: (params) => apiClient.get('/sets', { params }),
+  getById: (id, params) => apiClient.get(`/sets/${id}`, { params }),
   create: (data) => apiClient.post('/sets', data),
+  // file: File/Blob sent as the raw body; params: { title, description, format, separator, has_header }
+  importDeck: (file, params) => apiClient.post('/sets/import', file, {
+    params,
+    headers: { 'Content-Type': 'text/plain' },
+  }),
   update: (id, data) => apiClient.put(`/sets/${id}`, data),
+  patch: (id, data) => apiClient.patch(`/sets/${id}`, data),
   delete: (id) => apiClient.delete(`/sets/${id}`),
   getStudyCards: (id) => apiClient.get(`/sets/${id}/study`),
   getSpacedRepetitionCards: (id) => apiClient.get(`/sets/${id}/study-sr`),
   getStats: (id) => apiClient.get(`/sets/${id}/stats`),
+  getActivity: (id, days = 365) => apiClient.get(`/sets/${id}/activity`, { params: { days } }),
   resetProgress: (id) => apiClient.post(`/sets/${id}/reset-progress`),
 };
 
 export const studyApi = {
   submitReview: (cardId, quality) => apiClient.post('/review', { card_id: cardId, quality }),
+  submitReviews: (reviews) => apiClient.post('/reviews/batch', {
+    reviews: reviews.map(({ cardId, quality }) => ({ card_id: cardId, quality })),
+  }),
 };
 
 export default apiClient;
\ No newline at end of file